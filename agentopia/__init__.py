@@ -1,10 +1,14 @@
+from agentopia.async_client import AsyncAgentopia
 from agentopia.client import Agentopia, WithdrawalStatus
 from agentopia.decorator import payable
 from agentopia.service import ServiceModel as AgentopiaServiceModel
+from agentopia.service import ServiceSummary as AgentopiaServiceSummary
 
 __all__ = [
     "Agentopia",
+    "AsyncAgentopia",
     "payable",
     "AgentopiaServiceModel",
+    "AgentopiaServiceSummary",
     "WithdrawalStatus",
 ]
@@ -8,6 +8,10 @@ class APIKey(BaseModel):
     name: str
 
 
+class _APIKeyPage(BaseModel):
+    items: List[APIKey]
+
+
 class APIKeyManager:
     """API key management for Agentopia"""
 
@@ -23,10 +27,11 @@ class APIKeyManager:
         Returns:
             API key details including the key string
         """
-        response = self.client._post(
-            f"/v1/user/{self.client.address}/api-key", params={"key_name": name}
+        return self.client._post(
+            f"/v1/user/{self.client.address}/api-key",
+            params={"key_name": name},
+            model=APIKey,
         )
-        return APIKey(**response)
 
     def list(self, skip: int = 0, limit: int = 10) -> List[APIKey]:
         """List API keys.
@@ -38,11 +43,12 @@ class APIKeyManager:
         Returns:
             List of API keys
         """
-        response = self.client._get(
+        page = self.client._get(
             f"/v1/user/{self.client.address}/api-key",
             params={"skip": skip, "limit": limit},
+            model=_APIKeyPage,
         )
-        return [APIKey(**item) for item in response["items"]]
+        return page.items
 
     def deactivate(self, api_key: str) -> bool:
         """Deactivate an API key.
@@ -59,3 +65,58 @@ class APIKeyManager:
         if response.get("message") == "API key deactivated":
             return True
         return False
+
+
+class AsyncAPIKeyManager:
+    """Async API key management for Agentopia"""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def create(self, name: str) -> APIKey:
+        """Create a new API key.
+
+        Args:
+            name: Name/description for the API key
+
+        Returns:
+            API key details including the key string
+        """
+        return await self.client._post(
+            f"/v1/user/{self.client.address}/api-key",
+            params={"key_name": name},
+            model=APIKey,
+        )
+
+    async def list(self, skip: int = 0, limit: int = 10) -> List[APIKey]:
+        """List API keys.
+
+        Args:
+            skip: Number of records to skip for pagination
+            limit: Maximum number of records to return
+
+        Returns:
+            List of API keys
+        """
+        page = await self.client._get(
+            f"/v1/user/{self.client.address}/api-key",
+            params={"skip": skip, "limit": limit},
+            model=_APIKeyPage,
+        )
+        return page.items
+
+    async def deactivate(self, api_key: str) -> bool:
+        """Deactivate an API key.
+
+        Args:
+            api_key: The API key string to deactivate
+
+        Returns:
+            The deactivated API key
+        """
+        response = await self.client._delete(
+            f"/v1/user/{self.client.address}/api-key/{api_key}"
+        )
+        if response.get("message") == "API key deactivated":
+            return True
+        return False
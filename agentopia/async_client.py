@@ -0,0 +1,489 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import orjson
+from eth_account import Account
+
+from agentopia.api_key import AsyncAPIKeyManager
+from agentopia.auth import cache_auth, get_cached_auth, invalidate_auth
+from agentopia.client import (
+    Balance,
+    WithdrawalRequestResponse,
+    WithdrawalStatus,
+    _configure_chain,
+    _decode_response,
+    _json_default,
+    _wallet_auth_header,
+)
+from agentopia.deposit import deposit_onchain
+from agentopia.hold import AsyncHoldManager
+from agentopia.pipeline import (
+    AsyncRequestPipeline,
+    PipelineRequest,
+    RetryPolicy,
+    default_async_middlewares,
+)
+from agentopia.service import AsyncServiceManager
+from agentopia.settings import settings
+from agentopia.streaming import AsyncServiceStream
+from agentopia.tracing import Tracer, get_tracer
+from agentopia.transport import build_limits, new_async_client
+from agentopia.waiter import async_wait_until
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAgentopia:
+    def __init__(
+        self,
+        private_key: Optional[str] = None,
+        api_key: Optional[str] = None,
+        api_url: Optional[str] = None,
+        micropayment_address: Optional[str] = None,
+        usdc_address: Optional[str] = None,
+        rpc: Optional[str] = None,
+        chain_id: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        timeout: Optional[float] = None,
+        tracer: Optional[Tracer] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        """Initialize the asyncio Agentopia client.
+
+        All requests, both to the Agentopia API and to services called directly,
+        share one long-lived pooled `httpx.AsyncClient`. Close it with `aclose()`
+        or use the client as an async context manager.
+
+        Wallet authentication needs network round-trips, so with a private key it
+        is performed on the first request (or by awaiting `authenticate()`).
+
+        Args:
+            private_key: Ethereum private key for signing requests
+            api_key: API key for authentication
+            api_url: Base URL for the Agentopia API
+            max_connections: Maximum number of concurrent pooled connections
+            max_keepalive_connections: Maximum number of idle keep-alive connections
+            keepalive_expiry: Seconds an idle connection is kept alive
+            http2: Whether to use HTTP/2 when the server supports it
+            timeout: Request timeout in seconds
+            tracer: Tracer of API requests and responses (default: get_tracer())
+            retry_policy: When and how to retry failed API requests
+                (default: RetryPolicy())
+        """
+        logger.info("Initializing async Agentopia client")
+        if api_url:
+            self.api_url = api_url.rstrip("/")
+        else:
+            self.api_url = settings.AGENTOPIA_API.rstrip("/")
+        logger.debug(f"Using API URL: {self.api_url}")
+
+        self.tracer = tracer or get_tracer()
+        self.http = new_async_client(
+            limits=build_limits(
+                max_connections, max_keepalive_connections, keepalive_expiry
+            ),
+            http2=http2,
+            timeout=timeout,
+        )
+        self._pipeline = AsyncRequestPipeline(
+            self._dispatch,
+            default_async_middlewares(timeout=timeout, policy=retry_policy),
+        )
+        self._stream_pipeline = AsyncRequestPipeline(
+            self._dispatch_stream,
+            default_async_middlewares(timeout=timeout, policy=retry_policy),
+        )
+        self._auth_headers: Dict[str, str] = {}
+        self._auth_lock: Optional[asyncio.Lock] = None
+        self.account = None
+
+        private_key = private_key or settings.AGENTOPIA_USER_PRIVATE_KEY
+        _configure_chain(micropayment_address, usdc_address, rpc, chain_id)
+        api_key = api_key or settings.API_KEY
+
+        if private_key:
+            logger.debug("Using private key authentication")
+            self.account = Account.from_key(private_key)
+            self.address = self.account.address
+        elif api_key:
+            logger.debug("Using API key authentication")
+            self._auth_headers["Authorization"] = f"Bearer {api_key}"
+        else:
+            logger.error("No authentication method provided")
+            raise ValueError("Either private_key or api_key must be provided")
+
+        logger.info("Async Agentopia client initialized successfully")
+
+    async def __aenter__(self) -> "AsyncAgentopia":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections."""
+        logger.debug("Closing async Agentopia client")
+        if hasattr(self, "_hold_manager"):
+            await self._hold_manager.close_pool()
+        await self.http.aclose()
+
+    @property
+    def service(self) -> AsyncServiceManager:
+        """Get the service manager."""
+        if not hasattr(self, "_service_manager"):
+            logger.debug("Initializing async service manager")
+            self._service_manager = AsyncServiceManager(self)
+        return self._service_manager
+
+    @property
+    def hold(self) -> AsyncHoldManager:
+        """Get the hold manager."""
+        if not hasattr(self, "_hold_manager"):
+            logger.debug("Initializing async hold manager")
+            self._hold_manager = AsyncHoldManager(self)
+        return self._hold_manager
+
+    @property
+    def api_key(self) -> AsyncAPIKeyManager:
+        """Get the API key manager."""
+        if not hasattr(self, "_api_key_manager"):
+            logger.debug("Initializing async API key manager")
+            self._api_key_manager = AsyncAPIKeyManager(self)
+        return self._api_key_manager
+
+    async def authenticate(self) -> None:
+        """Set up wallet-based authentication if it has not been done yet.
+
+        Concurrent callers wait for a single authentication round-trip.
+        """
+        if "Authorization" in self._auth_headers:
+            return
+        async with self._lock():
+            if "Authorization" in self._auth_headers:
+                return
+            await self._setup_wallet_auth()
+
+    def _lock(self) -> asyncio.Lock:
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        return self._auth_lock
+
+    async def _setup_wallet_auth(self):
+        """Set up wallet-based authentication.
+
+        The Authorization header is shared with every client of the process using
+        the same wallet and API URL, so only the first one signs in.
+        """
+        cached = get_cached_auth(self.address, self.api_url)
+        if cached:
+            logger.debug("Reusing cached wallet authentication")
+            self._auth_headers["Authorization"] = cached
+            return
+        logger.info("Setting up wallet authentication")
+        # Get nonce for signing
+        resp = await self._request(
+            "GET", f"/v1/user/{self.address}/nonce", authenticate=False
+        )
+        logger.debug(f"Got nonce response: {resp}")
+        nonce = resp["nonce"]
+        resp = await self._request(
+            "GET", "/v1/platform/message_to_sign", authenticate=False
+        )
+        self._auth_headers["Authorization"] = _wallet_auth_header(
+            self.account, resp["message"], nonce
+        )
+        cache_auth(self.address, self.api_url, self._auth_headers["Authorization"])
+        logger.info("Wallet authentication setup completed")
+
+    async def _reauthenticate(self, rejected: str) -> None:
+        """Sign in again after the API rejected the Authorization header."""
+        async with self._lock():
+            if self._auth_headers.get("Authorization") != rejected:
+                # another task already signed in again
+                return
+            logger.info("Authorization rejected, re-authenticating")
+            invalidate_auth(self.address, self.api_url, rejected)
+            self._auth_headers.pop("Authorization", None)
+            await self._setup_wallet_auth()
+
+    async def _dispatch(self, request: PipelineRequest) -> httpx.Response:
+        return await self.http.request(request.method, request.url, **request.kwargs)
+
+    async def _dispatch_stream(self, request: PipelineRequest) -> httpx.Response:
+        return await self.http.send(
+            self.http.build_request(request.method, request.url, **request.kwargs),
+            stream=True,
+        )
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        idempotent: Optional[bool] = None,
+        stream: bool = False,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send an API request through the request pipeline, re-authenticating
+        once if the wallet auth expired."""
+        if self.account is not None:
+            await self.authenticate()
+        pipeline = self._stream_pipeline if stream else self._pipeline
+        auth = self._auth_headers.get("Authorization")
+        resp = await pipeline(
+            PipelineRequest(
+                method,
+                url,
+                {**kwargs, "headers": {**self._auth_headers, **headers}},
+                idempotent,
+            )
+        )
+        if resp.status_code == 401 and self.account is not None and auth:
+            await resp.aclose()
+            await self._reauthenticate(auth)
+            resp = await pipeline(
+                PipelineRequest(
+                    method,
+                    url,
+                    {**kwargs, "headers": {**self._auth_headers, **headers}},
+                    idempotent,
+                )
+            )
+        return resp
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        base_url: Optional[str] = None,
+        authenticate: bool = True,
+        idempotent: Optional[bool] = None,
+        model: Any = None,
+        **kwargs,
+    ) -> Any:
+        """Make a request to the API, or to an external URL without auth header.
+
+        Requests go through the request pipeline: they get a timeout, are retried
+        with backoff when that is safe (see `RetryPolicy`) and fail fast while
+        the circuit breaker of the host is open.
+
+        The response data is returned as `model` when given (see
+        `_decode_response`), as plain JSON otherwise.
+        """
+        url = f"{base_url or self.api_url}{path}"
+        self.tracer.request(method, url, kwargs.get("json"))
+        headers = dict(kwargs.pop("headers", None) or {})
+        if "json" in kwargs:
+            kwargs["content"] = orjson.dumps(kwargs.pop("json"), default=_json_default)
+            headers["Content-Type"] = "application/json"
+        if base_url or not authenticate:
+            if base_url:
+                logger.debug("Using external URL without auth header")
+            resp = await self._pipeline(
+                PipelineRequest(method, url, {**kwargs, "headers": headers}, idempotent)
+            )
+        else:
+            resp = await self._send(method, url, headers, idempotent, **kwargs)
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            self.tracer.error(method, e, resp)
+            raise e
+        self.tracer.response(resp)
+        return _decode_response(resp.content, model)
+
+    async def _stream(self, method: str, path: str, **kwargs) -> AsyncServiceStream:
+        """Make a request to the API whose response body is streamed."""
+        url = f"{self.api_url}{path}"
+        self.tracer.request(method, url, kwargs.get("json"))
+        headers = dict(kwargs.pop("headers", None) or {})
+        if "json" in kwargs:
+            kwargs["content"] = orjson.dumps(kwargs.pop("json"), default=_json_default)
+            headers["Content-Type"] = "application/json"
+        resp = await self._send(method, url, headers, stream=True, **kwargs)
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            await resp.aread()
+            self.tracer.error(method, e, resp)
+            await resp.aclose()
+            raise e
+        return AsyncServiceStream(
+            resp.aiter_bytes(), resp.aclose, resp.status_code, resp.headers
+        )
+
+    async def _get_conditional(
+        self, path: str, etag: Optional[str] = None, model: Any = None, **kwargs
+    ) -> Tuple[Any, Optional[str]]:
+        """Make GET request to API, revalidating a cached response by its ETag.
+
+        Returns:
+            Tuple of the response data (None if not modified), as `model` if
+            given, and the ETag
+        """
+        url = f"{self.api_url}{path}"
+        self.tracer.request("GET", url)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if etag:
+            headers["If-None-Match"] = etag
+        resp = await self._send("GET", url, headers, **kwargs)
+        if resp.status_code == 304:
+            logger.debug(f"Not modified: {path}")
+            return None, etag
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            self.tracer.error("GET", e, resp)
+            raise e
+        self.tracer.response(resp)
+        return _decode_response(resp.content, model), resp.headers.get("ETag")
+
+    async def _get(self, path: str, base_url: Optional[str] = None, **kwargs) -> Any:
+        """Make GET request to API."""
+        return await self._request("GET", path, base_url=base_url, **kwargs)
+
+    async def _post(self, path: str, base_url: Optional[str] = None, **kwargs) -> Any:
+        """Make POST request to API."""
+        return await self._request("POST", path, base_url=base_url, **kwargs)
+
+    async def _put(self, path: str, data=None, **kwargs) -> Any:
+        """Make a PUT request to the API."""
+        if data is not None and "json" not in kwargs:
+            kwargs["content"] = data
+        return await self._request("PUT", path, **kwargs)
+
+    async def _delete(self, path: str, **kwargs) -> Any:
+        """Make a DELETE request to the API."""
+        return await self._request("DELETE", path, **kwargs)
+
+    async def get_balance(self) -> Balance:
+        """Get current balance."""
+        logger.info("Getting balance")
+        balance = await self._get(f"/v1/user/{self.address}/balance", model=Balance)
+        logger.debug(f"Current balance: {balance}")
+        return balance
+
+    async def withdraw(
+        self,
+        amount: Optional[int] = None,
+        wait: bool = False,
+        timeout: Optional[float] = None,
+    ) -> WithdrawalRequestResponse:
+        """Withdraw funds.
+
+        Args:
+            amount: Amount to withdraw in USDC (6 decimals). If None, withdraws
+                full balance.
+            wait: If True, waits for withdrawal to complete before returning
+            timeout: Seconds to wait for completion when `wait` is True
+                (default: no deadline)
+
+        Returns:
+            Dict containing withdrawal details including status, transaction hash, etc.
+        """
+        logger.info(f"Initiating withdrawal: amount={amount}, wait={wait}")
+        return (
+            await self._initiate_withdraw_and_wait(amount, timeout=timeout)
+            if wait
+            else await self._initiate_withdraw(amount)
+        )
+
+    async def _initiate_withdraw(
+        self, amount: Optional[int] = None
+    ) -> WithdrawalRequestResponse:
+        """Withdraw funds.
+
+        Args:
+            amount: Amount to withdraw in USDC (6 decimals). If None, withdraws
+                full balance.
+
+        Returns:
+            WithdrawalRequestResponse containing withdrawal request details
+        """
+        logger.info(f"Initiating withdrawal for amount: {amount}")
+        withdrawal = await self._post(
+            f"/v1/user/{self.address}/withdrawals",
+            params={"amount": amount} if amount else None,
+            model=WithdrawalRequestResponse,
+        )
+        logger.debug(f"Withdrawal initiated: {withdrawal}")
+        return withdrawal
+
+    async def get_withdrawal_status(
+        self, withdrawal_id: int
+    ) -> WithdrawalRequestResponse:
+        """Get status of a withdrawal.
+
+        Args:
+            withdrawal_id: ID of the withdrawal request
+
+        Returns:
+            WithdrawalRequestResponse containing withdrawal status, amount,
+            transaction hash, etc.
+        """
+        logger.info(f"Checking withdrawal status for ID: {withdrawal_id}")
+        status = await self._get(
+            f"/v1/user/{self.address}/withdrawals/{withdrawal_id}",
+            model=WithdrawalRequestResponse,
+        )
+        logger.debug(f"Withdrawal status: {status}")
+        return status
+
+    async def _initiate_withdraw_and_wait(
+        self, amount: Optional[int] = None, timeout: Optional[float] = None
+    ) -> WithdrawalRequestResponse:
+        """Initiate a withdrawal and wait for completion.
+
+        Args:
+            amount: Amount to withdraw in USDC (6 decimals). If None, withdraws
+                full balance.
+            timeout: Seconds to wait for completion (default: no deadline)
+
+        Returns:
+            WithdrawalRequestResponse containing final withdrawal status including
+            transaction hash if completed
+        """
+        logger.info(f"Initiating withdrawal with wait for amount: {amount}")
+        withdrawal = await self._initiate_withdraw(amount)
+
+        async def check() -> Optional[WithdrawalRequestResponse]:
+            status = await self.get_withdrawal_status(withdrawal.id)
+            logger.debug(f"Current withdrawal status: {status.status}")
+            if status.status in [
+                WithdrawalStatus.COMPLETED,
+                WithdrawalStatus.FAILED,
+            ]:
+                return status
+            return None
+
+        status = await async_wait_until(
+            check,
+            timeout=timeout,
+            initial=1.0,
+            maximum=10.0,
+            description=f"withdrawal {withdrawal.id}",
+        )
+        logger.info(f"Withdrawal completed with status: {status.status}")
+        return status
+
+    async def deposit(self, amount: int) -> str:
+        """Deposit funds.
+
+        The on-chain transactions are sent from a worker thread so the event loop
+        is not blocked while waiting for confirmations.
+        """
+        logger.info(f"Initiating deposit of {amount}")
+        if self.account is None:
+            raise ValueError("A private key is required to deposit funds")
+        tx_hash = await asyncio.to_thread(
+            deposit_onchain,
+            private_key=str(self.account.key.hex()),
+            deposit_amount=amount,
+        )
+        logger.info(f"Deposit transaction hash: {tx_hash}")
+        return tx_hash
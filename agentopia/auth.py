@@ -0,0 +1,38 @@
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Authorization headers of wallets that already authenticated, keyed by
+# (address, API URL) and shared by every client of the process.
+_auth_headers: Dict[Tuple[str, str], str] = {}
+_lock = threading.Lock()
+
+
+def get_cached_auth(address: str, api_url: str) -> Optional[str]:
+    """Get the cached Authorization header of a wallet for an API."""
+    with _lock:
+        return _auth_headers.get((address, api_url))
+
+
+def cache_auth(address: str, api_url: str, header: str) -> None:
+    """Cache the Authorization header of a wallet for an API."""
+    with _lock:
+        _auth_headers[(address, api_url)] = header
+
+
+def invalidate_auth(address: str, api_url: str, header: Optional[str] = None) -> None:
+    """Drop a cached Authorization header.
+
+    Args:
+        address: Wallet address
+        api_url: Base URL of the Agentopia API
+        header: Only drop the cached header if it is still this one, so a header
+            refreshed by another client is kept
+    """
+    with _lock:
+        key = (address, api_url)
+        if header is None or _auth_headers.get(key) == header:
+            logger.debug(f"Invalidating cached authentication of {address}")
+            _auth_headers.pop(key, None)
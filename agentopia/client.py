@@ -1,25 +1,40 @@
 import base64
 import logging
-import time
+import threading
 from decimal import Decimal
 from enum import Enum
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, Generic, Optional, Tuple, TypeVar
 
+import httpx
 import orjson
 import requests
 from eth_account import Account
 from eth_account.messages import encode_defunct
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from agentopia.api_key import APIKeyManager
+from agentopia.auth import cache_auth, get_cached_auth, invalidate_auth
 from agentopia.deposit import deposit_onchain
 from agentopia.hold import HoldManager
+from agentopia.pipeline import (
+    PipelineRequest,
+    RequestPipeline,
+    RetryPolicy,
+    default_middlewares,
+)
 from agentopia.service import ServiceManager
 from agentopia.settings import settings
+from agentopia.streaming import ServiceStream
+from agentopia.tracing import Tracer, get_tracer
+from agentopia.transport import build_limits, new_sync_client
 from agentopia.utility import Web3Address
+from agentopia.waiter import wait_until
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 def _json_default(obj):
     if isinstance(obj, Decimal):
@@ -27,6 +42,109 @@ def _json_default(obj):
     raise TypeError(f"Type is not JSON serializable: {type(obj)}")
 
 
+class _Envelope(BaseModel, Generic[T]):
+    """The `{"data": ...}` wrapper of API responses."""
+
+    data: T
+
+
+@lru_cache(maxsize=None)
+def _adapters(model) -> Tuple[TypeAdapter, TypeAdapter]:
+    """Validators of a response type, with and without the data envelope."""
+    return TypeAdapter(_Envelope[model]), TypeAdapter(model)
+
+
+def _not_enveloped(error: ValidationError) -> bool:
+    errors = error.errors()
+    return len(errors) == 1 and (
+        errors[0]["loc"] == ()
+        or (errors[0]["loc"] == ("data",) and errors[0]["type"] == "missing")
+    )
+
+
+def _decode_response(content: bytes, model: Any = None) -> Any:
+    """Decode the JSON body of an API response, unwrapping its data envelope.
+
+    Args:
+        content: Raw response body
+        model: Type to validate the data as, eg. `ServiceModel` or
+            `List[ServiceModel]`. The body is then parsed and validated in one
+            pass, without building intermediate dicts.
+
+    Returns:
+        The response data, as `model` if given
+    """
+    if model is None:
+        json_resp = orjson.loads(content)
+        if isinstance(json_resp, dict):
+            return json_resp.get("data", json_resp)
+        return json_resp
+    envelope, adapter = _adapters(model)
+    try:
+        return envelope.validate_json(content).data
+    except ValidationError as e:
+        if not _not_enveloped(e):
+            raise
+    return adapter.validate_json(content)
+
+
+def _encode_json(kwargs: Dict) -> None:
+    """Serialize the `json` argument of a request with orjson, in place."""
+    if "json" in kwargs:
+        kwargs["data"] = orjson.dumps(kwargs.pop("json"), default=_json_default)
+        kwargs["headers"] = {
+            **(kwargs.get("headers") or {}),
+            "Content-Type": "application/json",
+        }
+
+
+def _configure_chain(
+    micropayment_address: Optional[str] = None,
+    usdc_address: Optional[str] = None,
+    rpc: Optional[str] = None,
+    chain_id: Optional[int] = None,
+) -> None:
+    """Apply custom on-chain configuration to the global settings."""
+    if micropayment_address:
+        logger.debug(f"Setting custom micropayment address: {micropayment_address}")
+        settings.MICROPAYMENT_ADDRESS = micropayment_address
+    if usdc_address:
+        logger.debug(f"Setting custom USDC address: {usdc_address}")
+        settings.USDC_ADDRESS = usdc_address
+    if rpc:
+        logger.debug(f"Setting custom RPC: {rpc}")
+        settings.RPC = rpc
+    if chain_id:
+        logger.debug(f"Setting custom chain ID: {chain_id}")
+        settings.CHAIN_ID = chain_id
+
+
+def _wallet_auth_header(account, message: str, nonce) -> str:
+    """Sign the platform message with the wallet and build the Basic auth header.
+
+    Args:
+        account: eth_account LocalAccount used for signing
+        message: Message to sign as returned by the platform
+        nonce: Current nonce of the user
+
+    Returns:
+        Value for the Authorization header
+    """
+    # Get message to sign
+    message = f"{message}:{nonce}"
+    logger.debug(f"Message to sign: {message}")
+
+    # Sign message
+    message_hash = encode_defunct(text=message)
+    signed = account.sign_message(message_hash)
+    signature = signed.signature.hex()
+    logger.debug("Message signed successfully")
+
+    auth = f"{account.address}:{signature}"
+    auth_b64 = base64.b64encode(auth.encode("utf-8")).decode("utf-8")
+    return f"Basic {auth_b64}"
+
+
 class Balance(BaseModel):
     available_balance: int
     # left_to_settle: int
@@ -58,13 +176,37 @@ class Agentopia:
         usdc_address: Optional[str] = None,
         rpc: Optional[str] = None,
         chain_id: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        timeout: Optional[float] = None,
+        lazy: Optional[bool] = None,
+        tracer: Optional[Tracer] = None,
+        retry_policy: Optional[RetryPolicy] = None,
     ):
         """Initialize the Agentopia client.
 
+        Services called directly with `service.execute` share a pool of
+        persistent connections per origin, which is closed with `close()`.
+
+        With `lazy`, wallet authentication is performed on the first request
+        instead of in the constructor, so creating a client does no network I/O.
+
         Args:
             private_key: Ethereum private key for signing requests
             api_key: API key for authentication
             api_url: Base URL for the Agentopia API
+            max_connections: Maximum number of concurrent connections to services
+            max_keepalive_connections: Maximum number of idle keep-alive connections
+            keepalive_expiry: Seconds an idle connection is kept alive
+            http2: Whether to use HTTP/2 when the service supports it
+            timeout: Timeout in seconds for calls to services
+            lazy: Defer wallet authentication to the first request
+                (default: settings.AGENTOPIA_LAZY_AUTH)
+            tracer: Tracer of API requests and responses (default: get_tracer())
+            retry_policy: When and how to retry failed API requests
+                (default: RetryPolicy())
         """
         logger.info("Initializing Agentopia client")
         if api_url:
@@ -73,27 +215,37 @@ class Agentopia:
             self.api_url = settings.AGENTOPIA_API.rstrip("/")
         logger.debug(f"Using API URL: {self.api_url}")
 
+        self.tracer = tracer or get_tracer()
         self.session = requests.Session()
+        # external URLs get their own pooled session, without the auth header
+        self._external_session = requests.Session()
+        self._pipeline = RequestPipeline(
+            self._dispatch, default_middlewares(policy=retry_policy)
+        )
+        self._external_pipeline = RequestPipeline(
+            self._dispatch_external, default_middlewares(policy=retry_policy)
+        )
+        self._http_limits = build_limits(
+            max_connections, max_keepalive_connections, keepalive_expiry
+        )
+        self._http2 = http2
+        self._http_timeout = timeout
         private_key = private_key or settings.AGENTOPIA_USER_PRIVATE_KEY
-        if micropayment_address:
-            logger.debug(f"Setting custom micropayment address: {micropayment_address}")
-            settings.MICROPAYMENT_ADDRESS = micropayment_address
-        if usdc_address:
-            logger.debug(f"Setting custom USDC address: {usdc_address}")
-            settings.USDC_ADDRESS = usdc_address
-        if rpc:
-            logger.debug(f"Setting custom RPC: {rpc}")
-            settings.RPC = rpc
-        if chain_id:
-            logger.debug(f"Setting custom chain ID: {chain_id}")
-            settings.CHAIN_ID = chain_id
+        _configure_chain(micropayment_address, usdc_address, rpc, chain_id)
         api_key = api_key or settings.API_KEY
+        self.account = None
+        self._auth_lock = threading.RLock()
+        self._authenticating = False
+        lazy = settings.AGENTOPIA_LAZY_AUTH if lazy is None else lazy
 
         if private_key:
             logger.debug("Using private key authentication")
             self.account = Account.from_key(private_key)
             self.address = self.account.address
-            self._setup_wallet_auth()
+            if lazy:
+                logger.debug("Deferring wallet authentication to the first request")
+            else:
+                self._ensure_auth()
         elif api_key:
             logger.debug("Using API key authentication")
             self.session.headers["Authorization"] = f"Bearer {api_key}"
@@ -103,6 +255,33 @@ class Agentopia:
 
         logger.info("Agentopia client initialized successfully")
 
+    def __enter__(self) -> "Agentopia":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the API sessions and the pooled service connections."""
+        logger.debug("Closing Agentopia client")
+        if hasattr(self, "_hold_manager"):
+            self._hold_manager.close_pool()
+        self.session.close()
+        self._external_session.close()
+        if "_http" in self.__dict__:
+            self._http.close()
+            del self._http
+
+    @property
+    def http(self) -> httpx.Client:
+        """Get the pooled HTTP client used to call services directly."""
+        if "_http" not in self.__dict__:
+            logger.debug("Initializing pooled HTTP client")
+            self._http = new_sync_client(
+                limits=self._http_limits, http2=self._http2, timeout=self._http_timeout
+            )
+        return self._http
+
     @property
     def service(self) -> ServiceManager:
         """Get the service manager."""
@@ -128,7 +307,16 @@ class Agentopia:
         return self._api_key_manager
 
     def _setup_wallet_auth(self):
-        """Set up wallet-based authentication."""
+        """Set up wallet-based authentication.
+
+        The Authorization header is shared with every client of the process using
+        the same wallet and API URL, so only the first one signs in.
+        """
+        cached = get_cached_auth(self.address, self.api_url)
+        if cached:
+            logger.debug("Reusing cached wallet authentication")
+            self.session.headers["Authorization"] = cached
+            return
         logger.info("Setting up wallet authentication")
         # Get nonce for signing
         resp = self._get(f"/v1/user/{self.address}/nonce")
@@ -136,147 +324,192 @@ class Agentopia:
         nonce = resp["nonce"]
         resp = self._get("/v1/platform/message_to_sign")
         message = resp["message"]
-        # Get message to sign
-        message = f"{message}:{nonce}"
-        logger.debug(f"Message to sign: {message}")
-
-        # Sign message
-        message_hash = encode_defunct(text=message)
-        signed = self.account.sign_message(message_hash)
-        signature = signed.signature.hex()
-        logger.debug("Message signed successfully")
-
-        # Set auth header
-        auth = f"{self.address}:{signature}"
-        auth_bytes = auth.encode("utf-8")
-        auth_b64 = base64.b64encode(auth_bytes).decode("utf-8")
-        self.session.headers["Authorization"] = f"Basic {auth_b64}"
+        self.session.headers["Authorization"] = _wallet_auth_header(
+            self.account, message, nonce
+        )
+        cache_auth(self.address, self.api_url, self.session.headers["Authorization"])
         logger.info("Wallet authentication setup completed")
 
-    def _get(self, path: str, base_url: Optional[str] = None, **kwargs) -> Dict:
-        """Make GET request to API."""
-        logger.info(f"Making GET request to {base_url or self.api_url}{path}")
+    def _reauthenticate(self, rejected: str) -> None:
+        """Sign in again after the API rejected the Authorization header."""
+        with self._auth_lock:
+            if self.session.headers.get("Authorization") != rejected:
+                # another thread already signed in again
+                return
+            logger.info("Authorization rejected, re-authenticating")
+            invalidate_auth(self.address, self.api_url, rejected)
+            self.session.headers.pop("Authorization", None)
+            self._sign_in()
+
+    def _dispatch(self, request: PipelineRequest) -> requests.Response:
+        return self.session.request(request.method, request.url, **request.kwargs)
+
+    def _dispatch_external(self, request: PipelineRequest) -> requests.Response:
+        return self._external_session.request(
+            request.method, request.url, **request.kwargs
+        )
+
+    def _ensure_auth(self) -> None:
+        """Authenticate a lazy client, once, on its first request.
+
+        Concurrent first requests wait for the thread that signs in.
+        """
+        if self.account is None or "Authorization" in self.session.headers:
+            return
+        with self._auth_lock:
+            # the nonce and message requests of the sign in itself pass through here
+            if self._authenticating or "Authorization" in self.session.headers:
+                return
+            self._sign_in()
+
+    def _sign_in(self) -> None:
+        """Run the wallet sign in; the caller must hold the auth lock."""
+        self._authenticating = True
+        try:
+            self._setup_wallet_auth()
+        finally:
+            self._authenticating = False
+
+    def _send(
+        self, method: str, url: str, idempotent: Optional[bool] = None, **kwargs
+    ) -> requests.Response:
+        """Send an API request through the request pipeline, re-authenticating
+        once if the wallet auth expired."""
+        self._ensure_auth()
+        auth = self.session.headers.get("Authorization")
+        resp = self._pipeline(PipelineRequest(method, url, kwargs, idempotent))
+        if resp.status_code == 401 and self.account is not None and auth:
+            resp.close()
+            self._reauthenticate(auth)
+            resp = self._pipeline(PipelineRequest(method, url, kwargs, idempotent))
+        return resp
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        base_url: Optional[str] = None,
+        idempotent: Optional[bool] = None,
+        model: Any = None,
+        **kwargs,
+    ) -> Any:
+        """Make a request to the API, or to an external URL without auth header.
+
+        Requests go through the request pipeline: they get a timeout, are retried
+        with backoff when that is safe (see `RetryPolicy`) and fail fast while
+        the circuit breaker of the host is open.
+
+        The response data is returned as `model` when given (see
+        `_decode_response`), as plain JSON otherwise.
+        """
         url = f"{base_url or self.api_url}{path}"
-        headers = kwargs.pop("headers", {})
+        self.tracer.request(method, url, kwargs.get("json"))
+        _encode_json(kwargs)
         if base_url:
             logger.debug("Using external URL without auth header")
-            session = requests.Session()
-            session.headers.update(headers)
-            resp = session.get(url, **kwargs)
+            resp = self._external_pipeline(
+                PipelineRequest(method, url, kwargs, idempotent)
+            )
         else:
-            resp = self.session.get(url, headers=headers, **kwargs)
+            resp = self._send(method, url, idempotent=idempotent, **kwargs)
         try:
-            logger.debug(f"Response text: {resp.text}")
-            logger.debug(f"Response headers: {resp.headers}")
             resp.raise_for_status()
         except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error occurred in _get: {e}")
-            logger.debug(f"Response text: {resp.text}")
+            self.tracer.error(method, e, resp)
             raise e
-        json_resp = resp.json()
-        logger.debug(f"Parsed JSON response: {json_resp}")
-        return json_resp.get("data", json_resp)
-
-    def _post(self, path: str, base_url: Optional[str] = None, **kwargs) -> Dict:
-        """Make POST request to API."""
-        logger.info(f"Making POST request to {base_url or self.api_url}{path}")
-        if "json" in kwargs:
-            logger.debug(f"Request JSON payload: {kwargs['json']}")
-            kwargs["data"] = orjson.dumps(kwargs.pop("json"), default=_json_default)
-            kwargs["headers"] = {
-                **(kwargs.get("headers", {})),
-                "Content-Type": "application/json",
-            }
-        url = f"{base_url or self.api_url}{path}"
-        headers = kwargs.pop("headers", {})
-        if base_url:
-            logger.debug("Using external URL without auth header")
-            session = requests.Session()
-            session.headers.update(headers)
-            resp = session.post(url, **kwargs)
-        else:
-            resp = self.session.post(url, headers=headers, **kwargs)
+        self.tracer.response(resp)
+        return _decode_response(resp.content, model)
+
+    def _stream(self, method: str, path: str, **kwargs) -> ServiceStream:
+        """Make a request to the API whose response body is streamed."""
+        url = f"{self.api_url}{path}"
+        self.tracer.request(method, url, kwargs.get("json"))
+        _encode_json(kwargs)
+        resp = self._send(method, url, stream=True, **kwargs)
         try:
             resp.raise_for_status()
         except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error occurred in _post: {e}")
-            logger.debug(f"Response text: {resp.text}")
+            self.tracer.error(method, e, resp)
+            resp.close()
             raise e
-        json_resp = resp.json()
-        logger.debug(f"Parsed JSON response: {json_resp}")
-        return json_resp.get("data", json_resp)
+        return ServiceStream(
+            resp.iter_content(chunk_size=None),
+            resp.close,
+            resp.status_code,
+            resp.headers,
+        )
 
-    def _put(self, path: str, data=None, **kwargs) -> Dict:
-        """Make a PUT request to the API."""
-        logger.info(f"Making PUT request to {self.api_url}{path}")
-        if "json" in kwargs:
-            logger.debug(f"Request JSON payload: {kwargs['json']}")
-            kwargs["data"] = orjson.dumps(kwargs.pop("json"), default=_json_default)
-            kwargs["headers"] = {
-                **(kwargs.get("headers", {})),
-                "Content-Type": "application/json",
-            }
-            data = None
-            resp = self.session.put(f"{self.api_url}{path}", **kwargs)
-        else:
-            resp = self.session.put(f"{self.api_url}{path}", data=data, **kwargs)
+    def _get(self, path: str, base_url: Optional[str] = None, **kwargs) -> Any:
+        """Make GET request to API."""
+        return self._request("GET", path, base_url=base_url, **kwargs)
+
+    def _get_conditional(
+        self, path: str, etag: Optional[str] = None, model: Any = None, **kwargs
+    ) -> Tuple[Any, Optional[str]]:
+        """Make GET request to API, revalidating a cached response by its ETag.
+
+        Returns:
+            Tuple of the response data (None if not modified), as `model` if
+            given, and the ETag
+        """
+        self.tracer.request("GET", f"{self.api_url}{path}")
+        headers = kwargs.pop("headers", {})
+        if etag:
+            headers = {**headers, "If-None-Match": etag}
+        resp = self._send("GET", f"{self.api_url}{path}", headers=headers, **kwargs)
+        if resp.status_code == 304:
+            logger.debug(f"Not modified: {path}")
+            return None, etag
         try:
             resp.raise_for_status()
         except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error occurred in _put: {e}")
-            logger.debug(f"Response text: {resp.text}")
+            self.tracer.error("GET", e, resp)
             raise e
-        json_resp = resp.json()
-        logger.debug(f"Parsed JSON response: {json_resp}")
-        return json_resp.get("data", json_resp)
+        self.tracer.response(resp)
+        return _decode_response(resp.content, model), resp.headers.get("ETag")
 
-    def _delete(self, path: str, **kwargs) -> Dict:
-        """Make a DELETE request to the API."""
-        logger.info(f"Making DELETE request to {self.api_url}{path}")
-        if "json" in kwargs:
-            logger.debug(f"Request JSON payload: {kwargs['json']}")
-            kwargs["data"] = orjson.dumps(kwargs.pop("json"), default=_json_default)
-            kwargs["headers"] = {
-                **(kwargs.get("headers", {})),
-                "Content-Type": "application/json",
-            }
-        resp = self.session.delete(f"{self.api_url}{path}", **kwargs)
-        try:
-            resp.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            logger.info("+++++++++++++++++++")
-            logger.error(f"HTTP error occurred in _delete: {e}")
-            logger.info("+++++++++++++++++++")
-            logger.info(f"Response text: {resp.text}")
-            logger.info("+++++++++++++++++++")
+    def _post(self, path: str, base_url: Optional[str] = None, **kwargs) -> Any:
+        """Make POST request to API."""
+        return self._request("POST", path, base_url=base_url, **kwargs)
 
-            raise e
-        json_resp = resp.json()
-        logger.debug(f"Parsed JSON response: {json_resp}")
-        return json_resp.get("data", json_resp)
+    def _put(self, path: str, data=None, **kwargs) -> Any:
+        """Make a PUT request to the API."""
+        if "json" not in kwargs:
+            kwargs["data"] = data
+        return self._request("PUT", path, **kwargs)
+
+    def _delete(self, path: str, **kwargs) -> Any:
+        """Make a DELETE request to the API."""
+        return self._request("DELETE", path, **kwargs)
 
     def get_balance(self) -> Balance:
         """Get current balance."""
         logger.info("Getting balance")
-        balance = Balance(**self._get(f"/v1/user/{self.address}/balance"))
+        balance = self._get(f"/v1/user/{self.address}/balance", model=Balance)
         logger.debug(f"Current balance: {balance}")
         return balance
 
     def withdraw(
-        self, amount: Optional[int] = None, wait: bool = False
+        self,
+        amount: Optional[int] = None,
+        wait: bool = False,
+        timeout: Optional[float] = None,
     ) -> WithdrawalRequestResponse:
         """Withdraw funds.
 
         Args:
-            amount: Amount to withdraw in USDC (6 decimals). If None, withdraws full balance.
+            amount: Amount to withdraw in USDC (6 decimals). If None, withdraws
+                full balance.
             wait: If True, waits for withdrawal to complete before returning
+            timeout: Seconds to wait for completion when `wait` is True
+                (default: no deadline)
 
         Returns:
             Dict containing withdrawal details including status, transaction hash, etc.
         """
         logger.info(f"Initiating withdrawal: amount={amount}, wait={wait}")
         return (
-            self._initiate_withdraw_and_wait(amount)
+            self._initiate_withdraw_and_wait(amount, timeout=timeout)
             if wait
             else self._initiate_withdraw(amount)
         )
@@ -287,17 +520,18 @@ class Agentopia:
         """Withdraw funds.
 
         Args:
-            amount: Amount to withdraw in USDC (6 decimals). If None, withdraws full balance.
+            amount: Amount to withdraw in USDC (6 decimals). If None, withdraws
+                full balance.
 
         Returns:
             WithdrawalRequestResponse containing withdrawal request details
         """
         logger.info(f"Initiating withdrawal for amount: {amount}")
-        response = self._post(
+        withdrawal = self._post(
             f"/v1/user/{self.address}/withdrawals",
             params={"amount": amount} if amount else None,
+            model=WithdrawalRequestResponse,
         )
-        withdrawal = WithdrawalRequestResponse(**response)
         logger.debug(f"Withdrawal initiated: {withdrawal}")
         return withdrawal
 
@@ -308,38 +542,53 @@ class Agentopia:
             withdrawal_id: ID of the withdrawal request
 
         Returns:
-            WithdrawalRequestResponse containing withdrawal status, amount, transaction hash, etc.
+            WithdrawalRequestResponse containing withdrawal status, amount,
+            transaction hash, etc.
         """
         logger.info(f"Checking withdrawal status for ID: {withdrawal_id}")
-        response = self._get(f"/v1/user/{self.address}/withdrawals/{withdrawal_id}")
-        status = WithdrawalRequestResponse(**response)
+        status = self._get(
+            f"/v1/user/{self.address}/withdrawals/{withdrawal_id}",
+            model=WithdrawalRequestResponse,
+        )
         logger.debug(f"Withdrawal status: {status}")
         return status
 
     def _initiate_withdraw_and_wait(
-        self, amount: Optional[int] = None
+        self, amount: Optional[int] = None, timeout: Optional[float] = None
     ) -> WithdrawalRequestResponse:
         """Initiate a withdrawal and wait for completion.
 
         Args:
-            amount: Amount to withdraw in USDC (6 decimals). If None, withdraws full balance.
+            amount: Amount to withdraw in USDC (6 decimals). If None, withdraws
+                full balance.
+            timeout: Seconds to wait for completion (default: no deadline)
 
         Returns:
-            WithdrawalRequestResponse containing final withdrawal status including transaction hash if completed
+            WithdrawalRequestResponse containing final withdrawal status including
+            transaction hash if completed
         """
         logger.info(f"Initiating withdrawal with wait for amount: {amount}")
         withdrawal = self._initiate_withdraw(amount)
 
-        while True:
+        def check() -> Optional[WithdrawalRequestResponse]:
             status = self.get_withdrawal_status(withdrawal.id)
             logger.debug(f"Current withdrawal status: {status.status}")
             if status.status in [
                 WithdrawalStatus.COMPLETED,
                 WithdrawalStatus.FAILED,
             ]:
-                logger.info(f"Withdrawal completed with status: {status.status}")
                 return status
-            time.sleep(5)
+            return None
+
+        status = wait_until(
+            check,
+            timeout=timeout,
+            initial=1.0,
+            maximum=10.0,
+            description=f"withdrawal {withdrawal.id}",
+        )
+        logger.info(f"Withdrawal completed with status: {status.status}")
+        return status
 
     def deposit(self, amount: int) -> str:
         """Deposit funds."""
@@ -1,22 +1,131 @@
+import asyncio
 import logging
+import time
+import uuid
+import weakref
+from datetime import timezone
 from functools import wraps
-from typing import Callable
+from typing import AsyncIterator, Callable, Dict, MutableMapping, Optional
 
-import requests
+import httpx
+from dateutil import parser as date_parser
 from fastapi import HTTPException, status
 
-from agentopia.client import Agentopia
+from agentopia.async_client import AsyncAgentopia
+from agentopia.cache import TTLCache
 from agentopia.settings import settings
+from agentopia.settlement import HoldAlreadyClaimedError, get_settlement_queue
 
+# one client per event loop, as pooled async connections are bound to their loop
+_provider_clients: MutableMapping[
+    asyncio.AbstractEventLoop, AsyncAgentopia
+] = weakref.WeakKeyDictionary()
+# generators closing the client of their loop, the loop only references them weakly
+_provider_client_closers: MutableMapping[
+    asyncio.AbstractEventLoop, AsyncIterator[None]
+] = weakref.WeakKeyDictionary()
 
-def payable(hold_amount: int, hold_expires_in: int = 3600):
+verified_holds = TTLCache(
+    maxsize=settings.HOLD_VERIFY_CACHE_SIZE, ttl=settings.HOLD_VERIFY_CACHE_TTL
+)
+
+# holds that paid for a call of this process, a released hold never becomes
+# valid again so the entries do not expire, but the oldest are evicted once
+# HOLD_VERIFY_CACHE_SIZE holds are tracked: the check is per process and bounded,
+# the claims of deferred settlement and the API guard the other processes
+spent_holds = TTLCache(maxsize=settings.HOLD_VERIFY_CACHE_SIZE)
+
+
+def get_provider_client() -> AsyncAgentopia:
+    """Get the async Agentopia client shared by all `payable` endpoints.
+
+    The client is created on first use in the running event loop and
+    authenticates on its first request. It is closed when the loop shuts down
+    its async generators, as `asyncio.run` and uvicorn do before closing it.
+    """
+    loop = asyncio.get_running_loop()
+    client = _provider_clients.get(loop)
+    if client is None:
+        logging.debug("Creating Agentopia client")
+        client = _provider_clients[loop] = AsyncAgentopia()
+        closer = _provider_client_closers[loop] = _close_on_shutdown(client)
+        # the first step registers the generator with the loop
+        loop.create_task(closer.__anext__())
+    return client
+
+
+async def _close_on_shutdown(client: AsyncAgentopia) -> AsyncIterator[None]:
+    try:
+        yield
+    finally:
+        logging.debug("Closing Agentopia client")
+        await client.aclose()
+
+
+def _hold_expires_at(hold: Dict) -> Optional[float]:
+    """Unix time a hold expires at, or None if unknown."""
+    expires_at = hold.get("expires_at") if isinstance(hold, dict) else None
+    if expires_at:
+        try:
+            expires_at = date_parser.isoparse(str(expires_at))
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            return expires_at.timestamp()
+        except (ValueError, OverflowError):
+            logging.debug(f"Could not parse hold expiry: {expires_at}")
+    return None
+
+
+def _hold_ttl(hold: Dict) -> float:
+    """Seconds a verified hold may be served from the cache."""
+    ttl = settings.HOLD_VERIFY_CACHE_TTL
+    expires_at = _hold_expires_at(hold)
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    return ttl
+
+
+async def verify_hold(
+    client: AsyncAgentopia, hold_id: str, use_cache: bool = True
+) -> Dict:
+    """Get a hold, serving recently verified holds from the cache.
+
+    The cache is per process: a hold released by another process is only seen
+    as such once its entry expired.
+
+    Args:
+        client: Agentopia client
+        hold_id: ID of the hold
+        use_cache: Whether a recently verified hold may be served from the cache
+
+    Raises:
+        httpx.HTTPStatusError: If the hold could not be retrieved
+    """
+    hold = verified_holds.get(hold_id) if use_cache else None
+    if hold is None:
+        hold = await client.hold.get(hold_id)
+        ttl = _hold_ttl(hold)
+        if use_cache and ttl > 0:
+            verified_holds.set(hold_id, hold, ttl=ttl)
+    return hold
+
+
+def payable(
+    hold_amount: int, hold_expires_in: int = 3600, settlement: Optional[str] = None
+):
     """
     Decorator to make an endpoint require payment via Agentopia hold system.
 
     Args:
         hold_amount: Amount to hold in USDC (6 decimals)
         hold_expires_in: Hold expiration time in seconds (default 1 hour)
+        settlement: "sync" to release the hold before responding, or "deferred"
+            to queue the release for a background worker that settles in batches
+            (default: settings.SETTLEMENT_MODE)
     """
+    settlement = settlement or settings.SETTLEMENT_MODE
+    if settlement not in ("sync", "deferred"):
+        raise ValueError(f"Unsupported settlement mode: {settlement}")
 
     def decorator(func: Callable):
         @wraps(func)
@@ -43,27 +152,68 @@ def payable(hold_amount: int, hold_expires_in: int = 3600):
                     detail="A Agentopia `X-Hold-Id` header is required",
                 )
 
+            try:
+                x_hold_id = str(uuid.UUID(str(x_hold_id)))
+            except ValueError:
+                logging.warning(f"Malformed hold ID: {x_hold_id!r}")
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="The `X-Hold-Id` header must be a UUID",
+                )
+
             logging.debug(f"Received hold ID: {x_hold_id}")
 
-            # Create client instance
-            logging.debug("Creating Agentopia client")
-            client = Agentopia()
+            client = get_provider_client()
 
-            # Verify hold using hold manager
+            # Verify hold using hold manager, only deferred settlement claims the
+            # hold across processes so sync settlement asks the API every time
             logging.debug(f"Verifying hold {x_hold_id}")
             try:
-                x_hold = client.hold.get(x_hold_id)
+                x_hold = await verify_hold(
+                    client, x_hold_id, use_cache=settlement == "deferred"
+                )
                 logging.debug(f"Hold verification successful: {x_hold}")
-            except requests.exceptions.HTTPError:
+            except httpx.HTTPStatusError:
                 logging.error("Hold verification failed")
                 raise HTTPException(
                     status_code=status.HTTP_402_PAYMENT_REQUIRED,
                     detail="Invalid hold ID",
                 )
 
+            # a hold pays for a single call, claim it before running the endpoint
+            if x_hold_id in spent_holds:
+                logging.warning(f"Hold {x_hold_id} was already used")
+                raise HTTPException(
+                    status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                    detail="Hold already used",
+                )
+            spent_holds.set(x_hold_id, True)
+
+            if settlement == "deferred":
+                # the processes sharing the spool may all be handed the hold
+                expires_at = _hold_expires_at(x_hold)
+                if expires_at is None:
+                    expires_at = time.time() + hold_expires_in
+                queue = get_settlement_queue()
+                try:
+                    await asyncio.to_thread(queue.claim, x_hold_id, expires_at)
+                except HoldAlreadyClaimedError:
+                    logging.warning(f"Hold {x_hold_id} was already used")
+                    raise HTTPException(
+                        status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                        detail="Hold already used",
+                    )
+
             # Execute the actual endpoint
             logging.debug("Executing wrapped endpoint")
-            response = await func(*args, **kwargs)
+            try:
+                response = await func(*args, **kwargs)
+            except BaseException:
+                # nothing was charged, the hold can be used again
+                if settlement == "deferred":
+                    await asyncio.to_thread(queue.unclaim, x_hold_id)
+                spent_holds.pop(x_hold_id)
+                raise
 
             # Get amount used from headers if JSONResponse, otherwise default to 1
             amount_used = 1
@@ -74,13 +224,21 @@ def payable(hold_amount: int, hold_expires_in: int = 3600):
                     amount_used = int(response.headers["X-Usdc-Used"])
             logging.debug(f"Amount used: {amount_used}")
 
+            # a released hold can not be used again
+            verified_holds.pop(x_hold_id)
+            if settlement == "deferred":
+                logging.debug(f"Queueing release of hold {x_hold_id}")
+                await asyncio.to_thread(queue.submit, x_hold_id, amount_used)
+                return response
+
             # Release hold and charge user using hold manager
             logging.debug(f"Releasing hold {x_hold_id} with amount {amount_used}")
             try:
-                client.hold.release(hold_id=x_hold_id, amount=amount_used)
+                await client.hold.release(hold_id=x_hold_id, amount=amount_used)
                 logging.debug("Hold released successfully")
-            except requests.exceptions.HTTPError:
+            except httpx.HTTPStatusError:
                 logging.error("Failed to release hold")
+                spent_holds.pop(x_hold_id)
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Failed to process payment",
@@ -1,10 +1,17 @@
 import logging
-import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from eth_account import Account
+from pydantic import BaseModel
+from web3 import Web3
 
-from agentopia.services.web3_service import Contract
+from agentopia.services.abi_service import bundled_abi_path
+from agentopia.services.read_service import read_many
+from agentopia.services.web3_service import Contract, PKManager
 from agentopia.settings import settings
+from agentopia.waiter import wait_for_blocks
 
 logger = logging.getLogger(__name__)
 
@@ -12,59 +19,184 @@ logger = logging.getLogger(__name__)
 def get_micropayments_contract(micropayments_address):
     return Contract(
         contract_address=micropayments_address,
-        abi_path="./agentopia/abis/MicroPayment.json",
+        abi_path=bundled_abi_path("MicroPayment.json"),
     )
 
 
 def get_token_contract(token_address):
     return Contract(
         contract_address=token_address,
-        abi_path="./agentopia/abis/MockUSDC.json",
+        abi_path=bundled_abi_path("MockUSDC.json"),
     )
 
 
-def deposit_onchain(private_key: str, deposit_amount: int) -> str:
+class ApprovalFailedError(RuntimeError):
+    """The `approve` transaction of a deposit reverted."""
+
+
+class DepositResult(BaseModel):
+    index: int
+    address: str
+    amount: int
+    approve_tx_hash: Optional[str] = None
+    deposit_tx_hash: Optional[str] = None
+    gas_used: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def deposit_onchain(
+    private_key: str, deposit_amount: int, pipeline: bool = True
+) -> str:
     """Deposit USDC into Agentopia.
 
+    When an approval is needed, the `approve` and `deposit` transactions are signed
+    with consecutive nonces and sent back to back, so both are usually mined in
+    the same block.
+
     Args:
         private_key: Private key to sign transactions
         amount: Amount to deposit in USDC (6 decimals)
+        pipeline: Send the deposit without waiting for the approval to be mined
 
     Returns:
         Transaction details
+
+    Raises:
+        ApprovalFailedError: If the approval reverted
     """
+    _, deposit_receipt = _deposit(private_key, deposit_amount, pipeline)
+    return str(deposit_receipt)
+
+
+def _deposit(
+    private_key: str, deposit_amount: int, pipeline: bool = True
+) -> Tuple[Optional[Dict], Dict]:
     usdc_address = settings.USDC_ADDRESS
     micropayments_address = settings.MICROPAYMENT_ADDRESS
     logger.debug(f"USDC address: {usdc_address}")
     logger.debug(f"Micropayments address: {micropayments_address}")
     usdc = get_token_contract(usdc_address)
+    micropayments = get_micropayments_contract(micropayments_address)
     user_address = Account.from_key(private_key).address
+    # sign with this key only, other threads may be depositing from other wallets
+    usdc.pk_manager = micropayments.pk_manager = PKManager(private_key)
     # First approve USDC contract
     # Check and set allowance if needed
-    initial_allowance = usdc.read("allowance", user_address, micropayments_address)
+    initial_allowance, initial_contract_balance = read_many(
+        [
+            usdc.s("allowance", user_address, micropayments_address),
+            micropayments.s("balances", user_address),
+        ]
+    )
     logger.debug(f"Initial allowance: {initial_allowance}")
+    logger.debug(f"Initial contract balance: {initial_contract_balance}")
     assert initial_allowance is not None
 
+    approve_hash = None
+    approve_receipt = None
     if initial_allowance < deposit_amount:
-        usdc.pk_manager.set(private_key)
-        tx_hash = usdc.write("approve", micropayments_address, deposit_amount)
-        logger.debug(f"Transaction hash for allowance: {tx_hash}")
-
-        # Wait for allowance update
-        final_allowance = usdc.read("allowance", user_address, micropayments_address)
-        while final_allowance != deposit_amount:
-            time.sleep(1)
-            final_allowance = usdc.read(
-                "allowance", user_address, micropayments_address
+        approve_hash = usdc.send("approve", micropayments_address, deposit_amount)
+        logger.debug(f"Transaction hash for allowance: {approve_hash}")
+        if not pipeline:
+            approve_receipt = usdc.wait_for_receipt(approve_hash)
+            if approve_receipt["status"] == 0:
+                raise ApprovalFailedError(
+                    f"Approval {approve_hash} reverted, the deposit was not sent"
+                )
+            # Wait for allowance update, checking once per block
+            wait_for_blocks(
+                usdc.web3,
+                lambda: usdc.read("allowance", user_address, micropayments_address)
+                == deposit_amount,
+                description="allowance update",
             )
-            logger.debug(f"Waiting for allowance to update: {final_allowance}")
 
-    # Deposit USDC into micropayments contract
-    micropayments = get_micropayments_contract(micropayments_address)
-    micropayments.pk_manager.set(private_key)
-    initial_contract_balance = micropayments.read("balances", user_address)
-    logger.debug(f"Initial contract balance: {initial_contract_balance}")
+    # Deposit USDC into micropayments contract, the nonce after the approval
+    # makes sure it is not mined before it
+    deposit_hash = micropayments.send("deposit", deposit_amount)
+    logger.debug(f"Transaction hash for deposit: {deposit_hash}")
+    if approve_hash and pipeline:
+        approve_receipt = usdc.wait_for_receipt(approve_hash)
+        if approve_receipt["status"] == 0:
+            raise ApprovalFailedError(
+                f"Approval {approve_hash} reverted, so deposit {deposit_hash} will"
+                " revert too"
+            )
+    return approve_receipt, micropayments.wait_for_receipt(deposit_hash)
 
-    tx_hash = micropayments.write("deposit", deposit_amount)
-    logger.debug(f"Transaction hash for deposit: {tx_hash}")
-    return str(tx_hash)
+
+def _deposit_result(
+    index: int, private_key: str, amount: int, pipeline: bool
+) -> DepositResult:
+    result = DepositResult(
+        index=index, address=Account.from_key(private_key).address, amount=amount
+    )
+    try:
+        approve_receipt, deposit_receipt = _deposit(private_key, amount, pipeline)
+    except Exception as e:
+        logger.exception(f"Deposit {index} from {result.address} failed")
+        result.error = str(e)
+        return result
+
+    for receipt in (approve_receipt, deposit_receipt):
+        if receipt is not None:
+            result.gas_used += receipt["gasUsed"]
+    if approve_receipt is not None:
+        result.approve_tx_hash = Web3.to_hex(approve_receipt["transactionHash"])
+    result.deposit_tx_hash = Web3.to_hex(deposit_receipt["transactionHash"])
+    if deposit_receipt["status"] == 0:
+        result.error = f"Deposit transaction {result.deposit_tx_hash} reverted"
+    return result
+
+
+def deposit_many(
+    deposits: Iterable[Tuple[str, int]],
+    max_workers: Optional[int] = None,
+    pipeline: bool = True,
+) -> List[DepositResult]:
+    """Deposit USDC into Agentopia from many wallets at once.
+
+    Wallets are funded concurrently on a bounded worker pool sharing the RPC
+    connection pool, nonces are allocated locally per wallet and several
+    deposits of the same wallet run one after the other. A failed deposit does
+    not stop the others.
+
+    Args:
+        deposits: (private key, amount in USDC with 6 decimals) pairs
+        max_workers: Maximum number of wallets funded at the same time
+            (default: settings.DEPOSIT_MAX_WORKERS)
+        pipeline: Send each deposit without waiting for its approval to be mined
+
+    Returns:
+        Results in the order of the deposits, with transaction hashes, gas used
+        and errors
+    """
+    by_wallet: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    for index, (private_key, amount) in enumerate(deposits):
+        by_wallet[private_key].append((index, amount))
+
+    def deposit_wallet(private_key: str) -> List[DepositResult]:
+        return [
+            _deposit_result(index, private_key, amount, pipeline)
+            for index, amount in by_wallet[private_key]
+        ]
+
+    results: List[DepositResult] = []
+    with ThreadPoolExecutor(
+        max_workers=max_workers or settings.DEPOSIT_MAX_WORKERS
+    ) as executor:
+        for wallet_results in executor.map(deposit_wallet, by_wallet):
+            results.extend(wallet_results)
+    results.sort(key=lambda result: result.index)
+
+    failed = sum(not result.ok for result in results)
+    logger.info(
+        f"Deposited from {len(by_wallet)} wallets: {len(results) - failed} "
+        f"succeeded, {failed} failed, "
+        f"{sum(result.gas_used for result in results)} gas used"
+    )
+    return results
@@ -1,14 +1,398 @@
-from typing import Dict, Optional
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
 from uuid import UUID
 
+from pydantic import BaseModel
+
+from agentopia.settings import settings
 from agentopia.utility import dump_json
 
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, int, int]
+
+
+class HoldBatchResult(BaseModel):
+    index: int
+    hold_id: Optional[UUID] = None
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _create_body(hold: Dict) -> Dict:
+    return {
+        "service_id": hold["service_id"],
+        "amount": hold["amount"],
+        "expires_in": hold.get("expires_in", 300),
+    }
+
+
+def _release_body(release: Dict) -> Dict:
+    input_json = release.get("input_json")
+    result_json = release.get("result_json")
+    return {
+        "hold_id": release["hold_id"],
+        "amount": release["amount"],
+        "input_json": dump_json(input_json) if input_json else None,
+        "result_json": dump_json(result_json) if result_json else None,
+    }
+
+
+def _chunks(items: List[Dict], size: int) -> Iterator[Tuple[int, List[Dict]]]:
+    for offset in range(0, len(items), size):
+        yield offset, items[offset : offset + size]
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+def _batch_unsupported(error: Exception, probing: bool) -> bool:
+    """Whether a failed batch request means the API has no batch route.
+
+    Without the route, `DELETE /v1/hold/batch` reaches `/v1/hold/{hold_id}`,
+    which rejects "batch" as a hold ID with 422. A 422 only counts while the
+    route has not answered a batch yet, later it is a real validation error.
+    As it may be a validation error all along, only 404 and 405 are cached.
+    """
+    status_code = _status_code(error)
+    return status_code in (404, 405) or (probing and status_code == 422)
+
+
+def _single_result(hold_id: str, response: Any) -> Dict:
+    """Result entry of a single call, whatever the shape of its response."""
+    if isinstance(response, dict):
+        return {"hold_id": hold_id, **response}
+    return {"hold_id": hold_id, "result": response}
+
+
+def _batch_results(chunk: List[Dict], offset: int, response) -> List[HoldBatchResult]:
+    """Match the per-item results of a batch response with the request items."""
+    if isinstance(response, dict):
+        response = response.get("results", response.get("items"))
+    if not isinstance(response, list) or len(response) != len(chunk):
+        raise ValueError("Batch response does not match the request")
+    results = []
+    for index, (item, entry) in enumerate(zip(chunk, response), start=offset):
+        entry = entry if isinstance(entry, dict) else {"hold_id": entry}
+        results.append(
+            HoldBatchResult(
+                index=index,
+                hold_id=entry.get("hold_id", item.get("hold_id")),
+                result=None if entry.get("error") else entry,
+                error=entry.get("error"),
+            )
+        )
+    return results
+
+
+def _failed_results(chunk: List[Dict], offset: int, error) -> List[HoldBatchResult]:
+    return [
+        HoldBatchResult(index=index, hold_id=item.get("hold_id"), error=str(error))
+        for index, item in enumerate(chunk, start=offset)
+    ]
+
+
+class PooledHold(NamedTuple):
+    hold_id: UUID
+    expires_at: float
+
+
+class _HoldPoolBase:
+    """Bookkeeping shared by the sync and async hold pools.
+
+    Holds are kept per (service id, amount, expires in) and each one is handed out
+    at most once. Holds that would expire within `min_ttl` seconds are released
+    instead of being handed out.
+    """
+
+    def __init__(self, size: Optional[int] = None, min_ttl: Optional[float] = None):
+        self.size = settings.HOLD_POOL_SIZE if size is None else size
+        self.min_ttl = settings.HOLD_POOL_MIN_TTL if min_ttl is None else min_ttl
+        self._holds: Dict[PoolKey, Deque[PooledHold]] = defaultdict(deque)
+        self._refilling: Set[PoolKey] = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def usable(self, expires_in: int) -> bool:
+        """Whether holds with this lifetime live long enough to be pooled."""
+        return self.enabled and expires_in > self.min_ttl
+
+    def _take(self, key: PoolKey) -> Tuple[Optional[UUID], List[PooledHold]]:
+        """Pop a hold to hand out, along with the holds too close to expiry."""
+        deadline = time.monotonic() + self.min_ttl
+        expiring: List[PooledHold] = []
+        with self._lock:
+            holds = self._holds[key]
+            while holds:
+                hold = holds.popleft()
+                if hold.expires_at > deadline:
+                    self.hits += 1
+                    return hold.hold_id, expiring
+                logger.debug(f"Discarding hold {hold.hold_id} close to expiry")
+                expiring.append(hold)
+            self.misses += 1
+            return None, expiring
+
+    @staticmethod
+    def _releases(holds: List[PooledHold]) -> List[Dict]:
+        return [{"hold_id": hold.hold_id, "amount": 0} for hold in holds]
+
+    @staticmethod
+    def _log_failed(holds: List[PooledHold], results: List[HoldBatchResult]) -> None:
+        for hold, result in zip(holds, results):
+            if not result.ok:
+                logger.warning(
+                    f"Failed to release pooled hold {hold.hold_id}: {result.error}"
+                )
+
+    def _missing(self, key: PoolKey) -> int:
+        with self._lock:
+            return max(self.size - len(self._holds[key]), 0)
+
+    def _put(self, key: PoolKey, hold_id: UUID, expires_at: float) -> None:
+        with self._lock:
+            self._holds[key].append(PooledHold(hold_id, expires_at))
+
+    def _claim_refill(self, key: PoolKey) -> bool:
+        with self._lock:
+            if key in self._refilling or len(self._holds[key]) >= self.size:
+                return False
+            self._refilling.add(key)
+            return True
+
+    def _finish_refill(self, key: PoolKey) -> None:
+        with self._lock:
+            self._refilling.discard(key)
+
+    def _drain(self) -> Dict[PoolKey, Deque[PooledHold]]:
+        with self._lock:
+            holds, self._holds = self._holds, defaultdict(deque)
+            return holds
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(holds) for holds in self._holds.values())
+
+
+class HoldPool(_HoldPoolBase):
+    """Pre-created holds handed out to `ServiceManager.execute`.
+
+    Holds are refilled from a background thread so the hot path does not wait for
+    the hold creation round-trip.
+    """
+
+    def __init__(
+        self,
+        manager: "HoldManager",
+        size: Optional[int] = None,
+        min_ttl: Optional[float] = None,
+    ):
+        super().__init__(size, min_ttl)
+        self.manager = manager
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="agentopia-hold-pool"
+        )
+
+    def acquire(self, service_id: UUID, amount: int, expires_in: int) -> UUID:
+        """Hand out a pooled hold, creating one inline if the pool is empty.
+
+        Args:
+            service_id: ID of the service the hold is for
+            amount: Amount to hold in USDC (6 decimals)
+            expires_in: Hold expiration time in seconds
+
+        Returns:
+            Hold ID
+        """
+        key = (str(service_id), amount, expires_in)
+        hold_id, expiring = self._take(key)
+        if expiring:
+            self._executor.submit(self._release, expiring)
+        self._schedule_refill(key)
+        if hold_id is None:
+            hold_id = self.manager.create(service_id, amount, expires_in)
+        return hold_id
+
+    def _schedule_refill(self, key: PoolKey) -> None:
+        if self._claim_refill(key):
+            self._executor.submit(self._refill, key)
+
+    def _refill(self, key: PoolKey) -> None:
+        service_id, amount, expires_in = key
+        try:
+            hold = {
+                "service_id": service_id,
+                "amount": amount,
+                "expires_in": expires_in,
+            }
+            expires_at = time.monotonic() + expires_in
+            for result in self.manager.create_many([hold] * self._missing(key)):
+                if result.ok:
+                    self._put(key, result.hold_id, expires_at)
+                else:
+                    logger.warning(f"Failed to create pooled hold: {result.error}")
+        except Exception:
+            logger.exception(f"Failed to refill hold pool for service {service_id}")
+        finally:
+            self._finish_refill(key)
+
+    def _release(self, holds: List[PooledHold]) -> None:
+        try:
+            self._log_failed(holds, self.manager.release_many(self._releases(holds)))
+        except Exception:
+            logger.exception(f"Failed to release {len(holds)} pooled holds")
+
+    def close(self, release: bool = True) -> None:
+        """Stop refilling and release the holds that were never handed out."""
+        self._executor.shutdown(wait=True)
+        holds = [hold for holds in self._drain().values() for hold in holds]
+        if release and holds:
+            self._release(holds)
+
+
+class AsyncHoldPool(_HoldPoolBase):
+    """Pre-created holds handed out to `AsyncServiceManager.execute`.
+
+    Holds are refilled by background tasks on the running event loop.
+    """
+
+    def __init__(
+        self,
+        manager: "AsyncHoldManager",
+        size: Optional[int] = None,
+        min_ttl: Optional[float] = None,
+    ):
+        super().__init__(size, min_ttl)
+        self.manager = manager
+        self._tasks: Set[asyncio.Task] = set()
+        # releases are awaited on close rather than cancelled, not to leak holds
+        self._releasing: Set[asyncio.Task] = set()
+
+    async def acquire(self, service_id: UUID, amount: int, expires_in: int) -> UUID:
+        """Hand out a pooled hold, creating one inline if the pool is empty.
+
+        Args:
+            service_id: ID of the service the hold is for
+            amount: Amount to hold in USDC (6 decimals)
+            expires_in: Hold expiration time in seconds
+
+        Returns:
+            Hold ID
+        """
+        key = (str(service_id), amount, expires_in)
+        hold_id, expiring = self._take(key)
+        if expiring:
+            task = asyncio.create_task(self._release(expiring))
+            self._releasing.add(task)
+            task.add_done_callback(self._releasing.discard)
+        if self._claim_refill(key):
+            task = asyncio.create_task(self._refill(key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if hold_id is None:
+            hold_id = await self.manager.create(service_id, amount, expires_in)
+        return hold_id
+
+    async def _refill(self, key: PoolKey) -> None:
+        service_id, amount, expires_in = key
+        try:
+            hold = {
+                "service_id": service_id,
+                "amount": amount,
+                "expires_in": expires_in,
+            }
+            expires_at = time.monotonic() + expires_in
+            results = await self.manager.create_many([hold] * self._missing(key))
+            for result in results:
+                if result.ok:
+                    self._put(key, result.hold_id, expires_at)
+                else:
+                    logger.warning(f"Failed to create pooled hold: {result.error}")
+        except Exception:
+            logger.exception(f"Failed to refill hold pool for service {service_id}")
+        finally:
+            self._finish_refill(key)
+
+    async def close(self, release: bool = True) -> None:
+        """Stop refilling and release the holds that were never handed out."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        holds = [hold for holds in self._drain().values() for hold in holds]
+        if release and holds:
+            await self._release(holds)
+        await asyncio.gather(*self._releasing, return_exceptions=True)
+
+    async def _release(self, holds: List[PooledHold]) -> None:
+        try:
+            results = await self.manager.release_many(self._releases(holds))
+            self._log_failed(holds, results)
+        except Exception:
+            logger.exception(f"Failed to release {len(holds)} pooled holds")
+
 
 class HoldManager:
     """Hold management for Agentopia"""
 
     def __init__(self, client):
         self.client = client
+        # None until the first batch request tells whether the API has the route
+        self._batch_supported: Optional[bool] = None
+
+    @property
+    def pool(self) -> HoldPool:
+        """Get the pool of pre-created holds (sized by settings.HOLD_POOL_SIZE)."""
+        if not hasattr(self, "_pool"):
+            self._pool = HoldPool(self)
+        return self._pool
+
+    def close_pool(self) -> None:
+        """Close the hold pool, releasing its holds. A new one is created on use."""
+        pool = self.__dict__.pop("_pool", None)
+        if pool is not None:
+            pool.close()
+
+    def acquire(self, service_id: UUID, amount: int, expires_in: int = 300) -> UUID:
+        """Get a hold for a service call, from the hold pool when enabled.
+
+        Args:
+            service_id: ID of the service to create hold for
+            amount: Amount to hold in USDC (6 decimals)
+            expires_in: Hold expiration time in seconds (default: 300)
+
+        Returns:
+            Hold ID
+        """
+        if self.pool.usable(expires_in):
+            return self.pool.acquire(service_id, amount, expires_in)
+        return self.create(service_id, amount, expires_in)
 
     def create(self, service_id: UUID, amount: int, expires_in: int = 300) -> UUID:
         """Create a new hold.
@@ -63,16 +447,379 @@ class HoldManager:
                 "input_json": dump_json(input_json) if input_json else None,
                 "result_json": dump_json(result_json) if result_json else None,
             },
+            # charges the hold, a retry after a lost response could charge twice
+            idempotent=False,
+        )
+
+    def create_many(
+        self,
+        holds: List[Dict],
+        batch_size: Optional[int] = None,
+        max_workers: int = 8,
+    ) -> List[HoldBatchResult]:
+        """Create many holds with one request per batch.
+
+        Falls back to concurrent single `create` calls when the API has no batch
+        route.
+
+        Args:
+            holds: List of dicts with service_id, amount and optional expires_in
+            batch_size: Maximum number of holds per request
+                (default: settings.HOLD_BATCH_SIZE)
+            max_workers: Number of concurrent requests in fallback mode
+
+        Returns:
+            Per-item results in the order of `holds`, with the hold ID or the error
+        """
+        items = [_create_body(hold) for hold in holds]
+
+        def create_one(item: Dict) -> Dict:
+            return {"hold_id": self.create(**item)}
+
+        return self._run_batches(
+            items,
+            lambda chunk: self.client._post("/v1/hold/batch", json=chunk),
+            create_one,
+            batch_size,
+            max_workers,
+        )
+
+    def release_many(
+        self,
+        releases: List[Dict],
+        batch_size: Optional[int] = None,
+        max_workers: int = 8,
+    ) -> List[HoldBatchResult]:
+        """Release many holds with one request per batch.
+
+        Falls back to concurrent single `release` calls when the API has no batch
+        route.
+
+        Args:
+            releases: List of dicts with hold_id, amount and optional input_json
+                and result_json
+            batch_size: Maximum number of holds per request
+                (default: settings.HOLD_BATCH_SIZE)
+            max_workers: Number of concurrent requests in fallback mode
+
+        Returns:
+            Per-item results in the order of `releases`
+        """
+        items = [_release_body(release) for release in releases]
+
+        def release_one(item: Dict) -> Dict:
+            response = self.client._delete(
+                f"/v1/hold/{item['hold_id']}",
+                json={k: v for k, v in item.items() if k != "hold_id"},
+                idempotent=False,
+            )
+            return _single_result(item["hold_id"], response)
+
+        return self._run_batches(
+            items,
+            lambda chunk: self.client._delete(
+                "/v1/hold/batch", json=chunk, idempotent=False
+            ),
+            release_one,
+            batch_size,
+            max_workers,
         )
 
+    def _run_batches(
+        self,
+        items: List[Dict],
+        send_batch: Callable[[List[Dict]], Any],
+        send_one: Callable[[Dict], Dict],
+        batch_size: Optional[int],
+        max_workers: int,
+    ) -> List[HoldBatchResult]:
+        results: List[HoldBatchResult] = []
+        # set when a probe was answered with 422, for this call only
+        single_calls = False
+        for offset, chunk in _chunks(items, batch_size or settings.HOLD_BATCH_SIZE):
+            if self._batch_supported is not False and not single_calls:
+                try:
+                    results.extend(_batch_results(chunk, offset, send_batch(chunk)))
+                    self._batch_supported = True
+                    continue
+                except Exception as e:
+                    if not _batch_unsupported(e, self._batch_supported is None):
+                        logger.error(f"Batch request failed: {e}")
+                        results.extend(_failed_results(chunk, offset, e))
+                        continue
+                    if _status_code(e) == 422:
+                        logger.warning(
+                            "Batch hold request rejected with 422, using single "
+                            f"calls in case the API has no batch route: {e}"
+                        )
+                        single_calls = True
+                    else:
+                        logger.info(
+                            "Batch hold route not available, using single calls"
+                        )
+                        self._batch_supported = False
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(send_one, item) for item in chunk]
+            for index, (item, future) in enumerate(zip(chunk, futures), start=offset):
+                try:
+                    entry = future.result()
+                    results.append(
+                        HoldBatchResult(
+                            index=index, hold_id=entry.get("hold_id"), result=entry
+                        )
+                    )
+                except Exception as e:
+                    results.extend(_failed_results([item], index, e))
+        return results
+
     def split(self, hold_id: UUID, split_details: list[Dict]) -> Dict:
         """Split an existing hold into multiple new holds.
 
         Args:
             hold_id: UUID of the hold to split
-            split_details: List of dicts containing service_id and amount for each new hold
+            split_details: List of dicts containing service_id and amount for each
+                new hold
 
         Returns:
             Dict containing original hold and new holds
         """
         return self.client._post(f"/v1/hold/{hold_id}/split", json=split_details)
+
+
+class AsyncHoldManager:
+    """Async hold management for Agentopia"""
+
+    def __init__(self, client):
+        self.client = client
+        # None until the first batch request tells whether the API has the route
+        self._batch_supported: Optional[bool] = None
+
+    @property
+    def pool(self) -> AsyncHoldPool:
+        """Get the pool of pre-created holds (sized by settings.HOLD_POOL_SIZE)."""
+        if not hasattr(self, "_pool"):
+            self._pool = AsyncHoldPool(self)
+        return self._pool
+
+    async def close_pool(self) -> None:
+        """Close the hold pool, releasing its holds. A new one is created on use."""
+        pool = self.__dict__.pop("_pool", None)
+        if pool is not None:
+            await pool.close()
+
+    async def acquire(
+        self, service_id: UUID, amount: int, expires_in: int = 300
+    ) -> UUID:
+        """Get a hold for a service call, from the hold pool when enabled.
+
+        Args:
+            service_id: ID of the service to create hold for
+            amount: Amount to hold in USDC (6 decimals)
+            expires_in: Hold expiration time in seconds (default: 300)
+
+        Returns:
+            Hold ID
+        """
+        if self.pool.usable(expires_in):
+            return await self.pool.acquire(service_id, amount, expires_in)
+        return await self.create(service_id, amount, expires_in)
+
+    async def create(
+        self, service_id: UUID, amount: int, expires_in: int = 300
+    ) -> UUID:
+        """Create a new hold.
+
+        Args:
+            service_id: ID of the service to create hold for
+            amount: Amount to hold in USDC (6 decimals)
+            expires_in: Hold expiration time in seconds (default: 300)
+
+        Returns:
+            Hold ID
+        """
+        response = await self.client._post(
+            "/v1/hold",
+            json={"service_id": service_id, "amount": amount, "expires_in": expires_in},
+        )
+        return response["hold_id"]
+
+    async def get(self, hold_id: UUID) -> Dict:
+        """Get details of a specific hold.
+
+        Args:
+            hold_id: UUID of the hold to retrieve
+
+        Returns:
+            Hold details
+        """
+        return await self.client._get(f"/v1/hold/{hold_id}")
+
+    async def release(
+        self,
+        hold_id: UUID,
+        amount: int,
+        input_json: Optional[Dict] = None,
+        result_json: Optional[Dict] = None,
+    ) -> Dict:
+        """Release a hold and charge the specified amount.
+
+        Args:
+            hold_id: UUID of the hold to release
+            amount: Amount to charge from the hold in USDC (6 decimals)
+            input_json: Optional input data to store with transaction
+            result_json: Optional result data to store with transaction
+
+        Returns:
+            Response indicating success
+        """
+        return await self.client._delete(
+            f"/v1/hold/{hold_id}",
+            json={
+                "amount": amount,
+                "input_json": dump_json(input_json) if input_json else None,
+                "result_json": dump_json(result_json) if result_json else None,
+            },
+            # charges the hold, a retry after a lost response could charge twice
+            idempotent=False,
+        )
+
+    async def create_many(
+        self,
+        holds: List[Dict],
+        batch_size: Optional[int] = None,
+        max_concurrency: int = 8,
+    ) -> List[HoldBatchResult]:
+        """Create many holds with one request per batch.
+
+        Falls back to concurrent single `create` calls when the API has no batch
+        route.
+
+        Args:
+            holds: List of dicts with service_id, amount and optional expires_in
+            batch_size: Maximum number of holds per request
+                (default: settings.HOLD_BATCH_SIZE)
+            max_concurrency: Number of concurrent requests in fallback mode
+
+        Returns:
+            Per-item results in the order of `holds`, with the hold ID or the error
+        """
+        items = [_create_body(hold) for hold in holds]
+
+        async def create_one(item: Dict) -> Dict:
+            return {"hold_id": await self.create(**item)}
+
+        return await self._run_batches(
+            items,
+            lambda chunk: self.client._post("/v1/hold/batch", json=chunk),
+            create_one,
+            batch_size,
+            max_concurrency,
+        )
+
+    async def release_many(
+        self,
+        releases: List[Dict],
+        batch_size: Optional[int] = None,
+        max_concurrency: int = 8,
+    ) -> List[HoldBatchResult]:
+        """Release many holds with one request per batch.
+
+        Falls back to concurrent single `release` calls when the API has no batch
+        route.
+
+        Args:
+            releases: List of dicts with hold_id, amount and optional input_json
+                and result_json
+            batch_size: Maximum number of holds per request
+                (default: settings.HOLD_BATCH_SIZE)
+            max_concurrency: Number of concurrent requests in fallback mode
+
+        Returns:
+            Per-item results in the order of `releases`
+        """
+        items = [_release_body(release) for release in releases]
+
+        async def release_one(item: Dict) -> Dict:
+            response = await self.client._delete(
+                f"/v1/hold/{item['hold_id']}",
+                json={k: v for k, v in item.items() if k != "hold_id"},
+                idempotent=False,
+            )
+            return _single_result(item["hold_id"], response)
+
+        return await self._run_batches(
+            items,
+            lambda chunk: self.client._delete(
+                "/v1/hold/batch", json=chunk, idempotent=False
+            ),
+            release_one,
+            batch_size,
+            max_concurrency,
+        )
+
+    async def _run_batches(
+        self,
+        items: List[Dict],
+        send_batch: Callable[[List[Dict]], Awaitable[Any]],
+        send_one: Callable[[Dict], Awaitable[Dict]],
+        batch_size: Optional[int],
+        max_concurrency: int,
+    ) -> List[HoldBatchResult]:
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def limited(item: Dict) -> Dict:
+            async with semaphore:
+                return await send_one(item)
+
+        results: List[HoldBatchResult] = []
+        # set when a probe was answered with 422, for this call only
+        single_calls = False
+        for offset, chunk in _chunks(items, batch_size or settings.HOLD_BATCH_SIZE):
+            if self._batch_supported is not False and not single_calls:
+                try:
+                    response = await send_batch(chunk)
+                    results.extend(_batch_results(chunk, offset, response))
+                    self._batch_supported = True
+                    continue
+                except Exception as e:
+                    if not _batch_unsupported(e, self._batch_supported is None):
+                        logger.error(f"Batch request failed: {e}")
+                        results.extend(_failed_results(chunk, offset, e))
+                        continue
+                    if _status_code(e) == 422:
+                        logger.warning(
+                            "Batch hold request rejected with 422, using single "
+                            f"calls in case the API has no batch route: {e}"
+                        )
+                        single_calls = True
+                    else:
+                        logger.info(
+                            "Batch hold route not available, using single calls"
+                        )
+                        self._batch_supported = False
+            entries = await asyncio.gather(
+                *[limited(item) for item in chunk], return_exceptions=True
+            )
+            for index, (item, entry) in enumerate(zip(chunk, entries), start=offset):
+                if isinstance(entry, BaseException):
+                    results.extend(_failed_results([item], index, entry))
+                    continue
+                results.append(
+                    HoldBatchResult(
+                        index=index, hold_id=entry.get("hold_id"), result=entry
+                    )
+                )
+        return results
+
+    async def split(self, hold_id: UUID, split_details: list[Dict]) -> Dict:
+        """Split an existing hold into multiple new holds.
+
+        Args:
+            hold_id: UUID of the hold to split
+            split_details: List of dicts containing service_id and amount for each
+                new hold
+
+        Returns:
+            Dict containing original hold and new holds
+        """
+        return await self.client._post(f"/v1/hold/{hold_id}/split", json=split_details)
@@ -0,0 +1,401 @@
+import asyncio
+import email.utils
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+
+from agentopia.settings import settings
+from agentopia.waiter import backoff_delays
+
+logger = logging.getLogger(__name__)
+
+# methods that can be sent again without changing the result (RFC 9110), except
+# for a DELETE with a body, like the release of a hold charging an amount
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# request arguments carrying a body
+BODY_KWARGS = ("json", "data", "content", "files")
+# status codes worth retrying an idempotent request on
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# errors raised before the request reached the server, safe to retry for any method
+CONNECT_ERRORS = (requests.ConnectTimeout, httpx.ConnectError, httpx.ConnectTimeout)
+# errors after which the request may or may not have been processed
+TRANSPORT_ERRORS = (requests.ConnectionError, requests.Timeout, httpx.TransportError)
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request to a host that keeps failing."""
+
+
+class PipelineRequest:
+    """A request travelling through the pipeline."""
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        kwargs: Optional[Dict[str, Any]] = None,
+        idempotent: Optional[bool] = None,
+    ):
+        self.method = method.upper()
+        self.url = url
+        self.kwargs = kwargs or {}
+        if idempotent is None:
+            idempotent = self.method in IDEMPOTENT_METHODS and not (
+                self.method == "DELETE"
+                and any(self.kwargs.get(key) is not None for key in BODY_KWARGS)
+            )
+        self.idempotent = idempotent
+        self.attempt = 0
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.url).netloc
+
+
+Handler = Callable[[PipelineRequest], Any]
+Middleware = Callable[[PipelineRequest, Handler], Any]
+AsyncHandler = Callable[[PipelineRequest], Awaitable[Any]]
+AsyncMiddleware = Callable[[PipelineRequest, AsyncHandler], Awaitable[Any]]
+
+
+class CircuitBreaker:
+    """Stops sending requests to a host after consecutive failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    requests fail fast with CircuitOpenError. Once `reset_timeout` seconds have
+    passed, a single trial request is let through: its success closes the
+    circuit, its failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+    ):
+        self.failure_threshold = (
+            failure_threshold or settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        )
+        self.reset_timeout = (
+            settings.CIRCUIT_BREAKER_RESET_TIMEOUT
+            if reset_timeout is None
+            else reset_timeout
+        )
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(
+                        f"Opening circuit after {self._failures} consecutive failures"
+                    )
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+    def record_abort(self) -> None:
+        """A request ended without telling whether the host is healthy.
+
+        Frees the trial slot of a half-open circuit for the next request.
+        """
+        with self._lock:
+            self._trial = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(host: str) -> CircuitBreaker:
+    """Get the process-wide circuit breaker of a host."""
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker()
+        return breaker
+
+
+def _is_failure(response) -> bool:
+    return response.status_code >= 500
+
+
+def retry_after(response) -> Optional[float]:
+    """Seconds to wait according to the Retry-After header of a response."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """When to retry a request and how long to wait before the next attempt.
+
+    Idempotent requests are retried on transport errors and on 429, 502, 503 and
+    504 responses. Other requests are only retried when they could not have
+    been processed: the connection failed, or the server answered 429 or 503
+    with a Retry-After header.
+    """
+
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+    ):
+        self.max_attempts = max_attempts or settings.API_RETRY_ATTEMPTS
+        self.backoff = settings.API_RETRY_BACKOFF if backoff is None else backoff
+        self.max_backoff = max_backoff or settings.API_RETRY_MAX_BACKOFF
+
+    def retry_response(self, request: PipelineRequest, response) -> bool:
+        if request.attempt >= self.max_attempts:
+            return False
+        if request.idempotent:
+            return response.status_code in RETRY_STATUSES
+        return response.status_code in (429, 503) and (
+            retry_after(response) is not None
+        )
+
+    def retry_error(self, request: PipelineRequest, error: Exception) -> bool:
+        if request.attempt >= self.max_attempts:
+            return False
+        if isinstance(error, CONNECT_ERRORS):
+            return True
+        return request.idempotent and isinstance(error, TRANSPORT_ERRORS)
+
+    def delays(self):
+        return backoff_delays(self.backoff, self.max_backoff)
+
+    def delay(self, delays, response=None) -> float:
+        """Next backoff delay, or the server's Retry-After when longer."""
+        delay = next(delays)
+        server_delay = retry_after(response) if response is not None else None
+        if server_delay is not None:
+            delay = max(delay, min(server_delay, settings.API_RETRY_AFTER_MAX))
+        return delay
+
+
+def timeout_middleware(timeout: Optional[float] = None) -> Middleware:
+    """Give every request a timeout (default: settings.API_TIMEOUT)."""
+
+    def middleware(request: PipelineRequest, call_next: Handler):
+        request.kwargs.setdefault("timeout", timeout or settings.API_TIMEOUT)
+        return call_next(request)
+
+    return middleware
+
+
+def circuit_breaker_middleware() -> Middleware:
+    """Fail fast on hosts whose circuit breaker is open."""
+
+    def middleware(request: PipelineRequest, call_next: Handler):
+        breaker = get_circuit_breaker(request.host)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {request.host}")
+        try:
+            response = call_next(request)
+        except TRANSPORT_ERRORS:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # e.g. decoding errors or cancellation, which say nothing of the host
+            breaker.record_abort()
+            raise
+        if _is_failure(response):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    return middleware
+
+
+def retry_middleware(policy: Optional[RetryPolicy] = None) -> Middleware:
+    """Retry with jittered exponential backoff, honoring Retry-After."""
+    policy = policy or RetryPolicy()
+
+    def middleware(request: PipelineRequest, call_next: Handler):
+        delays = policy.delays()
+        while True:
+            request.attempt += 1
+            try:
+                response = call_next(request)
+            except Exception as e:
+                if not policy.retry_error(request, e):
+                    raise
+                delay = policy.delay(delays)
+                logger.warning(f"{request.method} {request.url} failed ({e})")
+            else:
+                if not policy.retry_response(request, response):
+                    return response
+                delay = policy.delay(delays, response)
+                logger.warning(
+                    f"{request.method} {request.url} got {response.status_code}"
+                )
+                # give the connection of a streamed response back to the pool
+                response.close()
+            logger.info(f"Retrying in {delay:.2f}s (attempt {request.attempt})")
+            time.sleep(delay)
+
+    return middleware
+
+
+class RequestPipeline:
+    """Chain of middlewares around the function that sends a request.
+
+    The first middleware is the outermost one.
+    """
+
+    def __init__(self, send: Handler, middlewares: Sequence[Middleware]):
+        self.send = send
+        self.middlewares: List[Middleware] = list(middlewares)
+
+    def __call__(self, request: PipelineRequest):
+        handler = self.send
+        for middleware in reversed(self.middlewares):
+            handler = _bind(middleware, handler)
+        return handler(request)
+
+
+def _bind(middleware, call_next):
+    return lambda request: middleware(request, call_next)
+
+
+def default_middlewares(
+    timeout: Optional[float] = None, policy: Optional[RetryPolicy] = None
+) -> List[Middleware]:
+    """Timeout, then retries, with the circuit breaker checked on every attempt."""
+    return [
+        timeout_middleware(timeout),
+        retry_middleware(policy),
+        circuit_breaker_middleware(),
+    ]
+
+
+def async_timeout_middleware(timeout: Optional[float] = None) -> AsyncMiddleware:
+    """Async variant of `timeout_middleware`."""
+
+    async def middleware(request: PipelineRequest, call_next: AsyncHandler):
+        request.kwargs.setdefault("timeout", timeout or settings.API_TIMEOUT)
+        return await call_next(request)
+
+    return middleware
+
+
+def async_circuit_breaker_middleware() -> AsyncMiddleware:
+    """Async variant of `circuit_breaker_middleware`."""
+
+    async def middleware(request: PipelineRequest, call_next: AsyncHandler):
+        breaker = get_circuit_breaker(request.host)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {request.host}")
+        try:
+            response = await call_next(request)
+        except TRANSPORT_ERRORS:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # e.g. decoding errors or cancellation, which say nothing of the host
+            breaker.record_abort()
+            raise
+        if _is_failure(response):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    return middleware
+
+
+def async_retry_middleware(policy: Optional[RetryPolicy] = None) -> AsyncMiddleware:
+    """Async variant of `retry_middleware`."""
+    policy = policy or RetryPolicy()
+
+    async def middleware(request: PipelineRequest, call_next: AsyncHandler):
+        delays = policy.delays()
+        while True:
+            request.attempt += 1
+            try:
+                response = await call_next(request)
+            except Exception as e:
+                if not policy.retry_error(request, e):
+                    raise
+                delay = policy.delay(delays)
+                logger.warning(f"{request.method} {request.url} failed ({e})")
+            else:
+                if not policy.retry_response(request, response):
+                    return response
+                delay = policy.delay(delays, response)
+                logger.warning(
+                    f"{request.method} {request.url} got {response.status_code}"
+                )
+                await response.aclose()
+            logger.info(f"Retrying in {delay:.2f}s (attempt {request.attempt})")
+            await asyncio.sleep(delay)
+
+    return middleware
+
+
+class AsyncRequestPipeline:
+    """Async variant of `RequestPipeline`."""
+
+    def __init__(self, send: AsyncHandler, middlewares: Sequence[AsyncMiddleware]):
+        self.send = send
+        self.middlewares: List[AsyncMiddleware] = list(middlewares)
+
+    async def __call__(self, request: PipelineRequest):
+        handler = self.send
+        for middleware in reversed(self.middlewares):
+            handler = _bind(middleware, handler)
+        return await handler(request)
+
+
+def default_async_middlewares(
+    timeout: Optional[float] = None, policy: Optional[RetryPolicy] = None
+) -> List[AsyncMiddleware]:
+    """Async variant of `default_middlewares`."""
+    return [
+        async_timeout_middleware(timeout),
+        async_retry_middleware(policy),
+        async_circuit_breaker_middleware(),
+    ]
@@ -1,16 +1,35 @@
+import threading
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, List, Optional, Union
+from typing import (
+    Dict,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    overload,
+)
 from uuid import UUID
 
 import httpx
+import orjson
 from pydantic import BaseModel
 
+from agentopia.cache import CacheStats, TTLCache
+from agentopia.settings import settings
+from agentopia.streaming import AsyncServiceStream, ServiceStream
 from agentopia.utility import USDCAmount, Web3Address
 
 
-class ServiceModel(BaseModel):
-    """Pydantic model for Service"""
+class ServiceSummary(BaseModel):
+    """Service without its `api_schema`.
+
+    Validating a response as a summary skips the OpenAPI document entirely, so
+    no nested dicts are built for it. Use it where the schema is not needed.
+    """
 
     id: UUID
     name: str
@@ -22,7 +41,6 @@ class ServiceModel(BaseModel):
     app_url: Optional[str] = None
     logo_url: Optional[str] = None
     readme_url: Optional[str] = None
-    api_schema: Optional[Dict] = None
     is_active: bool = True
     service_provider_id: Web3Address
     is_public: bool = False
@@ -31,25 +49,247 @@ class ServiceModel(BaseModel):
     tags: Optional[list[str]] = None
 
 
+class ServiceModel(ServiceSummary):
+    """Pydantic model for Service"""
+
+    api_schema: Optional[Dict] = None
+
+
+class ServiceCacheStats(CacheStats):
+    revalidations: int = 0
+
+
+class _CachedService(NamedTuple):
+    service: ServiceSummary
+    etag: Optional[str]
+
+
+class ServiceCache:
+    """In-process registry of recently fetched services keyed by slug and id.
+
+    Services are handed out as copies, so callers may modify them freely.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, maxsize: Optional[int] = None):
+        """Initialize the service cache.
+
+        Args:
+            ttl: Seconds a service is served from the cache before being revalidated
+                (default: settings.SERVICE_CACHE_TTL, 0 revalidates every time)
+            maxsize: Maximum number of cached entries, 0 disables the cache
+                (default: settings.SERVICE_CACHE_SIZE)
+        """
+        self.ttl = settings.SERVICE_CACHE_TTL if ttl is None else ttl
+        self._cache = TTLCache(
+            maxsize=settings.SERVICE_CACHE_SIZE if maxsize is None else maxsize,
+            ttl=self.ttl,
+        )
+        self._revalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.maxsize > 0
+
+    def get(
+        self, key: Tuple[str, str], model: Type[ServiceSummary] = ServiceSummary
+    ) -> Optional[ServiceSummary]:
+        """Get a fresh cached service by ("slug", slug) or ("id", id) key.
+
+        A summary is not returned when a full `ServiceModel` is asked for.
+        """
+        entry = self._cache.get(key)
+        if entry is None or not isinstance(entry.service, model):
+            return None
+        return entry.service.model_copy(deep=True)
+
+    def etag(
+        self, key: Tuple[str, str], model: Type[ServiceSummary] = ServiceSummary
+    ) -> Optional[str]:
+        """Get the ETag of a cached service, even if it has expired."""
+        entry = self._cache.peek(key)
+        if entry is None or not isinstance(entry.service, model):
+            return None
+        return entry.etag
+
+    def store(self, service: ServiceSummary, etag: Optional[str] = None) -> None:
+        """Cache a copy of a service under both its slug and its id."""
+        entry = _CachedService(service.model_copy(deep=True), etag)
+        self._cache.set(("slug", service.slug), entry)
+        self._cache.set(("id", str(service.id)), entry)
+
+    def refresh(self, key: Tuple[str, str]) -> Optional[ServiceSummary]:
+        """Mark a cached service as fresh again after a 304 Not Modified."""
+        entry = self._cache.peek(key)
+        if entry is None:
+            return None
+        self._revalidations += 1
+        self._cache.set(("slug", entry.service.slug), entry)
+        self._cache.set(("id", str(entry.service.id)), entry)
+        return entry.service.model_copy(deep=True)
+
+    def invalidate(
+        self, slug: Optional[str] = None, service_id: Optional[UUID] = None
+    ) -> None:
+        """Drop a service from the cache, or everything if no key is given."""
+        if slug is None and service_id is None:
+            self._cache.clear()
+            return
+        id_ = None if service_id is None else str(service_id)
+        # scan the entries, as either key of a service may have been evicted alone
+        for key, entry in self._cache.items():
+            if (
+                key in (("slug", slug), ("id", id_))
+                or entry.service.slug == slug
+                or str(entry.service.id) == id_
+            ):
+                self._cache.pop(key)
+
+    @property
+    def stats(self) -> ServiceCacheStats:
+        return ServiceCacheStats(
+            **self._cache.stats.model_dump(), revalidations=self._revalidations
+        )
+
+
+_service_caches: Dict[str, ServiceCache] = {}
+_service_caches_lock = threading.Lock()
+
+
+def get_service_cache(api_url: str) -> ServiceCache:
+    """Get the process-wide service cache of an Agentopia API."""
+    with _service_caches_lock:
+        cache = _service_caches.get(api_url)
+        if cache is None:
+            cache = _service_caches[api_url] = ServiceCache()
+        return cache
+
+
+def _service_model(include_schema: bool) -> Type[ServiceSummary]:
+    return ServiceModel if include_schema else ServiceSummary
+
+
+def _register_payload(tags: Optional[List[str]] = None, **fields) -> Dict:
+    """Build the request body for registering a service."""
+    if tags is not None:
+        fields["tags"] = tags
+    return fields
+
+
+def _drop_none(**fields) -> Dict:
+    """Build a partial update body from the fields that were provided."""
+    return {k: v for k, v in fields.items() if v is not None}
+
+
+def _direct_call_target(
+    service: ServiceSummary, hold_id, endpoint_path: str, kwargs: Dict
+) -> Tuple[str, Dict]:
+    """Build the URL and headers for calling a service's base URL directly.
+
+    Pops any caller supplied ``headers`` out of ``kwargs`` and merges them with the
+    ``X-Hold-Id`` header.
+
+    Args:
+        service: Service being called
+        hold_id: Hold created for this call
+        endpoint_path: The path of the endpoint to call
+        kwargs: Request keyword arguments passed to ``execute``
+
+    Returns:
+        Tuple of the full URL and the request headers
+    """
+    # Set header with hold ID
+    headers = {"X-Hold-Id": str(hold_id)}
+    headers.update(kwargs.pop("headers", None) or {})
+
+    endpoint_path = (
+        endpoint_path if endpoint_path.startswith("/") else f"/{endpoint_path}"
+    )
+    base_url = service.base_url
+    # this is for testing locally
+    if "http://agentopia_services" in base_url:
+        base_url = base_url.replace("agentopia_services", "localhost")
+    return f"{base_url}{endpoint_path}", headers
+
+
+# arguments of httpx `request()` that `send()` takes instead of `build_request()`
+_SEND_KWARGS = ("auth", "follow_redirects")
+
+
+def _stream_request(
+    http: httpx.Client, method: str, url: str, headers: Dict, kwargs: Dict
+) -> httpx.Response:
+    """Send a request whose body is streamed, raising for error statuses."""
+    send_kwargs = {key: kwargs.pop(key) for key in _SEND_KWARGS if key in kwargs}
+    request = http.build_request(method, url, headers=headers, **kwargs)
+    response = http.send(request, stream=True, **send_kwargs)
+    if response.is_error:
+        response.read()
+        response.close()
+        response.raise_for_status()
+    return response
+
+
+async def _astream_request(
+    http: httpx.AsyncClient, method: str, url: str, headers: Dict, kwargs: Dict
+) -> httpx.Response:
+    """Async variant of `_stream_request`."""
+    send_kwargs = {key: kwargs.pop(key) for key in _SEND_KWARGS if key in kwargs}
+    request = http.build_request(method, url, headers=headers, **kwargs)
+    response = await http.send(request, stream=True, **send_kwargs)
+    if response.is_error:
+        await response.aread()
+        await response.aclose()
+        response.raise_for_status()
+    return response
+
+
 class ServiceManager:
     """Service management for Agentopia"""
 
     def __init__(self, client):
         self.client = client
+        self.cache = get_service_cache(client.api_url)
+
+    def _fetch(
+        self, key: Tuple[str, str], path: str, model: Type[ServiceSummary]
+    ) -> ServiceSummary:
+        """Get a service through the cache, revalidating stale entries by ETag."""
+        if not self.cache.enabled:
+            return self.client._get(path, model=model)
+        service = self.cache.get(key, model)
+        if service is not None:
+            return service
+        service, etag = self.client._get_conditional(
+            path, self.cache.etag(key, model), model=model
+        )
+        if service is None:
+            service = self.cache.refresh(key)
+            if service is not None:
+                return service
+            service, etag = self.client._get_conditional(path, model=model)
+        self.cache.store(service, etag)
+        return service
 
     def execute_via_proxy(
-        self, service_slug: str, endpoint_path: str, method: str, **kwargs
-    ) -> Dict:
+        self,
+        service_slug: str,
+        endpoint_path: str,
+        method: str,
+        stream: bool = False,
+        **kwargs,
+    ) -> Union[Dict, ServiceStream]:
         """Execute a service by calling its endpoint through the Agentopia proxy.
 
         Args:
             service_slug: The unique identifier for the service
             endpoint_path: The path of the endpoint to call
             method: HTTP method to use (GET or POST)
+            stream: Return the response as it arrives instead of decoding it
             **kwargs: Additional arguments to pass to the request (e.g. json, params)
 
         Returns:
-            The response from the service endpoint
+            The response from the service endpoint, or a ServiceStream over its
+            server-sent events or raw chunks with `stream`
         """
         # Call the execute endpoint with the appropriate method
         # get the hold amount and hold expires in from the service
@@ -66,6 +306,14 @@ class ServiceManager:
         # headers = {"X-Hold-Id": str(hold_id)}
 
         # execute the service
+        if stream:
+            if method.upper() not in ("GET", "POST"):
+                raise ValueError(f"Unsupported HTTP method: {method}")
+            return self.client._stream(
+                method.upper(),
+                f"/v1/execute/service/{service_slug}/{endpoint_path}",
+                **kwargs,
+            )
         if method.upper() == "GET":
             return self.client._get(
                 f"/v1/execute/service/{service_slug}/{endpoint_path}", **kwargs
@@ -78,63 +326,57 @@ class ServiceManager:
             raise ValueError(f"Unsupported HTTP method: {method}")
 
     def execute(
-        self, service_slug: str, endpoint_path: str, method: str, **kwargs
-    ) -> Dict:
+        self,
+        service_slug: str,
+        endpoint_path: str,
+        method: str,
+        stream: bool = False,
+        **kwargs,
+    ) -> Union[Dict, ServiceStream]:
         """Execute a service by calling its endpoint through the Agentopia proxy.
 
         Args:
             service_slug: The unique identifier for the service
             endpoint_path: The path of the endpoint to call
             method: HTTP method to use (GET or POST)
+            stream: Return the response as it arrives instead of decoding it
             **kwargs: Additional arguments to pass to the request (e.g. json, params)
 
         Returns:
-            The response from the service endpoint
+            The response from the service endpoint, or a ServiceStream over its
+            server-sent events or raw chunks with `stream`
         """
-        # Call the execute endpoint with the appropriate method
+        if method.upper() not in ("GET", "POST"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
         # get the hold amount and hold expires in from the service
-        service: ServiceModel = self.get_by_slug(service_slug)
+        service = self.get_by_slug(service_slug, include_schema=False)
         hold_amount = service.default_hold_amount
         hold_expires_in = service.default_hold_expires_in
 
-        # create a hold
-        hold_id = self.client.hold.create(
+        # get a hold, from the hold pool when enabled
+        hold_id = self.client.hold.acquire(
             service.id, int(Decimal(str(hold_amount))), hold_expires_in
         )
 
-        # Set header with hold ID
-        headers = {"X-Hold-Id": str(hold_id)}
-        if "headers" in kwargs:
-            headers.update(kwargs["headers"])
-            del kwargs["headers"]
-
-        endpoint_path = (
-            endpoint_path if endpoint_path.startswith("/") else f"/{endpoint_path}"
-        )
-        # this is for testing locally
-        if "http://agentopia_services" in service.base_url:
-            service.base_url = service.base_url.replace(
-                "agentopia_services", "localhost"
+        url, headers = _direct_call_target(service, hold_id, endpoint_path, kwargs)
+        if stream:
+            response = _stream_request(
+                self.client.http, method.upper(), url, headers, kwargs
             )
-        # execute the service by calling base URL directly
-        if method.upper() == "GET":
-            with httpx.Client() as client:
-                response = client.get(
-                    f"{service.base_url}{endpoint_path}", headers=headers, **kwargs
-                )
-                response.raise_for_status()
-                return response.json()
-
-        elif method.upper() == "POST":
-            with httpx.Client() as client:
-                response = client.post(
-                    f"{service.base_url}{endpoint_path}", headers=headers, **kwargs
-                )
-                response.raise_for_status()
-                return response.json()
-
-        else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
+            return ServiceStream(
+                response.iter_bytes(),
+                response.close,
+                response.status_code,
+                response.headers,
+                hold_id,
+            )
+        # execute the service by calling base URL directly over pooled connections
+        response = self.client.http.request(
+            method.upper(), url, headers=headers, **kwargs
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
 
     def register(
         self,
@@ -157,7 +399,8 @@ class ServiceManager:
             description: Description of what the service does
             base_url: Base URL where the service is hosted
             slug: URL-friendly identifier for the service
-            default_hold_amount: Default amount to hold for service calls in USDC (6 decimals)
+            default_hold_amount: Default amount to hold for service calls in USDC
+                (6 decimals)
             default_hold_expires_in: Default hold expiration time in seconds
             app_url: Optional URL to the service's web application
             logo_url: Optional URL to the service's logo
@@ -168,23 +411,20 @@ class ServiceManager:
         Returns:
             Created service details as a Service object
         """
-        data = {
-            "name": name,
-            "description": description,
-            "base_url": base_url,
-            "slug": slug,
-            "default_hold_amount": default_hold_amount,
-            "default_hold_expires_in": default_hold_expires_in,
-            "app_url": app_url,
-            "logo_url": logo_url,
-            "readme_url": readme_url,
-            "api_schema": api_schema,
-        }
-        if tags is not None:
-            data["tags"] = tags
-
-        response = self.client._post("/v1/service", json=data)
-        return ServiceModel(**response)
+        data = _register_payload(
+            name=name,
+            description=description,
+            base_url=base_url,
+            slug=slug,
+            default_hold_amount=default_hold_amount,
+            default_hold_expires_in=default_hold_expires_in,
+            app_url=app_url,
+            logo_url=logo_url,
+            readme_url=readme_url,
+            api_schema=api_schema,
+            tags=tags,
+        )
+        return self.client._post("/v1/service", json=data, model=ServiceModel)
 
     def update(
         self,
@@ -221,27 +461,23 @@ class ServiceManager:
         Returns:
             Updated service details as ServiceModel
         """
-        data = {
-            k: v
-            for k, v in {
-                "name": name,
-                "description": description,
-                "base_url": base_url,
-                "default_hold_amount": default_hold_amount,
-                "default_hold_expires_in": default_hold_expires_in,
-                "is_active": is_active,
-                "app_url": app_url,
-                "logo_url": logo_url,
-                "readme_url": readme_url,
-                "api_schema": api_schema,
-                "tags": tags,
-                "is_public": is_public,
-            }.items()
-            if v is not None
-        }
-
-        response = self.client._put(f"/v1/service/{slug}", json=data)
-        return ServiceModel(**response)
+        data = _drop_none(
+            name=name,
+            description=description,
+            base_url=base_url,
+            default_hold_amount=default_hold_amount,
+            default_hold_expires_in=default_hold_expires_in,
+            is_active=is_active,
+            app_url=app_url,
+            logo_url=logo_url,
+            readme_url=readme_url,
+            api_schema=api_schema,
+            tags=tags,
+            is_public=is_public,
+        )
+        service = self.client._put(f"/v1/service/{slug}", json=data, model=ServiceModel)
+        self.cache.invalidate(slug=slug, service_id=service.id)
+        return service
 
     def update_path(
         self,
@@ -263,51 +499,402 @@ class ServiceManager:
         Returns:
             Updated path details
         """
-        data = {}
-        if hold_amount is not None:
-            data["hold_amount"] = hold_amount
-        if hold_expires_in is not None:
-            data["hold_expires_in"] = hold_expires_in
+        data = _drop_none(hold_amount=hold_amount, hold_expires_in=hold_expires_in)
+        response = self.client._put(
+            f"/v1/service/{slug}/path/{path}?method={method}", json=data
+        )
+        self.cache.invalidate(slug=slug)
+        return response
+
+    @overload
+    def get_by_slug(
+        self, slug: str, include_schema: Literal[True] = ...
+    ) -> ServiceModel:
+        ...
+
+    @overload
+    def get_by_slug(self, slug: str, include_schema: bool) -> ServiceSummary:
+        ...
+
+    def get_by_slug(self, slug: str, include_schema: bool = True) -> ServiceSummary:
+        """Get service details by slug.
+
+        Args:
+            slug: Service slug identifier
+            include_schema: Whether to parse the service's `api_schema`
 
-        return self.client._put(
+        Returns:
+            Service details as ServiceModel. With `include_schema=False`, as
+            ServiceSummary, or as the cached ServiceModel when there is one
+        """
+        return self._fetch(
+            ("slug", slug), f"/v1/service/slug/{slug}", _service_model(include_schema)
+        )
+
+    @overload
+    def get(
+        self, service_id: UUID, include_schema: Literal[True] = ...
+    ) -> ServiceModel:
+        ...
+
+    @overload
+    def get(self, service_id: UUID, include_schema: bool) -> ServiceSummary:
+        ...
+
+    def get(self, service_id: UUID, include_schema: bool = True) -> ServiceSummary:
+        """Get service details by ID.
+
+        Args:
+            service_id: Service UUID
+            include_schema: Whether to parse the service's `api_schema`
+
+        Returns:
+            Service details as ServiceModel. With `include_schema=False`, as
+            ServiceSummary, or as the cached ServiceModel when there is one
+        """
+        return self._fetch(
+            ("id", str(service_id)),
+            f"/v1/service/{service_id}",
+            _service_model(include_schema),
+        )
+
+    @overload
+    def search(
+        self, query: str, limit: int = 10, include_schema: Literal[True] = ...
+    ) -> List[ServiceModel]:
+        ...
+
+    @overload
+    def search(
+        self, query: str, limit: int = 10, include_schema: bool = ...
+    ) -> List[ServiceSummary]:
+        ...
+
+    def search(
+        self, query: str, limit: int = 10, include_schema: bool = True
+    ) -> Union[List[ServiceModel], List[ServiceSummary]]:
+        """Search for services.
+
+        Args:
+            query: Search query string
+            limit: Maximum number of results to return (default: 10, max 10)
+            include_schema: Whether to parse the `api_schema` of the services
+
+        Returns:
+            List of matching service details as ServiceModel, or as
+            ServiceSummary with `include_schema=False`
+        """
+        return self.client._get(
+            "/v1/service/search",
+            params={"query": query, "limit": min(limit, 10)},
+            model=List[ServiceModel] if include_schema else List[ServiceSummary],
+        )
+
+
+class AsyncServiceManager:
+    """Async service management for Agentopia"""
+
+    def __init__(self, client):
+        self.client = client
+        self.cache = get_service_cache(client.api_url)
+
+    async def _fetch(
+        self, key: Tuple[str, str], path: str, model: Type[ServiceSummary]
+    ) -> ServiceSummary:
+        """Get a service through the cache, revalidating stale entries by ETag."""
+        if not self.cache.enabled:
+            return await self.client._get(path, model=model)
+        service = self.cache.get(key, model)
+        if service is not None:
+            return service
+        service, etag = await self.client._get_conditional(
+            path, self.cache.etag(key, model), model=model
+        )
+        if service is None:
+            service = self.cache.refresh(key)
+            if service is not None:
+                return service
+            service, etag = await self.client._get_conditional(path, model=model)
+        self.cache.store(service, etag)
+        return service
+
+    async def execute_via_proxy(
+        self,
+        service_slug: str,
+        endpoint_path: str,
+        method: str,
+        stream: bool = False,
+        **kwargs,
+    ) -> Union[Dict, AsyncServiceStream]:
+        """Execute a service by calling its endpoint through the Agentopia proxy.
+
+        Args:
+            service_slug: The unique identifier for the service
+            endpoint_path: The path of the endpoint to call
+            method: HTTP method to use (GET or POST)
+            stream: Return the response as it arrives instead of decoding it
+            **kwargs: Additional arguments to pass to the request (e.g. json, params)
+
+        Returns:
+            The response from the service endpoint, or an AsyncServiceStream over
+            its server-sent events or raw chunks with `stream`
+        """
+        if stream:
+            if method.upper() not in ("GET", "POST"):
+                raise ValueError(f"Unsupported HTTP method: {method}")
+            return await self.client._stream(
+                method.upper(),
+                f"/v1/execute/service/{service_slug}/{endpoint_path}",
+                **kwargs,
+            )
+        if method.upper() == "GET":
+            return await self.client._get(
+                f"/v1/execute/service/{service_slug}/{endpoint_path}", **kwargs
+            )
+        elif method.upper() == "POST":
+            return await self.client._post(
+                f"/v1/execute/service/{service_slug}/{endpoint_path}", **kwargs
+            )
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+    async def execute(
+        self,
+        service_slug: str,
+        endpoint_path: str,
+        method: str,
+        stream: bool = False,
+        **kwargs,
+    ) -> Union[Dict, AsyncServiceStream]:
+        """Execute a service by creating a hold and calling its base URL directly.
+
+        The call to the service goes through the client's pooled HTTP connections.
+
+        Args:
+            service_slug: The unique identifier for the service
+            endpoint_path: The path of the endpoint to call
+            method: HTTP method to use (GET or POST)
+            stream: Return the response as it arrives instead of decoding it
+            **kwargs: Additional arguments to pass to the request (e.g. json, params)
+
+        Returns:
+            The response from the service endpoint, or an AsyncServiceStream over
+            its server-sent events or raw chunks with `stream`
+        """
+        if method.upper() not in ("GET", "POST"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        # get the hold amount and hold expires in from the service
+        service = await self.get_by_slug(service_slug, include_schema=False)
+        hold_id = await self.client.hold.acquire(
+            service.id,
+            int(Decimal(str(service.default_hold_amount))),
+            service.default_hold_expires_in,
+        )
+
+        url, headers = _direct_call_target(service, hold_id, endpoint_path, kwargs)
+        if stream:
+            response = await _astream_request(
+                self.client.http, method.upper(), url, headers, kwargs
+            )
+            return AsyncServiceStream(
+                response.aiter_bytes(),
+                response.aclose,
+                response.status_code,
+                response.headers,
+                hold_id,
+            )
+        response = await self.client.http.request(
+            method.upper(), url, headers=headers, **kwargs
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    async def register(
+        self,
+        name: str,
+        description: str,
+        base_url: str,
+        slug: str,
+        default_hold_amount: Union[Decimal, int],
+        default_hold_expires_in: int,
+        app_url: Optional[str] = None,
+        logo_url: Optional[str] = None,
+        readme_url: Optional[str] = None,
+        api_schema: Optional[Dict] = None,
+        tags: Optional[List[str]] = None,
+    ) -> ServiceModel:
+        """Create a new service.
+
+        See `ServiceManager.register` for the description of the arguments.
+
+        Returns:
+            Created service details as a Service object
+        """
+        data = _register_payload(
+            name=name,
+            description=description,
+            base_url=base_url,
+            slug=slug,
+            default_hold_amount=default_hold_amount,
+            default_hold_expires_in=default_hold_expires_in,
+            app_url=app_url,
+            logo_url=logo_url,
+            readme_url=readme_url,
+            api_schema=api_schema,
+            tags=tags,
+        )
+        return await self.client._post("/v1/service", json=data, model=ServiceModel)
+
+    async def update(
+        self,
+        slug: str,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        base_url: Optional[str] = None,
+        default_hold_amount: Optional[Decimal] = None,
+        default_hold_expires_in: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        app_url: Optional[str] = None,
+        logo_url: Optional[str] = None,
+        readme_url: Optional[str] = None,
+        api_schema: Optional[Dict] = None,
+        tags: Optional[List[str]] = None,
+        is_public: Optional[bool] = None,
+    ) -> ServiceModel:
+        """Update an existing service.
+
+        See `ServiceManager.update` for the description of the arguments.
+
+        Returns:
+            Updated service details as ServiceModel
+        """
+        data = _drop_none(
+            name=name,
+            description=description,
+            base_url=base_url,
+            default_hold_amount=default_hold_amount,
+            default_hold_expires_in=default_hold_expires_in,
+            is_active=is_active,
+            app_url=app_url,
+            logo_url=logo_url,
+            readme_url=readme_url,
+            api_schema=api_schema,
+            tags=tags,
+            is_public=is_public,
+        )
+        service = await self.client._put(
+            f"/v1/service/{slug}", json=data, model=ServiceModel
+        )
+        self.cache.invalidate(slug=slug, service_id=service.id)
+        return service
+
+    async def update_path(
+        self,
+        slug: str,
+        path: str,
+        method: str,
+        hold_amount: Optional[Decimal] = None,
+        hold_expires_in: Optional[int] = None,
+    ) -> Dict:
+        """Update service path configuration.
+
+        See `ServiceManager.update_path` for the description of the arguments.
+
+        Returns:
+            Updated path details
+        """
+        data = _drop_none(hold_amount=hold_amount, hold_expires_in=hold_expires_in)
+        response = await self.client._put(
             f"/v1/service/{slug}/path/{path}?method={method}", json=data
         )
+        self.cache.invalidate(slug=slug)
+        return response
+
+    @overload
+    async def get_by_slug(
+        self, slug: str, include_schema: Literal[True] = ...
+    ) -> ServiceModel:
+        ...
 
-    def get_by_slug(self, slug: str) -> ServiceModel:
+    @overload
+    async def get_by_slug(self, slug: str, include_schema: bool) -> ServiceSummary:
+        ...
+
+    async def get_by_slug(
+        self, slug: str, include_schema: bool = True
+    ) -> ServiceSummary:
         """Get service details by slug.
 
         Args:
             slug: Service slug identifier
+            include_schema: Whether to parse the service's `api_schema`
 
         Returns:
-            Service details as ServiceModel
+            Service details as ServiceModel. With `include_schema=False`, as
+            ServiceSummary, or as the cached ServiceModel when there is one
         """
-        response = self.client._get(f"/v1/service/slug/{slug}")
-        return ServiceModel(**response)
+        return await self._fetch(
+            ("slug", slug), f"/v1/service/slug/{slug}", _service_model(include_schema)
+        )
+
+    @overload
+    async def get(
+        self, service_id: UUID, include_schema: Literal[True] = ...
+    ) -> ServiceModel:
+        ...
+
+    @overload
+    async def get(self, service_id: UUID, include_schema: bool) -> ServiceSummary:
+        ...
 
-    def get(self, service_id: UUID) -> ServiceModel:
+    async def get(
+        self, service_id: UUID, include_schema: bool = True
+    ) -> ServiceSummary:
         """Get service details by ID.
 
         Args:
             service_id: Service UUID
+            include_schema: Whether to parse the service's `api_schema`
 
         Returns:
-            Service details as ServiceModel
+            Service details as ServiceModel. With `include_schema=False`, as
+            ServiceSummary, or as the cached ServiceModel when there is one
         """
-        response = self.client._get(f"/v1/service/{service_id}")
-        return ServiceModel(**response)
+        return await self._fetch(
+            ("id", str(service_id)),
+            f"/v1/service/{service_id}",
+            _service_model(include_schema),
+        )
 
-    def search(self, query: str, limit: int = 10) -> List[ServiceModel]:
+    @overload
+    async def search(
+        self, query: str, limit: int = 10, include_schema: Literal[True] = ...
+    ) -> List[ServiceModel]:
+        ...
+
+    @overload
+    async def search(
+        self, query: str, limit: int = 10, include_schema: bool = ...
+    ) -> List[ServiceSummary]:
+        ...
+
+    async def search(
+        self, query: str, limit: int = 10, include_schema: bool = True
+    ) -> Union[List[ServiceModel], List[ServiceSummary]]:
         """Search for services.
 
         Args:
             query: Search query string
             limit: Maximum number of results to return (default: 10, max 10)
+            include_schema: Whether to parse the `api_schema` of the services
 
         Returns:
-            List of matching service details as ServiceModel
+            List of matching service details as ServiceModel, or as
+            ServiceSummary with `include_schema=False`
         """
-        response = self.client._get(
-            "/v1/service/search", params={"query": query, "limit": min(limit, 10)}
+        return await self.client._get(
+            "/v1/service/search",
+            params={"query": query, "limit": min(limit, 10)},
+            model=List[ServiceModel] if include_schema else List[ServiceSummary],
         )
-        return [ServiceModel(**service) for service in response]
@@ -1,12 +1,144 @@
 import json
 import logging
+import os
+import threading
+from functools import partial
+from importlib.resources import files
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from eth_abi.codec import ABICodec
+from eth_utils.abi import event_abi_to_log_topic, function_abi_to_4byte_selector
+from web3 import Web3
+from web3._utils.abi import build_strict_registry
+from web3._utils.events import get_event_data
 
 logger = logging.getLogger(__name__)
 
+# ABIs shipped with the package, readable wherever it is installed
+BUNDLED_ABIS = files("agentopia") / "abis"
+# relative prefix the bundled ABIs used to be loaded from
+BUNDLED_ABI_PREFIX = "agentopia/abis/"
+
+# same codec as Web3 instances use, shared by every event decoder
+codec = ABICodec(build_strict_registry())
+
+
+class EventDecoder(NamedTuple):
+    abi: Dict
+    # decodes a log whose topic0 is the event's topic
+    decode: Callable[[Dict], Dict]
+
+
+class AbiInfo(NamedTuple):
+    """An ABI with lookup tables computed once when it is loaded."""
+
+    abi: List[Dict]
+    # 4-byte function selector (0x-prefixed hex) -> function abi
+    selectors: Mapping[str, Dict]
+    # event topic0 (0x-prefixed hex) -> event abi
+    topics: Mapping[str, Dict]
+    # event name -> event abi
+    events: Mapping[str, Dict]
+    # event name -> event topic0 (0x-prefixed hex)
+    event_topics: Mapping[str, str]
+    # event topic0 (0x-prefixed hex) -> event decoder
+    decoders: Mapping[str, EventDecoder]
+
+
+# path -> (modification time, ABI), one version per path
+_abis: Dict[str, Tuple[Optional[float], AbiInfo]] = {}
+_abis_lock = threading.Lock()
+
+
+def bundled_abi_path(name: str) -> str:
+    """Path of an ABI bundled with the package, eg. `MicroPayment.json`."""
+    return str(BUNDLED_ABIS / name)
+
+
+def _read(abi_path: str) -> Tuple[str, Optional[float], str]:
+    normalized = os.path.normpath(abi_path).replace(os.sep, "/")
+    if normalized.startswith(BUNDLED_ABI_PREFIX):
+        # the copy bundled with the package, not whatever the working directory
+        # holds, and installed packages (eg. zipped) may not have a file on disk
+        name = normalized[len(BUNDLED_ABI_PREFIX) :]
+        return f"{BUNDLED_ABI_PREFIX}{name}", None, name
+    return abi_path, os.path.getmtime(abi_path), ""
+
+
+def topic_key(topic) -> str:
+    """Normalize a topic or selector (bytes or hex string) to 0x-prefixed hex."""
+    if isinstance(topic, (bytes, bytearray)):
+        return Web3.to_hex(topic)
+    topic = topic.lower()
+    return topic if topic.startswith("0x") else f"0x{topic}"
+
+
+def _build(abi: List[Dict]) -> AbiInfo:
+    functions = [item for item in abi if item.get("type") == "function"]
+    events = [item for item in abi if item.get("type") == "event"]
+    event_topics = {
+        event["name"]: topic_key(event_abi_to_log_topic(event)) for event in events
+    }
+    return AbiInfo(
+        abi=abi,
+        selectors=MappingProxyType(
+            {
+                topic_key(function_abi_to_4byte_selector(function)): function
+                for function in functions
+            }
+        ),
+        topics=MappingProxyType(
+            {event_topics[event["name"]]: event for event in events}
+        ),
+        events=MappingProxyType({event["name"]: event for event in events}),
+        event_topics=MappingProxyType(event_topics),
+        decoders=MappingProxyType(
+            {
+                event_topics[event["name"]]: EventDecoder(
+                    event, partial(get_event_data, codec, event)
+                )
+                for event in events
+            }
+        ),
+    )
+
+
+def get_abi_info(abi_path: str) -> AbiInfo:
+    """Load an ABI with its lookup tables, parsed once per file version.
+
+    ABIs are cached for the whole process by path along with their
+    modification time, so an ABI file that changes on disk is loaded again and
+    replaces the previous version.
+
+    Args:
+        abi_path: Path of the ABI JSON file. Relative paths under
+            `agentopia/abis/` name the ABIs bundled with the package.
+
+    Returns:
+        AbiInfo
+    """
+    path, mtime, bundled_name = _read(abi_path)
+    entry = _abis.get(path)
+    if entry is not None and entry[0] == mtime:
+        return entry[1]
+
+    with _abis_lock:
+        entry = _abis.get(path)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+        logger.debug(f"Loading ABI {path}")
+        if bundled_name:
+            abi = json.loads((BUNDLED_ABIS / bundled_name).read_text())
+        else:
+            with open(path) as f:
+                abi = json.load(f)
+        info = _build(abi)
+        _abis[path] = (mtime, info)
+    return info
+
 
 def get_abi(
     abi_path: str,
 ):
-    with open(abi_path) as f:
-        abi = json.load(f)
-    return abi
+    return get_abi_info(abi_path).abi
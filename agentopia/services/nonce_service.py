@@ -0,0 +1,80 @@
+import logging
+import threading
+from typing import Dict, Tuple
+
+from agentopia.settings import settings
+
+logger = logging.getLogger(__name__)
+
+NonceKey = Tuple[str, int, str]
+
+
+class NonceManager:
+    """Allocates transaction nonces locally, per RPC, chain and account.
+
+    The first nonce of an account is read from the chain (counting its pending
+    transactions), the next ones are handed out from memory, so several
+    transactions of an account can be signed and sent without waiting for the
+    previous ones to be mined.
+    """
+
+    def __init__(self):
+        self._nonces: Dict[NonceKey, int] = {}
+        self._locks: Dict[NonceKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, account: str) -> NonceKey:
+        return (settings.RPC, settings.CHAIN_ID, account)
+
+    def _account_lock(self, key: NonceKey) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def allocate(self, web3, account: str) -> int:
+        """Reserve the next nonce of an account.
+
+        Args:
+            web3: Web3 instance used to read the nonce on first use
+            account: Address of the account
+
+        Returns:
+            Nonce to sign the transaction with
+        """
+        key = self._key(account)
+        with self._account_lock(key):
+            nonce = self._nonces.get(key)
+            if nonce is None:
+                nonce = web3.eth.get_transaction_count(account, "pending")
+                logger.debug(f"Synced nonce of {account}: {nonce}")
+            self._nonces[key] = nonce + 1
+            return nonce
+
+    def resync(self, account: str) -> None:
+        """Forget the local nonce of an account, it is read again on next use.
+
+        Call after a transaction was rejected without using its nonce, or after
+        a "nonce too low" error.
+        """
+        key = self._key(account)
+        with self._account_lock(key):
+            self._nonces.pop(key, None)
+        logger.debug(f"Resyncing nonce of {account}")
+
+    def release(self, account: str, nonce: int) -> None:
+        """Hand out a nonce again after its transaction was not sent.
+
+        Only the last allocated nonce is taken back: the transactions that got
+        later nonces may be in flight, and reading the nonce from the chain
+        could hand theirs out twice.
+        """
+        key = self._key(account)
+        with self._account_lock(key):
+            if self._nonces.get(key) == nonce + 1:
+                self._nonces[key] = nonce
+                return
+        logger.warning(
+            f"Nonce {nonce} of {account} left unused, later transactions wait for it"
+        )
+
+
+nonce_manager = NonceManager()
@@ -1,36 +1,52 @@
 import logging
-from functools import lru_cache
+from typing import Any, Hashable, List, Optional, Sequence
 
+from eth_utils.abi import get_abi_output_types
+from hexbytes import HexBytes
 from pipe import select
 from web3 import Web3
+from web3._utils.abi import map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
 from web3.exceptions import BadFunctionCallOutput
 
+from agentopia.cache import CacheStats, TTLCache
 from agentopia.settings import settings
 
 # from sdk.local_cache import cache
-from agentopia.utility import get_web3
+from agentopia.utility import get_contract, get_web3
 
 logger = logging.getLogger(__name__)
 
-READ_CACHE_TIME = 7
+# block tags whose state never changes once read
+FIXED_BLOCK_TAGS = ("earliest",)
+# block tags that are never cached
+UNCACHED_BLOCK_TAGS = ("pending",)
 
 
 class Cache:
-    def __init__(self):
-        self._cache = {}
+    """Bounded in-process cache of contract reads with per-entry expiry."""
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self._cache = TTLCache(
+            maxsize=settings.READ_CACHE_SIZE if maxsize is None else maxsize
+        )
 
     def get(self, key, default=None):
         return self._cache.get(key, default)
 
     def set(self, key, value, ex=None):
-        self._cache[key] = value
+        """Store a value for `ex` seconds (None: until evicted)."""
+        self._cache.set(key, value, ttl=ex)
+
+    def discard_where(self, predicate) -> int:
+        return self._cache.discard_where(predicate)
 
-    @lru_cache
-    def memoize(self, expire=None):
-        def decorator(func):
-            return func
+    def clear(self):
+        self._cache.clear()
 
-        return decorator
+    @property
+    def stats(self) -> CacheStats:
+        return self._cache.stats
 
 
 cache = Cache()
@@ -38,19 +54,77 @@ cache = Cache()
 
 def get_read_cache_key(
     contract_address, environment, abi, function_name, default_block, *args
-):
-    fields = [contract_address, environment, function_name, default_block, args]
+) -> Hashable:
+    # reads of another RPC, e.g. a fork, may differ for the same chain id
+    fields = [
+        contract_address,
+        environment,
+        function_name,
+        default_block,
+        args,
+        settings.RPC,
+    ]
+    return tuple(fields | select(str))
+
+
+def get_read_cache_ttl(default_block) -> Optional[float]:
+    """Time to live of a read at a block.
+
+    Reads at a block number or hash never change and are kept until evicted,
+    reads at a moving tag such as `latest` are kept for settings.READ_CACHE_TTL.
+
+    Returns:
+        Seconds to cache the read for, None to cache it until evicted and 0 to not
+        cache it
+    """
+    if isinstance(default_block, (int, bytes)) or default_block in FIXED_BLOCK_TAGS:
+        return None
+    if isinstance(default_block, str) and default_block.startswith("0x"):
+        return None
+    if default_block in UNCACHED_BLOCK_TAGS:
+        return 0
+    return settings.READ_CACHE_TTL
+
+
+def invalidate_reads(contract_address: Optional[str] = None) -> int:
+    """Drop cached reads at moving block tags, e.g. after sending a transaction.
+
+    Args:
+        contract_address: Only drop reads of this contract (default: all contracts)
+
+    Returns:
+        Number of dropped reads
+    """
+    address = Web3.to_checksum_address(contract_address) if contract_address else None
+
+    def is_stale(key) -> bool:
+        return (
+            isinstance(key, tuple)
+            and key[-1] != "permanent"
+            and not _is_fixed_block_key(key[3])
+            and (address is None or key[0] == address)
+        )
+
+    return cache.discard_where(is_stale)
+
+
+def _is_fixed_block_key(block_key: str) -> bool:
+    # blocks are stored as strings in the cache keys
+    return (
+        block_key.isdigit()
+        or block_key.startswith(("0x", "b'"))
+        or block_key in FIXED_BLOCK_TAGS
+    )
 
-    signature = "-".join(fields | select(str))
-    k = signature
 
-    return k
+def get_read_cache_stats() -> CacheStats:
+    """Hit, miss and eviction counters of the read cache."""
+    return cache.stats
 
 
 # read_balance.__cache_key__ = get_read_balance_cache_key
 
 
-# @cache.memoize(expire=READ_CACHE_TIME)
 # @timeit
 def read(
     contract_address,
@@ -61,14 +135,30 @@ def read(
     args,
 ):
     contract_address = Web3.to_checksum_address(contract_address)
+    ttl = get_read_cache_ttl(default_block)
+    cache_key = get_read_cache_key(
+        contract_address,
+        settings.CHAIN_ID,
+        abi,
+        function_name,
+        default_block,
+        args,
+        caller_address,
+    )
+    if ttl != 0:
+        result = cache.get(cache_key)
+        if result is not None:
+            logger.debug(f"Read cache hit: {cache_key}")
+            return result
 
     def get_contract_instance(default_block):
-        # print(environment, config.RPC_URL[environment])
-        web3 = get_web3()
-        web3.eth.default_block = default_block
-        return web3.eth.contract(address=contract_address, abi=abi)
+        # the block is passed to each call, the shared Web3 instance is not changed
+        return get_contract(contract_address, abi)
 
-    log_dump = f"Read Call: {contract_address}, {settings.CHAIN_ID}, {default_block}, {function_name},  {args}"
+    log_dump = (
+        f"Read Call: {contract_address}, {settings.CHAIN_ID}, {default_block},"
+        f" {function_name},  {args}"
+    )
     logger.info(log_dump if len(log_dump) < 200 else f"{log_dump[:200]}...")
     # logger.info(f"fetching function_name: {function_name}, args: {args}")
     logger.debug(log_dump)
@@ -107,6 +197,8 @@ def read(
 
         # Note down this provider and try this as the first provider in the next call
 
+        if ttl != 0 and result is not None:
+            cache.set(cache_key, result, ex=ttl)
         return result
     except BadFunctionCallOutput as e:
         logger.exception(f"BadFunctionCallOutput: {e}")
@@ -115,15 +207,112 @@ def read(
 read.__cache_key__ = get_read_cache_key
 
 
+def _block_param(default_block):
+    if isinstance(default_block, int):
+        return hex(default_block)
+    if isinstance(default_block, bytes):
+        return Web3.to_hex(default_block)
+    return default_block
+
+
+def _decode_call_result(function, data: bytes):
+    # same decoding as ContractFunction.call
+    output_types = get_abi_output_types(function.abi)
+    result = map_abi_data(
+        BASE_RETURN_NORMALIZERS,
+        output_types,
+        get_web3().codec.decode(output_types, data),
+    )
+    return result[0] if len(result) == 1 else result
+
+
+def read_many(
+    calls: Sequence[Sequence[Any]],
+    default_block="latest",
+    caller_address=None,
+    batch_size: Optional[int] = None,
+) -> List[Any]:
+    """Read several contract functions with JSON-RPC batch requests.
+
+    Cached reads are answered from the read cache, the others are sent as
+    `eth_call`s in batches of `batch_size`, so N reads cost one round-trip per
+    batch instead of N.
+
+    Args:
+        calls: Calls as `[contract_address, abi, function_name, *args]`, see
+            `Contract.s`
+        default_block: Block to read at
+        caller_address: Address the calls are made from
+        batch_size: Maximum number of calls per batch request
+            (default: settings.READ_BATCH_SIZE)
+
+    Returns:
+        Results in the order of the calls, None for calls that failed
+    """
+    batch_size = batch_size or settings.READ_BATCH_SIZE
+    ttl = get_read_cache_ttl(default_block)
+    results: List[Any] = [None] * len(calls)
+    pending = []
+    for index, (contract_address, abi, function_name, *args) in enumerate(calls):
+        contract_address = Web3.to_checksum_address(contract_address)
+        cache_key = get_read_cache_key(
+            contract_address,
+            settings.CHAIN_ID,
+            abi,
+            function_name,
+            default_block,
+            tuple(args),
+            caller_address,
+        )
+        result = cache.get(cache_key) if ttl != 0 else None
+        if result is not None:
+            results[index] = result
+            continue
+        contract = get_contract(contract_address, abi)
+        function = getattr(contract.functions, function_name)(*args)
+        transaction = {
+            "to": contract_address,
+            "data": contract.encode_abi(function_name, args=args),
+        }
+        if caller_address:
+            transaction["from"] = caller_address
+        pending.append((index, cache_key, function, transaction))
+
+    logger.info(
+        f"Read Many: {len(calls)} calls, {len(calls) - len(pending)} cached, "
+        f"{settings.CHAIN_ID}, {default_block}"
+    )
+    block = _block_param(default_block)
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start : start + batch_size]
+        responses = get_web3().provider.make_batch_request(
+            [("eth_call", [transaction, block]) for _, _, _, transaction in batch]
+        )
+        if not isinstance(responses, list):
+            raise ValueError(f"Batch read failed: {responses.get('error')}")
+
+        for (index, cache_key, function, _), response in zip(batch, responses):
+            if "error" in response:
+                logger.error(f"Read of {function.fn_name} failed: {response['error']}")
+                continue
+            try:
+                result = _decode_call_result(function, HexBytes(response["result"]))
+            except Exception as e:
+                logger.exception(f"Could not decode {function.fn_name}: {e}")
+                continue
+            results[index] = result
+            if ttl != 0 and result is not None:
+                cache.set(cache_key, result, ex=ttl)
+    return results
+
+
 def set_permanent_cache(result, *args):
-    cache_key = get_read_cache_key(*args)
-    cache_key = f"{cache_key}-permanent"
+    cache_key = (*get_read_cache_key(*args), "permanent")
     cache.set(cache_key, result)
 
 
 def get_permanent_cache(*args, **kwargs):
-    cache_key = get_read_cache_key(*args, **kwargs)
-    cache_key = f"{cache_key}-permanent"
+    cache_key = (*get_read_cache_key(*args, **kwargs), "permanent")
     result = cache.get(cache_key)
     if result is None:
         logger.exception("Providers are not working at the moment, failing...")
@@ -155,5 +344,4 @@ def save_result_in_cache(
         contract_address, environment, abi, function_name, default_block, args
     )
     # logger.info(f"Saving result in cache: {key}")
-    cache.set(key, result, ex=READ_CACHE_TIME)
-    cache.set(key, result, ex=READ_CACHE_TIME)
+    cache.set(key, result, ex=get_read_cache_ttl(default_block))
@@ -0,0 +1,115 @@
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, List, Optional, Tuple
+
+from web3.providers.rpc import HTTPProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from agentopia.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# order sensitive requests that are never merged into a batch
+UNBATCHED_METHODS = ("eth_sendRawTransaction", "eth_sendTransaction")
+
+PendingRequest = Tuple[RPCEndpoint, Any, "Future[RPCResponse]"]
+
+
+class BatchingHTTPProvider(HTTPProvider):
+    """HTTP provider that coalesces concurrent requests into JSON-RPC batches.
+
+    The first request of a batch waits up to `batch_window` seconds for requests
+    made by other threads, then sends all of them in a single POST and hands
+    each caller its own response. A request made while no other request is in
+    progress is sent right away, so sequential callers do not pay the window.
+    """
+
+    def __init__(
+        self,
+        endpoint_uri=None,
+        request_kwargs=None,
+        session=None,
+        batch_window: Optional[float] = None,
+        max_batch_size: Optional[int] = None,
+        **kwargs,
+    ):
+        """Initialize the provider.
+
+        Args:
+            endpoint_uri: RPC URL
+            request_kwargs: Keyword arguments of the HTTP requests
+            session: requests session to send the requests with
+            batch_window: Seconds to wait for concurrent requests
+                (default: settings.RPC_BATCH_WINDOW, 0 disables batching)
+            max_batch_size: Maximum number of requests per batch
+                (default: settings.RPC_BATCH_SIZE)
+        """
+        super().__init__(endpoint_uri, request_kwargs, session=session, **kwargs)
+        self.batch_window = (
+            settings.RPC_BATCH_WINDOW if batch_window is None else batch_window
+        )
+        self.max_batch_size = max_batch_size or settings.RPC_BATCH_SIZE
+        self._lock = threading.Lock()
+        self._full = threading.Event()
+        self._pending: List[PendingRequest] = []
+        self._active = 0
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if self.batch_window <= 0 or method in UNBATCHED_METHODS:
+            return super().make_request(method, params)
+
+        future: "Future[RPCResponse]" = Future()
+        with self._lock:
+            self._active += 1
+            self._pending.append((method, params, future))
+            leader = len(self._pending) == 1
+            concurrent = self._active > 1
+            if len(self._pending) >= self.max_batch_size:
+                self._full.set()
+        try:
+            if leader:
+                if concurrent:
+                    self._full.wait(self.batch_window)
+                with self._lock:
+                    batch, self._pending = self._pending, []
+                    self._full.clear()
+                self._send(batch)
+            return future.result()
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _send(self, batch: List[PendingRequest]) -> None:
+        if len(batch) == 1:
+            method, params, future = batch[0]
+            try:
+                future.set_result(super().make_request(method, params))
+            except Exception as e:
+                future.set_exception(e)
+            return
+
+        for start in range(0, len(batch), self.max_batch_size):
+            chunk = batch[start : start + self.max_batch_size]
+            logger.debug(f"Sending batch of {len(chunk)} RPC requests")
+            try:
+                responses = self.make_batch_request(
+                    [(method, params) for method, params, _ in chunk]
+                )
+            except Exception as e:
+                for _, _, future in chunk:
+                    future.set_exception(e)
+                continue
+
+            if not isinstance(responses, list):
+                # the whole batch was rejected with a single error
+                responses = [responses] * len(chunk)
+            if len(responses) != len(chunk):
+                error = ValueError(
+                    f"Got {len(responses)} responses for {len(chunk)} RPC requests"
+                )
+                for _, _, future in chunk:
+                    future.set_exception(error)
+                continue
+            for (_, _, future), response in zip(chunk, responses):
+                future.set_result(response)
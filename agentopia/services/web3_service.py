@@ -1,24 +1,23 @@
 import logging
-import time
 
 # defaultdict
 from collections import defaultdict
 from typing import Dict, List
 
-import requests
-from Crypto.Hash import keccak
 from eth_account import Account
 from hexbytes import HexBytes
 from pipe import dedup, groupby, select, where
 from web3 import Web3
-from web3._utils.events import get_event_data
 from web3.gas_strategies.time_based import fast_gas_price_strategy
+from web3.exceptions import TransactionNotFound, Web3RPCError
 from web3.logs import IGNORE
-from web3.providers.rpc import HTTPProvider
 
-from agentopia.services.abi_service import get_abi
-from agentopia.services.read_service import read
+from agentopia.services.abi_service import get_abi_info, topic_key
+from agentopia.services.nonce_service import nonce_manager
+from agentopia.services.read_service import invalidate_reads, read, read_many
 from agentopia.settings import settings
+from agentopia.utility import get_contract, get_web3
+from agentopia.waiter import wait_until
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -60,7 +59,8 @@ class Contract(object):
     ):
         self.contract_address = self.get_checksum_address(contract_address)
         self.abi_path = abi_path
-        self.abi = get_abi(abi_path)
+        self.abi_info = get_abi_info(abi_path)
+        self.abi = self.abi_info.abi
         self.mappings: Dict[str, str] = {}
         self.on_block_mappings: List[str] = []
         self.events_to_scan = None
@@ -72,18 +72,11 @@ class Contract(object):
 
     @property
     def web3(self):
-        provider = HTTPProvider(
-            settings.RPC,
-            request_kwargs={"timeout": 10},
-        )
-
-        web3 = Web3(provider)
-        # web3.middleware_onion.inject(geth_poa_middleware, layer=0)
-        return web3
+        return get_web3(settings.RPC)
 
     @property
     def contract_instance(self):
-        return self.web3.eth.contract(address=self.contract_address, abi=self.abi)
+        return get_contract(self.contract_address, self.abi, settings.RPC)
 
     def get_checksum_address(self, address):
         try:
@@ -122,14 +115,16 @@ class Contract(object):
             data["topics"] = list(data["topics"] | where(lambda x: x != None))
             data["topics"] = list(map(HexBytes, data["topics"]))
 
-            if not event_name:
-                event_name = self.get_event_name_for_topic(data["topics"][0])
+            # one lookup in the topic index of the ABI, no per log setup
+            topic0 = (
+                self.get_topic(event_name)
+                if event_name
+                else topic_key(data["topics"][0])
+            )
 
             data["transactionHash"] = HexBytes(data["transactionHash"])
             data["blockHash"] = data["transactionHash"]
-            decoded_event = dict(
-                get_event_data(self.web3.codec, self.get_event_abi(event_name), data)  # type: ignore
-            )  # type: ignore
+            decoded_event = dict(self.abi_info.decoders[topic0].decode(data))
 
             decoded_event["log_index"] = decoded_event.pop("logIndex")  # type: ignore
             decoded_event["transaction_index"] = decoded_event.pop("transactionIndex")  # type: ignore
@@ -150,30 +145,26 @@ class Contract(object):
 
     def write(self, function_name: str, *args, value=0):
         print(
-            f"Writing {function_name} with args:{args} and value:{value} on {self.contract_address}:{settings.CHAIN_ID}"
+            f"Writing {function_name} with args:{args} and value:{value} on"
+            f" {self.contract_address}:{settings.CHAIN_ID}"
+        )
+        # send_txn handles "already known" and nonce errors
+        return self.publish_txn(
+            getattr(self.contract_instance.functions, function_name)(*args), value
+        )
+
+    def send(self, function_name: str, *args, value=0):
+        """Send a write without waiting for it to be mined.
+
+        Several writes can be sent back to back and their receipts waited for
+        later with `wait_for_receipt`.
+
+        Returns:
+            Transaction hash
+        """
+        return self.send_txn(
+            getattr(self.contract_instance.functions, function_name)(*args), value
         )
-        try:
-            return self.publish_txn(
-                getattr(self.contract_instance.functions, function_name)(*args),
-                value,
-            )
-        except ValueError as e:
-            if "replacement transaction underpriced" in str(e):
-                logger.info(f"Txn already underway for {(function_name, args, value)}")
-            if "already known" in str(e):
-                # the txn is already in the mempool so we need to speed up the txn
-                logger.info(
-                    "the txn is already in the mempool so we need to speed up the txn"
-                )
-                actual_gas_price = self.get_gas_price()
-                logger.info(f"Trying with gas price {actual_gas_price}")
-                return self.publish_txn(
-                    getattr(self.contract_instance.functions, function_name)(*args),
-                    value,
-                    gas_price=actual_gas_price,
-                )
-            else:
-                raise e
 
     def f(self, function_name, *args):
         return getattr(self.contract_instance.functions, function_name)(*args)
@@ -182,50 +173,92 @@ class Contract(object):
         return [self.contract_address, self.abi, function_name, *args]
 
     def publish_txn(self, transfer_txn, value, gas_price=None):
-        nonce = self._get_nonce()
-
-        transfer_txn = transfer_txn.build_transaction(
-            {
-                "from": self.pk_manager.account,
-                "chainId": settings.CHAIN_ID,
-                "nonce": nonce,
-                "value": int(value),
-                "gas": 10_000_000,
-            }
-        )
-
+        txn_hash = self.send_txn(transfer_txn, value, gas_price=gas_price)
+        return self.wait_for_receipt(txn_hash)
+
+    def send_txn(self, transfer_txn, value, gas_price=None, retry_nonce=True):
+        """Sign and send a transaction without waiting for it to be mined.
+
+        The nonce comes from the local nonce manager, so several transactions
+        of the account can be pending at the same time.
+
+        Returns:
+            Transaction hash
+        """
+        account = self.pk_manager.account
+        nonce = nonce_manager.allocate(self.web3, account)
+
+        txn = {
+            "from": account,
+            "chainId": settings.CHAIN_ID,
+            "nonce": nonce,
+            "value": int(value),
+            "gas": 10_000_000,
+        }
+        if gas_price:
+            txn["gasPrice"] = gas_price
         signed_txn = self.web3.eth.account.sign_transaction(
-            transfer_txn, private_key=self.pk_manager.pk
+            transfer_txn.build_transaction(txn), private_key=self.pk_manager.pk
         )
 
+        txn_hash = self.web3.to_hex(Web3.keccak(signed_txn.raw_transaction))
         try:
-            print(f"Sending raw transaction: {Web3.to_hex(signed_txn.raw_transaction)}")
+            logger.debug(f"Sending raw transaction {txn_hash} from {account}")
             self.web3.eth.send_raw_transaction(signed_txn.raw_transaction)
-        except ValueError as e:
-            error_message = str(e)
-            if "nonce too low" in error_message:
-                logger.warning(
-                    f"nonce too low: {settings.CHAIN_ID}-{self.pk_manager.account}. Skipping for now"
-                )
-            elif (
-                "replacement transaction underpriced" in error_message
-                or "already known" in error_message
+        except (Web3RPCError, ValueError) as e:
+            # web3 v7 raises Web3RPCError for node errors, older providers ValueError
+            error_message = str(e).lower()
+            if "already known" in error_message:
+                logger.warning(f"Txn {settings.CHAIN_ID}:{txn_hash} still in progress")
+                return txn_hash
+            if (
+                "nonce too low" in error_message
+                or "replacement transaction underpriced" in error_message
             ):
-                logger.warning(
-                    f"Txn {settings.CHAIN_ID}:{ Web3.to_hex(signed_txn.hash)} still in progress"
-                )
-            else:
-                logger.exception(f"Write call failing for {settings.CHAIN_ID}")
-        except requests.HTTPError as e:
-            if "Too Many Requests" in str(e):
-                raise e
+                # another transaction took the nonce, send again with a fresh one
+                nonce_manager.resync(account)
+                if retry_nonce:
+                    logger.warning(
+                        f"Nonce {nonce} taken: {settings.CHAIN_ID}-{account}. "
+                        "Retrying with a synced nonce"
+                    )
+                    return self.send_txn(
+                        transfer_txn, value, gas_price=gas_price, retry_nonce=False
+                    )
             else:
-                raise e
-        except:
+                # the local nonces of transactions in flight are still right
+                nonce_manager.release(account, nonce)
+            logger.exception(f"Write call failing for {settings.CHAIN_ID}")
+            raise
+        except Exception:
+            nonce_manager.release(account, nonce)
             logger.exception(f"Write call failing for {settings.CHAIN_ID}")
+            raise
 
-        txn_hash = self.web3.to_hex(Web3.keccak(signed_txn.raw_transaction))
-        txn_receipt = self.web3.eth.wait_for_transaction_receipt(txn_hash)
+        return txn_hash
+
+    def wait_for_receipt(self, txn_hash):
+        """Wait for a transaction to be mined and decode its logs.
+
+        Safe to call from several threads for different transactions.
+
+        Returns:
+            Transaction receipt with the logs grouped by event name
+        """
+
+        def get_receipt():
+            try:
+                return self.web3.eth.get_transaction_receipt(txn_hash)
+            except TransactionNotFound:
+                return None
+
+        txn_receipt = wait_until(
+            get_receipt,
+            timeout=settings.WAIT_TIMEOUT,
+            description=f"receipt of {txn_hash}",
+        )
+        # the transaction may have changed any contract state read at `latest`
+        invalidate_reads()
         logger.info(f"View txn at {settings.CHAIN_EXPLORER}/tx/{txn_hash}")
         logger.info("txn_receipt ", txn_receipt)
 
@@ -247,22 +280,12 @@ class Contract(object):
                                 bytes.fromhex(log["data"][2:]),
                             )
                             logger.info(
-                                f"Decoded Error ({error_abi.get('name')}): {decoded_error}"
+                                f"Decoded Error ({error_abi.get('name')}):"
+                                f" {decoded_error}"
                             )
                     except Exception as e:
                         logger.info(f"Error decoding custom error: {e}")
 
-        new_nonce = self._get_nonce()
-        logger.info(f"New nonce: {new_nonce}, old nonce: {nonce}")
-        start_time = int(time.time())
-        while new_nonce == nonce:
-            logger.info(f"Waiting for confirmation: {txn_hash}")
-            if (int(time.time()) - start_time) > 60 * 2:
-                logger.info("Confirmation taking too long, leaving this for now...")
-                break
-            time.sleep(2)
-            new_nonce = self._get_nonce()
-
         all_events = list(self.contract_instance.events.__dict__.keys())[2:]
         all_logs = defaultdict(list)
         for event in all_events:
@@ -291,42 +314,26 @@ class Contract(object):
             args,
         )
 
+    def read_many(self, *calls, default_block="latest", caller_address=None):
+        """Read several functions of the contract in one batch request.
+
+        eg. `usdc.read_many(("balanceOf", alice), ("allowance", alice, spender))`
+
+        Returns:
+            Results in the order of the calls, None for calls that failed
+        """
+        return read_many(
+            [self.s(*call) for call in calls],
+            default_block=default_block,
+            caller_address=caller_address,
+        )
+
     def get_event_name_for_topic(self, topic0):
-        if not hasattr(self, "topic_to_event_name_mapping"):
-            self.topic_to_event_name_mapping = dict(
-                list(
-                    self.get_all_event_names()
-                    | select(
-                        lambda event_name: (self.get_topic(event_name), event_name)
-                    )
-                )
-            )
-        try:
-            if isinstance(topic0, HexBytes):
-                topic0 = topic0.hex()
-            return self.topic_to_event_name_mapping[topic0]
-        except:
-            event_abi = self.get_abi_for_topic(topic0)
-            return event_abi.get("name")
+        decoder = self.abi_info.decoders.get(topic_key(topic0))
+        return decoder.abi.get("name") if decoder else None
 
     def get_abi_for_topic(self, topic0):
-        if isinstance(topic0, HexBytes):
-            topic0 = topic0.hex()
-        if hasattr(self, "topic_to_abi_mapping"):
-            return self.topic_to_abi_mapping[topic0]
-
-        self.topic_to_abi_mapping = dict(
-            list(
-                self.get_all_event_names()
-                | select(
-                    lambda event_name: (
-                        self.get_topic(event_name),
-                        self.get_event_abi(event_name),
-                    )
-                )
-            )
-        )
-        return self.topic_to_abi_mapping.get(topic0, {})
+        return self.abi_info.topics.get(topic_key(topic0), {})
 
     def get_all_event_types(self):
         return list(
@@ -337,51 +344,17 @@ class Contract(object):
         )
 
     def get_all_event_names(self):
-        return list(
-            self.contract_instance.abi
-            | where(lambda x: x["type"] == "event")
-            | select(lambda x: x["name"])
-        )
+        return list(self.abi_info.events)
 
     def get_event_abi(self, event_name):
-        var_name = "__var_event_abi"
-        if hasattr(self, var_name):
-            if event_name in getattr(self, var_name):
-                return getattr(self, var_name)[event_name]
-        else:
-            setattr(self, var_name, {})
-
-        data = list(
-            filter(lambda x: x.get("name") == event_name, self.contract_instance.abi)
-        )
-        if data:
-            data = data[0]
-        else:
+        data = self.abi_info.events.get(event_name)
+        if not data:
             logger.exception("Invalid Event Name")
-
-        getattr(self, var_name)[event_name] = data
+            return []
         return data
 
     def get_topic(self, event_name):
-        var_name = "__var_get_topic"
-        if hasattr(self, var_name):
-            if event_name in getattr(self, var_name):
-                return getattr(self, var_name)[event_name]
-        else:
-            setattr(self, var_name, {})
-
-        data = self.get_event_abi(event_name)
-        input_types = list(data["inputs"] | select(lambda x: x["type"]))
-        input_type_string = ",".join(input_types)
-        message = f"{data['name']}({input_type_string})"
-
-        k = keccak.new(digest_bits=256)
-        k.update(message.encode("utf-8"))
-
-        _topic = f"0x{k.hexdigest()}"
-
-        getattr(self, var_name)[event_name] = _topic
-        return _topic
+        return self.abi_info.event_topics[event_name]
 
     def __str__(self):
         return f"{self.contract_address} with {self.abi_path}"
@@ -7,11 +7,47 @@ class Settings(BaseSettings):
     CHAIN_EXPLORER: str = "https://basescan.org/"
     AGENTOPIA_API: str = "https://api.agentopia.xyz"
     RPC: str = "https://mainnet.base.org"
+    RPC_POOL_SIZE: int = 20
+    RPC_BATCH_WINDOW: float = 0.002
+    RPC_BATCH_SIZE: int = 100
+    BLOCK_TIME: float = 2.0
+    WAIT_TIMEOUT: float = 120.0
+    DEPOSIT_MAX_WORKERS: int = 16
+    READ_CACHE_TTL: float = 2.0
+    READ_CACHE_SIZE: int = 4096
+    READ_BATCH_SIZE: int = 100
     GAS_PRICE: int = int(0.1e9)
     CHAIN_ID: int = 8453
     MICROPAYMENT_ADDRESS: str = "0xaEF2fc1f54AE5b260cA2123B27bE6E79C3AAFa7a"
     USDC_ADDRESS: str = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
     AGENTOPIA_LOCAL_MODE: bool = False
+    AGENTOPIA_LAZY_AUTH: bool = False
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_HTTP2: bool = True
+    HTTP_TIMEOUT: float = 60.0
+    API_TIMEOUT: float = 30.0
+    API_RETRY_ATTEMPTS: int = 3
+    API_RETRY_BACKOFF: float = 0.2
+    API_RETRY_MAX_BACKOFF: float = 5.0
+    API_RETRY_AFTER_MAX: float = 30.0
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_BREAKER_RESET_TIMEOUT: float = 30.0
+    TRACE_MAX_PAYLOAD: int = 2000
+    TRACE_SAMPLE_RATE: float = 1.0
+    SERVICE_CACHE_TTL: float = 0.0
+    SERVICE_CACHE_SIZE: int = 256
+    HOLD_POOL_SIZE: int = 0
+    HOLD_POOL_MIN_TTL: float = 30.0
+    HOLD_BATCH_SIZE: int = 100
+    HOLD_VERIFY_CACHE_TTL: float = 5.0
+    HOLD_VERIFY_CACHE_SIZE: int = 10_000
+    SETTLEMENT_MODE: str = "sync"
+    SETTLEMENT_SPOOL_DIR: str = ".agentopia/settlement"
+    SETTLEMENT_BATCH_SIZE: int = 100
+    SETTLEMENT_FLUSH_INTERVAL: float = 0.5
+    SETTLEMENT_MAX_ATTEMPTS: int = 8
 
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=True, extra="ignore"
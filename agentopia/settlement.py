@@ -0,0 +1,438 @@
+import atexit
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Annotated, Dict, List, Optional, Set
+from uuid import UUID
+
+from pydantic import BaseModel
+from pydantic.functional_validators import AfterValidator
+
+from agentopia.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# seconds between two sweeps of expired hold claims
+CLAIM_PRUNE_INTERVAL = 60.0
+
+
+def canonical_hold_id(hold_id: str) -> str:
+    # hold ids name the spool files, so only canonical UUIDs are accepted
+    return str(UUID(str(hold_id)))
+
+
+HoldId = Annotated[str, AfterValidator(canonical_hold_id)]
+
+
+class HoldAlreadyQueuedError(ValueError):
+    """The release of a hold was submitted while one is already queued."""
+
+
+class HoldAlreadyClaimedError(ValueError):
+    """A hold was claimed by a process sharing the spool already."""
+
+
+def _alive(pid: int) -> bool:
+    """Whether a process of this host is still running."""
+    if os.name == "nt":
+        # signal 0 is CTRL_C_EVENT on Windows, assume it is running
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class PendingRelease(BaseModel):
+    hold_id: HoldId
+    amount: int
+    queued_at: float
+    attempts: int = 0
+    next_attempt_at: float = 0.0
+
+
+class HoldClaim(BaseModel):
+    hold_id: HoldId
+    expires_at: float
+
+
+class SettlementMetrics(BaseModel):
+    queue_depth: int
+    settlement_lag: float
+    last_settlement_lag: float
+    settled: int
+    retried: int
+    failed: int
+
+
+class SettlementQueue:
+    """Durable queue of hold releases settled in batches by a background worker.
+
+    Every release is spooled to its own file before `submit` returns and the file
+    is only removed once the release succeeded, so queued charges survive a
+    process restart and are replayed when the next queue starts. Releases that
+    keep failing are moved to a `failed` sub-directory of the spool.
+
+    The worker processes of a host may share the spool directory: before a
+    release is settled, its file is renamed into the `settling` sub-directory
+    under the name of the process, so a release replayed by several queues is
+    settled by one of them only. Releases left there by a process that died are
+    moved back by the next queue that starts on the host.
+
+    Holds are claimed with `claim` before the call they pay for runs. A claim is
+    a file of the `claims` sub-directory created exclusively, so a hold pays for
+    a single call of all the processes sharing the spool, and is kept until the
+    hold expires.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        spool_dir: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        """Initialize the settlement queue.
+
+        Args:
+            client: Agentopia client used to release holds (default: created lazily)
+            spool_dir: Directory for pending releases
+                (default: settings.SETTLEMENT_SPOOL_DIR)
+            batch_size: Maximum number of releases per batch
+                (default: settings.SETTLEMENT_BATCH_SIZE)
+            flush_interval: Maximum seconds a release waits for a batch to fill
+                (default: settings.SETTLEMENT_FLUSH_INTERVAL)
+            max_attempts: Attempts before a release is moved to the failed spool
+                (default: settings.SETTLEMENT_MAX_ATTEMPTS)
+        """
+        self._client = client
+        self.spool_dir = Path(spool_dir or settings.SETTLEMENT_SPOOL_DIR)
+        self.failed_dir = self.spool_dir / "failed"
+        self.settling_dir = self.spool_dir / "settling"
+        self.claims_dir = self.spool_dir / "claims"
+        self._owner = f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size or settings.SETTLEMENT_BATCH_SIZE
+        self.flush_interval = (
+            settings.SETTLEMENT_FLUSH_INTERVAL
+            if flush_interval is None
+            else flush_interval
+        )
+        self.max_attempts = max_attempts or settings.SETTLEMENT_MAX_ATTEMPTS
+        self._pending: Dict[str, PendingRelease] = {}
+        # ids of holds submitted but not settled yet, including those being spooled
+        self._queued: Set[str] = set()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._settled = 0
+        self._retried = 0
+        self._failed = 0
+        self._last_settlement_lag = 0.0
+        self._pruned_at = 0.0
+
+    @property
+    def client(self):
+        if self._client is None:
+            from agentopia.client import Agentopia
+
+            self._client = Agentopia()
+        return self._client
+
+    def start(self) -> None:
+        """Replay spooled releases and start the background worker."""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self.failed_dir.mkdir(parents=True, exist_ok=True)
+            self.settling_dir.mkdir(parents=True, exist_ok=True)
+            self.claims_dir.mkdir(parents=True, exist_ok=True)
+            self._recover()
+            self._prune_claims()
+            for path in sorted(self.spool_dir.glob("*.json")):
+                try:
+                    release = PendingRelease.model_validate_json(path.read_bytes())
+                except FileNotFoundError:
+                    # another queue sharing the spool is settling it
+                    continue
+                except ValueError:
+                    logger.error(f"Skipping unreadable settlement spool file {path}")
+                    continue
+                release.next_attempt_at = 0.0
+                self._pending[release.hold_id] = release
+                self._queued.add(release.hold_id)
+            if self._pending:
+                logger.info(f"Replaying {len(self._pending)} spooled hold releases")
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name="agentopia-settlement", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, hold_id: str, amount: int) -> None:
+        """Queue a hold release, spooling it to disk first.
+
+        Blocks until the release is on disk, so call it from a thread in async
+        code.
+
+        Args:
+            hold_id: ID of the hold to release
+            amount: Amount to charge from the hold in USDC (6 decimals)
+
+        Raises:
+            ValueError: If the hold ID is not a UUID
+            HoldAlreadyQueuedError: If a release of the hold is already queued
+        """
+        release = PendingRelease(
+            hold_id=str(hold_id), amount=amount, queued_at=time.time()
+        )
+        with self._cond:
+            if release.hold_id in self._queued:
+                raise HoldAlreadyQueuedError(
+                    f"Release of hold {release.hold_id} is already queued"
+                )
+            self._queued.add(release.hold_id)
+        try:
+            self._write(release)
+        except BaseException:
+            with self._cond:
+                self._queued.discard(release.hold_id)
+            raise
+        with self._cond:
+            self._pending[release.hold_id] = release
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def claim(self, hold_id: str, expires_at: float) -> None:
+        """Claim a hold for a single call.
+
+        Blocks until the claim is on disk, so call it from a thread in async code.
+
+        Args:
+            hold_id: ID of the hold to claim
+            expires_at: Unix time the hold expires at, when the claim is dropped
+
+        Raises:
+            ValueError: If the hold ID is not a UUID
+            HoldAlreadyClaimedError: If the hold was claimed already
+        """
+        claim = HoldClaim(hold_id=str(hold_id), expires_at=expires_at)
+        path = self._path(claim.hold_id, self.claims_dir)
+        tmp_path = path.with_suffix(f".{self._owner}.tmp")
+        self.claims_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w") as f:
+            f.write(claim.model_dump_json())
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            # unlike a rename, a link fails if the claim exists
+            os.link(tmp_path, path)
+        except FileExistsError:
+            raise HoldAlreadyClaimedError(f"Hold {claim.hold_id} is already claimed")
+        finally:
+            tmp_path.unlink()
+
+    def unclaim(self, hold_id: str) -> None:
+        """Drop the claim of a hold that did not pay for its call."""
+        self._path(hold_id, self.claims_dir).unlink(missing_ok=True)
+
+    def metrics(self) -> SettlementMetrics:
+        """Queue depth, settlement lag and counters of the queue."""
+        with self._cond:
+            oldest = min(
+                (release.queued_at for release in self._pending.values()),
+                default=None,
+            )
+            return SettlementMetrics(
+                queue_depth=len(self._pending),
+                settlement_lag=time.time() - oldest if oldest else 0.0,
+                last_settlement_lag=self._last_settlement_lag,
+                settled=self._settled,
+                retried=self._retried,
+                failed=self._failed,
+            )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop the worker after a last attempt to settle what is queued.
+
+        Releases that could not be settled stay in the spool.
+        """
+        with self._cond:
+            if self._thread is None:
+                return
+            self._stopping = True
+            self._cond.notify()
+            thread, self._thread = self._thread, None
+        thread.join(timeout)
+
+    def _path(self, hold_id: str, directory: Optional[Path] = None) -> Path:
+        return (directory or self.spool_dir) / f"{canonical_hold_id(hold_id)}.json"
+
+    def _write(self, release: PendingRelease) -> None:
+        path = self._path(release.hold_id)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            f.write(release.model_dump_json())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _settling_path(self, hold_id: str) -> Path:
+        name = f"{canonical_hold_id(hold_id)}.{self._owner}.json"
+        return self.settling_dir / name
+
+    def _recover(self) -> None:
+        """Move back the releases that dead processes of this host were settling."""
+        host = socket.gethostname()
+        for path in self.settling_dir.glob("*.json"):
+            hold_id, _, owner = path.name[: -len(".json")].partition(".")
+            owner_host, _, pid = owner.rpartition("-")
+            if owner_host != host or not pid.isdigit() or _alive(int(pid)):
+                continue
+            try:
+                os.replace(path, self._path(hold_id))
+            except ValueError:
+                logger.error(f"Skipping unreadable settlement spool file {path}")
+                continue
+            logger.info(f"Recovered release of hold {hold_id} from process {pid}")
+
+    def _prune_claims(self) -> None:
+        """Remove the claims of expired holds."""
+        now = time.time()
+        self._pruned_at = now
+        for path in self.claims_dir.glob("*.json"):
+            try:
+                claim = HoldClaim.model_validate_json(path.read_bytes())
+            except FileNotFoundError:
+                continue
+            except ValueError:
+                logger.error(f"Skipping unreadable hold claim {path}")
+                continue
+            if claim.expires_at <= now:
+                path.unlink(missing_ok=True)
+
+    def _claim_file(self, release: PendingRelease) -> Optional[PendingRelease]:
+        """Take the spool file of a release for this queue.
+
+        Returns:
+            The release as spooled, or None if another queue sharing the spool
+            took it first
+        """
+        path = self._settling_path(release.hold_id)
+        try:
+            os.rename(self._path(release.hold_id), path)
+        except FileNotFoundError:
+            return None
+        try:
+            return PendingRelease.model_validate_json(path.read_bytes())
+        except ValueError:
+            return release
+
+    def _forget(self, release: PendingRelease) -> None:
+        with self._cond:
+            self._pending.pop(release.hold_id, None)
+            self._queued.discard(release.hold_id)
+
+    def _due(self) -> List[PendingRelease]:
+        now = time.time()
+        due = [r for r in self._pending.values() if r.next_attempt_at <= now]
+        return due[: self.batch_size]
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._due()) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                due = self._due()
+                stopping = self._stopping
+            if due:
+                self._settle(due)
+            elif stopping:
+                return
+            if time.time() - self._pruned_at >= CLAIM_PRUNE_INTERVAL:
+                self._prune_claims()
+
+    def _settle(self, due: List[PendingRelease]) -> None:
+        batch = []
+        for release in due:
+            spooled = self._claim_file(release)
+            if spooled is None:
+                logger.debug(
+                    f"Release of hold {release.hold_id} taken by another queue"
+                )
+                self._forget(release)
+            else:
+                batch.append(spooled)
+        if not batch:
+            return
+
+        try:
+            results = self.client.hold.release_many(
+                [{"hold_id": r.hold_id, "amount": r.amount} for r in batch]
+            )
+            errors = [result.error for result in results]
+        except Exception as e:
+            logger.error(f"Settlement batch failed: {e}")
+            errors = [str(e)] * len(batch)
+
+        now = time.time()
+        for release, error in zip(batch, errors):
+            if error is None:
+                self._settling_path(release.hold_id).unlink(missing_ok=True)
+                with self._cond:
+                    self._settled += 1
+                    self._last_settlement_lag = now - release.queued_at
+                self._forget(release)
+                continue
+
+            release.attempts += 1
+            if release.attempts >= self.max_attempts:
+                logger.error(
+                    f"Giving up on releasing hold {release.hold_id} after "
+                    f"{release.attempts} attempts: {error}"
+                )
+                os.replace(
+                    self._settling_path(release.hold_id),
+                    self._path(release.hold_id, self.failed_dir),
+                )
+                with self._cond:
+                    self._failed += 1
+                self._forget(release)
+                continue
+
+            with self._cond:
+                self._retried += 1
+            delay = min(60.0, 2.0**release.attempts) * random.uniform(0.5, 1.0)
+            release.next_attempt_at = now + delay
+            logger.warning(
+                f"Retrying release of hold {release.hold_id} in {delay:.1f}s: {error}"
+            )
+            # back into the spool, where any queue sharing it may retry it
+            self._write(release)
+            self._settling_path(release.hold_id).unlink(missing_ok=True)
+            with self._cond:
+                self._pending[release.hold_id] = release
+
+
+_queue: Optional[SettlementQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_settlement_queue() -> SettlementQueue:
+    """Get the process-wide settlement queue, starting it on first use."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                queue = SettlementQueue()
+                queue.start()
+                atexit.register(queue.close, timeout=10)
+                _queue = queue
+    return _queue
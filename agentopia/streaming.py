@@ -0,0 +1,247 @@
+import codecs
+import re
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Union,
+)
+from uuid import UUID
+
+import orjson
+
+_NEWLINE = re.compile(r"\r\n|\r|\n")
+
+
+class SSEEvent(NamedTuple):
+    """A server-sent event."""
+
+    data: str
+    event: str = "message"
+    id: Optional[str] = None
+    retry: Optional[int] = None
+
+    def json(self) -> Any:
+        """Decode the data of the event as JSON."""
+        return orjson.loads(self.data)
+
+
+class _LineDecoder:
+    """Splits byte chunks into lines ending in \\n, \\r\\n or \\r, across chunks."""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._buffer = ""
+
+    def feed(self, chunk: bytes) -> List[str]:
+        text = self._buffer + self._decoder.decode(chunk)
+        held = ""
+        if text.endswith("\r"):
+            # may be the first half of a \r\n
+            text, held = text[:-1], "\r"
+        lines = _NEWLINE.split(text)
+        self._buffer = lines.pop() + held
+        return lines
+
+    def flush(self) -> List[str]:
+        text = self._buffer + self._decoder.decode(b"", final=True)
+        self._buffer = ""
+        if not text:
+            return []
+        lines = _NEWLINE.split(text)
+        if not lines[-1]:
+            lines.pop()
+        return lines
+
+
+class _SSEDecoder:
+    """Builds events out of the lines of an event stream (WHATWG HTML 9.2.6)."""
+
+    def __init__(self):
+        self._data: List[str] = []
+        self._event = ""
+        self._last_id: Optional[str] = None
+        self._retry: Optional[int] = None
+
+    def decode(self, line: str) -> Optional[SSEEvent]:
+        """Feed a line, returning the event it completes if any."""
+        if not line:
+            event = None
+            if self._data:
+                event = SSEEvent(
+                    "\n".join(self._data),
+                    self._event or "message",
+                    self._last_id,
+                    self._retry,
+                )
+            self._data, self._event, self._retry = [], "", None
+            return event
+        if line.startswith(":"):
+            return None
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event = value
+        elif field == "id":
+            if "\0" not in value:
+                self._last_id = value
+        elif field == "retry":
+            if value.isdigit():
+                self._retry = int(value)
+        return None
+
+
+def _is_event_stream(headers: Mapping[str, str]) -> bool:
+    content_type = headers.get("content-type", "").lower()
+    return content_type.startswith("text/event-stream")
+
+
+class ServiceStream:
+    """Streamed response of a service call.
+
+    Iterating yields `SSEEvent`s for `text/event-stream` responses and raw byte
+    chunks otherwise. The response is closed once it is exhausted. Close the
+    stream (or use it as a context manager) to stop early: the connection is
+    dropped, so the service stops generating and settles the hold for what it
+    delivered.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterator[bytes],
+        close: Callable[[], None],
+        status_code: int,
+        headers: Mapping[str, str],
+        hold_id: Optional[UUID] = None,
+    ):
+        """Initialize the stream.
+
+        Args:
+            chunks: Raw body chunks of the response, as they arrive
+            close: Closes the response
+            status_code: HTTP status code of the response
+            headers: Headers of the response
+            hold_id: Hold the service is paid with, if called directly
+        """
+        self._chunks = chunks
+        self._close = close
+        self._closed = False
+        self.status_code = status_code
+        self.headers = headers
+        self.hold_id = hold_id
+
+    @property
+    def is_event_stream(self) -> bool:
+        return _is_event_stream(self.headers)
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        try:
+            for chunk in self._chunks:
+                if chunk:
+                    yield chunk
+        finally:
+            self.close()
+
+    def iter_lines(self) -> Iterator[str]:
+        decoder = _LineDecoder()
+        for chunk in self.iter_bytes():
+            yield from decoder.feed(chunk)
+        yield from decoder.flush()
+
+    def iter_events(self) -> Iterator[SSEEvent]:
+        decoder = _SSEDecoder()
+        for line in self.iter_lines():
+            event = decoder.decode(line)
+            if event is not None:
+                yield event
+
+    def __iter__(self) -> Iterator[Union[SSEEvent, bytes]]:
+        return self.iter_events() if self.is_event_stream else self.iter_bytes()
+
+    def read(self) -> bytes:
+        """Read the rest of the body."""
+        return b"".join(self.iter_bytes())
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._close()
+
+    def __enter__(self) -> "ServiceStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class AsyncServiceStream:
+    """Async variant of `ServiceStream`."""
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[bytes],
+        aclose: Callable[[], Awaitable[None]],
+        status_code: int,
+        headers: Mapping[str, str],
+        hold_id: Optional[UUID] = None,
+    ):
+        self._chunks = chunks
+        self._aclose = aclose
+        self._closed = False
+        self.status_code = status_code
+        self.headers = headers
+        self.hold_id = hold_id
+
+    @property
+    def is_event_stream(self) -> bool:
+        return _is_event_stream(self.headers)
+
+    async def aiter_bytes(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._chunks:
+                if chunk:
+                    yield chunk
+        finally:
+            await self.aclose()
+
+    async def aiter_lines(self) -> AsyncIterator[str]:
+        decoder = _LineDecoder()
+        async for chunk in self.aiter_bytes():
+            for line in decoder.feed(chunk):
+                yield line
+        for line in decoder.flush():
+            yield line
+
+    async def aiter_events(self) -> AsyncIterator[SSEEvent]:
+        decoder = _SSEDecoder()
+        async for line in self.aiter_lines():
+            event = decoder.decode(line)
+            if event is not None:
+                yield event
+
+    def __aiter__(self) -> AsyncIterator[Union[SSEEvent, bytes]]:
+        return self.aiter_events() if self.is_event_stream else self.aiter_bytes()
+
+    async def aread(self) -> bytes:
+        """Read the rest of the body."""
+        return b"".join([chunk async for chunk in self.aiter_bytes()])
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            await self._aclose()
+
+    async def __aenter__(self) -> "AsyncServiceStream":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
@@ -0,0 +1,104 @@
+import logging
+import random
+from typing import Any, Optional
+
+from agentopia.settings import settings
+
+logger = logging.getLogger("agentopia.http")
+
+
+class _Truncated:
+    """Formats a payload only when a log record is actually emitted."""
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        value = self.value
+        if isinstance(value, (bytes, bytearray)):
+            value = value.decode("utf-8", "replace")
+        text = value if isinstance(value, str) else repr(value)
+        if self.limit and len(text) > self.limit:
+            return f"{text[: self.limit]}... ({len(text)} chars)"
+        return text
+
+
+class Tracer:
+    """Level-gated tracing of API requests and responses.
+
+    Request lines are logged at INFO and payloads at DEBUG. Nothing is formatted,
+    and response bodies are not read, unless the level is enabled. Payloads are
+    truncated to `max_payload` characters and only logged for a `sample_rate`
+    fraction of calls.
+
+    Subclass and pass to the client (`tracer=`) to send traces elsewhere.
+    """
+
+    def __init__(
+        self,
+        log: Optional[logging.Logger] = None,
+        max_payload: Optional[int] = None,
+        sample_rate: Optional[float] = None,
+    ):
+        """Initialize the tracer.
+
+        Args:
+            log: Logger to write to (default: the `agentopia.http` logger)
+            max_payload: Characters of a payload to log, 0 for no limit
+                (default: settings.TRACE_MAX_PAYLOAD)
+            sample_rate: Fraction of calls whose payloads are logged
+                (default: settings.TRACE_SAMPLE_RATE)
+        """
+        self.log = log or logger
+        self.max_payload = (
+            settings.TRACE_MAX_PAYLOAD if max_payload is None else max_payload
+        )
+        self.sample_rate = (
+            settings.TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+        )
+
+    def payloads_enabled(self) -> bool:
+        """Whether payloads of the current call should be traced."""
+        if not self.log.isEnabledFor(logging.DEBUG):
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def request(self, method: str, url: str, payload: Any = None) -> None:
+        if self.log.isEnabledFor(logging.INFO):
+            self.log.info("Making %s request to %s", method, url)
+        if payload is not None and self.payloads_enabled():
+            self.log.debug("Request payload: %s", _Truncated(payload, self.max_payload))
+
+    def response(self, response, data: Any = None) -> None:
+        """Trace a response, `data` is its already parsed body if available."""
+        if not self.payloads_enabled():
+            return
+        self.log.debug(
+            "Response %s: %s",
+            response.status_code,
+            _Truncated(response.content if data is None else data, self.max_payload),
+        )
+
+    def error(self, method: str, error: Exception, response=None) -> None:
+        self.log.error("HTTP error occurred in %s request: %s", method, error)
+        if response is not None and self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(
+                "Response text: %s", _Truncated(response.content, self.max_payload)
+            )
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Get the default tracer of the clients."""
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    """Replace the default tracer of the clients created afterwards."""
+    global _tracer
+    _tracer = tracer
@@ -0,0 +1,86 @@
+import logging
+from typing import Optional
+
+import httpx
+
+from agentopia.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def build_limits(
+    max_connections: Optional[int] = None,
+    max_keepalive_connections: Optional[int] = None,
+    keepalive_expiry: Optional[float] = None,
+) -> httpx.Limits:
+    """Build connection pool limits, falling back to the configured defaults.
+
+    Args:
+        max_connections: Maximum number of concurrent connections
+        max_keepalive_connections: Maximum number of idle connections kept alive
+        keepalive_expiry: Seconds an idle connection is kept before being closed
+
+    Returns:
+        httpx connection pool limits
+    """
+    return httpx.Limits(
+        max_connections=max_connections or settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=max_keepalive_connections
+        or settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=(
+            keepalive_expiry
+            if keepalive_expiry is not None
+            else settings.HTTP_KEEPALIVE_EXPIRY
+        ),
+    )
+
+
+def new_async_client(
+    limits: Optional[httpx.Limits] = None,
+    http2: Optional[bool] = None,
+    timeout: Optional[float] = None,
+) -> httpx.AsyncClient:
+    """Create a long-lived, pooled async HTTP client.
+
+    Args:
+        limits: Connection pool limits (default: built from settings)
+        http2: Whether to negotiate HTTP/2 (default: settings.HTTP_HTTP2)
+        timeout: Request timeout in seconds (default: settings.HTTP_TIMEOUT)
+
+    Returns:
+        A pooled httpx.AsyncClient
+    """
+    http2 = settings.HTTP_HTTP2 if http2 is None else http2
+    logger.debug(f"Creating pooled async HTTP client (http2={http2})")
+    return httpx.AsyncClient(
+        limits=limits or build_limits(),
+        http2=http2,
+        timeout=timeout or settings.HTTP_TIMEOUT,
+    )
+
+
+def new_sync_client(
+    limits: Optional[httpx.Limits] = None,
+    http2: Optional[bool] = None,
+    timeout: Optional[float] = None,
+) -> httpx.Client:
+    """Create a long-lived, pooled HTTP client.
+
+    httpx keeps a separate pool of keep-alive connections per origin, so a single
+    client can be shared across calls to every service.
+
+    Args:
+        limits: Connection pool limits (default: built from settings)
+        http2: Whether to negotiate HTTP/2 (default: settings.HTTP_HTTP2)
+        timeout: Request timeout in seconds (default: settings.HTTP_TIMEOUT)
+
+    Returns:
+        A pooled httpx.Client
+    """
+    http2 = settings.HTTP_HTTP2 if http2 is None else http2
+    logger.debug(f"Creating pooled HTTP client (http2={http2})")
+    return httpx.Client(
+        limits=limits or build_limits(),
+        http2=http2,
+        timeout=timeout or settings.HTTP_TIMEOUT,
+    )
@@ -3,15 +3,19 @@ import math
 import uuid
 from datetime import datetime
 from decimal import Decimal
-from typing import Annotated
+from functools import lru_cache
+from typing import Annotated, Dict, List
 
 import orjson
+import requests
 from eth_account import Account
 from pydantic import BaseModel
 from pydantic.functional_validators import AfterValidator
+from requests.adapters import HTTPAdapter
 from web3 import Web3
-from web3.providers.rpc import HTTPProvider
 
+from agentopia.cache import TTLCache
+from agentopia.services.rpc_service import BatchingHTTPProvider
 from agentopia.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -33,10 +37,60 @@ def validateUSDCAmount(amount: Decimal) -> str:
 USDCAmount = Annotated[Decimal, AfterValidator(validateUSDCAmount)]
 
 
-def get_web3(rpc=None):
-    provider = HTTPProvider(rpc or settings.RPC, request_kwargs={"timeout": 10})
-    web3 = Web3(provider)
-    return web3
+# contract objects keyed by (rpc, chain id, address, id(abi)); the abi is kept in
+# the entry so its id can not be reused while cached
+_contracts = TTLCache(maxsize=256)
+
+
+@lru_cache(maxsize=32)
+def _get_web3(rpc: str) -> Web3:
+    logger.debug(f"Creating Web3 provider for {rpc}")
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=settings.RPC_POOL_SIZE, pool_maxsize=settings.RPC_POOL_SIZE
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    provider = BatchingHTTPProvider(
+        rpc, request_kwargs={"timeout": 10}, session=session
+    )
+    return Web3(provider)
+
+
+def get_web3(rpc=None) -> Web3:
+    """Get the Web3 instance of an RPC, shared by the whole process.
+
+    The provider keeps a pooled `requests` session, so connections to the RPC are
+    reused across calls, and merges requests made concurrently by several threads
+    into JSON-RPC batches.
+
+    Args:
+        rpc: RPC URL (default: settings.RPC)
+
+    Returns:
+        Web3 instance
+    """
+    return _get_web3(rpc or settings.RPC)
+
+
+def get_contract(address: str, abi: List[Dict], rpc=None):
+    """Get the web3 contract object for an address and ABI, built once per RPC.
+
+    Args:
+        address: Checksum address of the contract
+        abi: Contract ABI
+        rpc: RPC URL (default: settings.RPC)
+
+    Returns:
+        web3 Contract
+    """
+    rpc = rpc or settings.RPC
+    key = (rpc, settings.CHAIN_ID, address, id(abi))
+    entry = _contracts.get(key)
+    if entry is None or entry[0] is not abi:
+        entry = (abi, get_web3(rpc).eth.contract(address=address, abi=abi))
+        _contracts.set(key, entry)
+    return entry[1]
 
 
 def get_account(user_pk):
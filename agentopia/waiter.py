@@ -0,0 +1,140 @@
+import asyncio
+import inspect
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Iterator, Optional, TypeVar, Union
+
+from agentopia.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class WaitTimeout(TimeoutError):
+    """Raised when a condition is not met before the deadline."""
+
+
+def backoff_delays(
+    initial: float, maximum: float, multiplier: float = 2.0
+) -> Iterator[float]:
+    """Exponentially growing delays with jitter.
+
+    Each delay is drawn between half and all of the current step, so waiters
+    started together do not poll in lockstep.
+
+    Args:
+        initial: First step in seconds
+        maximum: Largest step in seconds
+        multiplier: Growth of the step after each delay
+    """
+    step = initial
+    while True:
+        yield step * random.uniform(0.5, 1.0)
+        step = min(maximum, step * multiplier)
+
+
+def _deadline(timeout: Optional[float]) -> float:
+    return float("inf") if timeout is None else time.monotonic() + timeout
+
+
+def _remaining(deadline: float, description: str, timeout: Optional[float]) -> float:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise WaitTimeout(f"Timed out after {timeout}s waiting for {description}")
+    return remaining
+
+
+def wait_until(
+    check: Callable[[], T],
+    timeout: Optional[float] = None,
+    initial: float = 0.1,
+    maximum: Optional[float] = None,
+    description: str = "condition",
+) -> T:
+    """Call `check` with exponential backoff until it returns a truthy value.
+
+    Args:
+        check: Function returning a truthy value once the condition is met
+        timeout: Seconds before giving up (default: no deadline)
+        initial: First delay between checks in seconds
+        maximum: Largest delay between checks (default: settings.BLOCK_TIME)
+        description: What is waited for, used in logs and errors
+
+    Returns:
+        The truthy value returned by `check`
+
+    Raises:
+        WaitTimeout: If the condition is not met before the deadline
+    """
+    deadline = _deadline(timeout)
+    delays = backoff_delays(initial, maximum or settings.BLOCK_TIME)
+    while True:
+        result = check()
+        if result:
+            return result
+        remaining = _remaining(deadline, description, timeout)
+        delay = min(next(delays), remaining)
+        logger.debug(f"Waiting {delay:.2f}s for {description}")
+        time.sleep(delay)
+
+
+async def async_wait_until(
+    check: Callable[[], Union[T, Awaitable[T]]],
+    timeout: Optional[float] = None,
+    initial: float = 0.1,
+    maximum: Optional[float] = None,
+    description: str = "condition",
+) -> T:
+    """Async variant of `wait_until`, `check` may be a coroutine function."""
+    deadline = _deadline(timeout)
+    delays = backoff_delays(initial, maximum or settings.BLOCK_TIME)
+    while True:
+        result = check()
+        if inspect.isawaitable(result):
+            result = await result
+        if result:
+            return result
+        remaining = _remaining(deadline, description, timeout)
+        delay = min(next(delays), remaining)
+        logger.debug(f"Waiting {delay:.2f}s for {description}")
+        await asyncio.sleep(delay)
+
+
+def wait_for_blocks(
+    web3,
+    check: Callable[[], T],
+    timeout: Optional[float] = None,
+    description: str = "condition",
+) -> T:
+    """Re-run `check` on every new block until it returns a truthy value.
+
+    New blocks are detected by polling the block number with backoff up to the
+    block time, so the condition is checked once per block instead of at a
+    fixed interval.
+
+    Args:
+        web3: Web3 instance of the chain
+        check: Function returning a truthy value once the condition is met
+        timeout: Seconds before giving up (default: settings.WAIT_TIMEOUT)
+        description: What is waited for, used in logs and errors
+
+    Raises:
+        WaitTimeout: If the condition is not met before the deadline
+    """
+    timeout = settings.WAIT_TIMEOUT if timeout is None else timeout
+    deadline = _deadline(timeout)
+    while True:
+        block_number = web3.eth.block_number
+        result = check()
+        if result:
+            return result
+        remaining = _remaining(deadline, description, timeout)
+        wait_until(
+            lambda: web3.eth.block_number > block_number,
+            timeout=remaining,
+            initial=settings.BLOCK_TIME / 8,
+            maximum=settings.BLOCK_TIME / 2,
+            description=f"a block after {block_number}",
+        )
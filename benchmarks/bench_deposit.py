@@ -0,0 +1,55 @@
+"""Compare sequential and pipelined approve + deposit on a local chain.
+
+Needs a local anvil (or hardhat) node with the MockUSDC and MicroPayment
+contracts deployed and USDC minted to the depositing account, as in the local
+Agentopia stack. Mine blocks on an interval to see the difference a block makes:
+
+    anvil --block-time 2
+    python benchmarks/bench_deposit.py --usdc 0x... --micropayment 0x... --rounds 5
+"""
+import argparse
+import time
+
+from agentopia.deposit import deposit_onchain
+from agentopia.settings import settings
+
+# first anvil / hardhat development account
+ANVIL_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+
+
+def measure(name: str, rounds: int, private_key: str, amount: int, pipeline: bool):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        # the allowance is used up by each deposit, so every round approves again
+        deposit_onchain(private_key, amount, pipeline=pipeline)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(
+        f"{name:<12} median {timings[len(timings) // 2]:8.2f} s"
+        f"   max {timings[-1]:8.2f} s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rpc", default="http://127.0.0.1:8545")
+    parser.add_argument("--chain-id", type=int, default=31337)
+    parser.add_argument("--usdc", required=True)
+    parser.add_argument("--micropayment", required=True)
+    parser.add_argument("--private-key", default=ANVIL_KEY)
+    parser.add_argument("--amount", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    settings.RPC = args.rpc
+    settings.CHAIN_ID = args.chain_id
+    settings.USDC_ADDRESS = args.usdc
+    settings.MICROPAYMENT_ADDRESS = args.micropayment
+
+    measure("sequential", args.rounds, args.private_key, args.amount, False)
+    measure("pipelined", args.rounds, args.private_key, args.amount, True)
+
+
+if __name__ == "__main__":
+    main()
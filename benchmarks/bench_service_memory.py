@@ -0,0 +1,99 @@
+"""Measure the memory and time spent decoding service listings.
+
+Builds a catalog of services with OpenAPI schemas of a given size, encodes it
+as search responses (pages of 10 services) and decodes every page as the full
+`ServiceModel` and as the slim `ServiceSummary` that `search()` returns with
+`include_schema=False`. Retained memory is what the decoded catalog keeps
+alive, peak memory includes the garbage built while decoding.
+
+    python benchmarks/bench_service_memory.py --services 500 --paths 100
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+import uuid
+from typing import List
+
+import orjson
+
+from agentopia.client import _decode_response
+from agentopia.service import ServiceModel, ServiceSummary
+
+
+def make_schema(paths: int) -> dict:
+    operation = {
+        "summary": "Call the endpoint",
+        "requestBody": {
+            "content": {
+                "application/json": {"schema": {"$ref": "#/components/schemas/Request"}}
+            }
+        },
+        "responses": {
+            "200": {"description": "Successful Response"},
+            "422": {"description": "Validation Error"},
+        },
+    }
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": "Service", "version": "0.1.0"},
+        "paths": {f"/v1/endpoint/{i}": {"post": operation} for i in range(paths)},
+    }
+
+
+def make_catalog(services: int, paths: int) -> List[bytes]:
+    catalog = [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Service {i}",
+            "description": "A service in the benchmark catalog",
+            "base_url": f"https://service-{i}.example.com",
+            "slug": f"service-{i}",
+            "default_hold_amount": 10_000,
+            "default_hold_expires_in": 3600,
+            "api_schema": make_schema(paths),
+            "service_provider_id": "0x15d34AAf54267DB7D7c367839AAf71A00a2C6A65",
+            "created_at": "2024-12-01T00:00:00Z",
+            "updated_at": "2024-12-01T00:00:00Z",
+            "tags": ["benchmark"],
+        }
+        for i in range(services)
+    ]
+    return [orjson.dumps({"data": catalog[i : i + 10]}) for i in range(0, services, 10)]
+
+
+def measure(name: str, pages: List[bytes], model) -> None:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    decoded = [_decode_response(page, List[model]) for page in pages]
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    services = sum(len(page) for page in decoded)
+    print(
+        f"{name:<16} {elapsed * 1e3:9.1f} ms"
+        f"   retained {retained / 2**20:8.2f} MiB"
+        f"   peak {peak / 2**20:8.2f} MiB"
+        f"   ({services} services)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--services", type=int, default=500)
+    parser.add_argument("--paths", type=int, default=100)
+    args = parser.parse_args()
+
+    pages = make_catalog(args.services, args.paths)
+    size = sum(len(page) for page in pages)
+    print(f"catalog: {len(pages)} pages, {size / 2**20:.2f} MiB of JSON")
+    # warm up the validators so their construction is not measured
+    _decode_response(pages[0], List[ServiceModel])
+    _decode_response(pages[0], List[ServiceSummary])
+    measure("ServiceModel", pages, ServiceModel)
+    measure("ServiceSummary", pages, ServiceSummary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Measure the cost of constructing an Agentopia client.
+
+Runs a local stub of the Agentopia auth endpoints with an artificial latency and
+compares eager construction, eager construction with the process-wide auth
+cache, and lazy construction.
+
+    python benchmarks/bench_startup.py --latency 0.05 --rounds 20
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from agentopia import Agentopia
+from agentopia import auth
+
+TEST_KEY = "0x47e179ec197488593b187f80a00eb0da91f1b9d0b13f8733639f19c30a34926a"
+
+
+def serve(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path.endswith("/nonce"):
+                body = {"data": {"nonce": 1}}
+            else:
+                body = {"data": {"message": "Sign in to Agentopia"}}
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(name: str, rounds: int, build) -> None:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        client = build()
+        timings.append(time.perf_counter() - start)
+        client.close()
+    timings.sort()
+    print(
+        f"{name:<24} median {timings[len(timings) // 2] * 1000:8.2f} ms"
+        f"   max {timings[-1] * 1000:8.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    server = serve(args.latency)
+    api_url = f"http://127.0.0.1:{server.server_port}"
+
+    def eager():
+        auth._auth_headers.clear()
+        return Agentopia(private_key=TEST_KEY, api_url=api_url)
+
+    def eager_cached():
+        return Agentopia(private_key=TEST_KEY, api_url=api_url)
+
+    def lazy():
+        auth._auth_headers.clear()
+        return Agentopia(private_key=TEST_KEY, api_url=api_url, lazy=True)
+
+    measure("eager", args.rounds, eager)
+    measure("eager, cached auth", args.rounds, eager_cached)
+    measure("lazy", args.rounds, lazy)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
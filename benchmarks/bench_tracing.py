@@ -0,0 +1,87 @@
+"""Measure the per-call cost of request/response logging.
+
+Compares the eager f-string logging the client used to do on every call with
+the level-gated tracer, for a large JSON response, with logging at INFO (the
+usual production level) and at DEBUG.
+
+    python benchmarks/bench_tracing.py --payload-kb 200 --calls 2000
+"""
+import argparse
+import json
+import logging
+import time
+
+from agentopia.tracing import Tracer
+
+logger = logging.getLogger("agentopia.bench")
+
+
+class Response:
+    status_code = 200
+    headers = {"Content-Type": "application/json"}
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode()
+
+
+def eager(url: str, payload: dict, response: Response, data: dict) -> None:
+    logger.info(f"Making POST request to {url}")
+    logger.debug(f"Request JSON payload: {payload}")
+    logger.debug(f"Response text: {response.text}")
+    logger.debug(f"Response headers: {response.headers}")
+    logger.debug(f"Parsed JSON response: {data}")
+
+
+def traced(tracer: Tracer):
+    def call(url: str, payload: dict, response: Response, data: dict) -> None:
+        tracer.request("POST", url, payload)
+        tracer.response(response, data)
+
+    return call
+
+
+def measure(name: str, calls: int, log_call, *args) -> None:
+    start = time.perf_counter()
+    for _ in range(calls):
+        log_call(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {elapsed / calls * 1e6:10.2f} us/call")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--payload-kb", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    data = {"data": {"output": "x" * (args.payload_kb * 1024)}}
+    payload = {"prompt": "y" * (args.payload_kb * 1024)}
+    response = Response(json.dumps(data).encode())
+    url = "https://api.agentopia.xyz/v1/hold"
+
+    # the records are discarded, only building them is measured
+    logging.basicConfig(handlers=[logging.NullHandler()])
+    tracer = Tracer(log=logger)
+    for level in (logging.INFO, logging.DEBUG):
+        logger.setLevel(level)
+        level_name = logging.getLevelName(level)
+        measure(
+            f"eager ({level_name})", args.calls, eager, url, payload, response, data
+        )
+        measure(
+            f"tracer ({level_name})",
+            args.calls,
+            traced(tracer),
+            url,
+            payload,
+            response,
+            data,
+        )
+
+
+if __name__ == "__main__":
+    main()
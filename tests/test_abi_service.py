@@ -0,0 +1,75 @@
+import json
+import os
+
+from agentopia.services import abi_service
+from agentopia.services.abi_service import bundled_abi_path, get_abi, get_abi_info
+
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+
+def test_abi_is_parsed_once() -> None:
+    path = bundled_abi_path("MockUSDC.json")
+    assert get_abi(path) is get_abi(path)
+
+
+def test_lookup_tables() -> None:
+    info = get_abi_info(bundled_abi_path("MockUSDC.json"))
+    assert info.event_topics["Transfer"] == TRANSFER_TOPIC
+    assert info.topics[TRANSFER_TOPIC]["name"] == "Transfer"
+    # balanceOf(address)
+    assert info.selectors["0x70a08231"]["name"] == "balanceOf"
+
+
+def test_legacy_relative_path_works_from_any_directory(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    assert get_abi("./agentopia/abis/MockUSDC.json")
+
+
+def test_relative_bundled_path_ignores_working_directory(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "agentopia" / "abis").mkdir(parents=True)
+    (tmp_path / "agentopia" / "abis" / "MockUSDC.json").write_text("[]")
+    assert get_abi("agentopia/abis/MockUSDC.json") == get_abi(
+        bundled_abi_path("MockUSDC.json")
+    )
+
+
+def test_changed_file_is_loaded_again(tmp_path) -> None:
+    path = tmp_path / "Token.json"
+    path.write_text(json.dumps([]))
+    assert get_abi(str(path)) == []
+    loaded = len(abi_service._abis)
+    event = {"type": "event", "name": "Ping", "inputs": [], "anonymous": False}
+    path.write_text(json.dumps([event]))
+    os.utime(path, (0, os.path.getmtime(path) + 1))
+    assert get_abi_info(str(path)).events["Ping"] == event
+    # the new version replaces the previous one
+    assert len(abi_service._abis) == loaded
+
+
+def test_decode_transfer_log() -> None:
+    from eth_abi import encode
+
+    from agentopia.services.web3_service import Contract
+
+    usdc = Contract(
+        contract_address="0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+        abi_path=bundled_abi_path("MockUSDC.json"),
+    )
+    sender, receiver = "0x" + "11" * 20, "0x" + "22" * 20
+    log = {
+        "address": usdc.address,
+        "topics": [
+            TRANSFER_TOPIC,
+            "0x" + "00" * 12 + sender[2:],
+            "0x" + "00" * 12 + receiver[2:],
+        ],
+        "data": "0x" + encode(["uint256"], [5]).hex(),
+        "blockNumber": 1,
+        "transactionHash": "0x" + "ab" * 32,
+        "transactionIndex": 0,
+        "blockHash": "0x" + "cd" * 32,
+        "logIndex": 0,
+    }
+    decoded = usdc.decode_txn([log])
+    assert decoded["Transfer"][0]["value"] == 5
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from agentopia import AgentopiaServiceModel, AsyncAgentopia
+
+
+class TestAsyncAgentopia:
+    @pytest.fixture(autouse=True)
+    def setup_method(self) -> None:
+        # Use test server endpoints
+        self.api_url = "http://localhost:8889"
+        self.rpc_url = "http://localhost:8545"
+
+        # Create client with test private key
+        # address = 0x15d34AAf54267DB7D7c367839AAf71A00a2C6A65
+        self.test_key = (
+            "0x47e179ec197488593b187f80a00eb0da91f1b9d0b13f8733639f19c30a34926a"
+        )
+
+    def _client(self) -> AsyncAgentopia:
+        return AsyncAgentopia(
+            api_url=self.api_url,
+            private_key=self.test_key,
+            micropayment_address="0xF461d09EB295f1538a6fec92072eB2F3578e121a",
+            usdc_address="0x8d63C7203d88c95c30C68283c34F743e061c2a31",
+            rpc=self.rpc_url,
+            chain_id=31337,
+        )
+
+    def test_get_balance(self) -> None:
+        async def run():
+            async with self._client() as client:
+                return await client.get_balance()
+
+        balance = asyncio.run(run())
+        assert balance.available_balance >= 0
+
+    def test_concurrent_execute(self) -> None:
+        unique_slug = "hello-world-service"
+
+        async def run():
+            async with self._client() as client:
+                service = await client.service.get_by_slug(slug=unique_slug)
+                assert isinstance(service, AgentopiaServiceModel)
+                initial_balance = (await client.get_balance()).available_balance
+
+                responses = await asyncio.gather(
+                    *[
+                        client.service.execute(
+                            service_slug=unique_slug,
+                            endpoint_path="hello_world",
+                            method="GET",
+                        )
+                        for _ in range(10)
+                    ]
+                )
+                final_balance = (await client.get_balance()).available_balance
+                return responses, initial_balance, final_balance
+
+        responses, initial_balance, final_balance = asyncio.run(run())
+        assert all(r["message"] == "Hello from Agentopia!" for r in responses)
+        assert final_balance + 10 == initial_balance
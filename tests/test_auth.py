@@ -0,0 +1,199 @@
+import json
+import threading
+import uuid
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+from eth_account import Account
+
+from agentopia import Agentopia
+
+
+def make_response(status_code: int, body) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode()
+    response._content_consumed = True
+    return response
+
+
+class FakeSession:
+    """Agentopia API accepting every wallet auth header it has not revoked."""
+
+    def __init__(self, nonce_status: int = 200):
+        self.headers = {}
+        self.nonce_status = nonce_status
+        self.sign_ins = 0
+        self.revoked = set()
+        self.reject_all = False
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        path = urlsplit(url).path
+        auth = self.headers.get("Authorization")
+        self.requests.append((path, auth))
+        if path.endswith("/nonce"):
+            with self._lock:
+                self.sign_ins += 1
+                nonce = self.sign_ins
+            return make_response(self.nonce_status, {"nonce": nonce})
+        if path == "/v1/platform/message_to_sign":
+            return make_response(200, {"message": "Sign in to Agentopia"})
+        if auth is None or auth in self.revoked or self.reject_all:
+            return make_response(401, {"detail": "Unauthorized"})
+        return make_response(200, {"data": "ok"})
+
+    def close(self) -> None:
+        pass
+
+
+def make_client(key: str, api_url: str, session: FakeSession) -> Agentopia:
+    client = Agentopia(private_key=key, api_url=api_url, lazy=True)
+    client.session = session
+    return client
+
+
+@pytest.fixture
+def api_url() -> str:
+    # the auth header cache is process-wide, keyed by wallet and API URL
+    return f"http://{uuid.uuid4().hex}.api.test"
+
+
+KEY = Account.create().key.hex()
+
+
+def test_401_signs_in_again_once(api_url) -> None:
+    session = FakeSession()
+    client = make_client(KEY, api_url, session)
+    assert client._get("/v1/balance") == "ok"
+    assert session.sign_ins == 1
+
+    session.revoked.add(session.headers["Authorization"])
+    assert client._get("/v1/balance") == "ok"
+    assert session.sign_ins == 2
+
+    # a header rejected right after signing in is not retried forever
+    session.reject_all = True
+    with pytest.raises(requests.HTTPError):
+        client._get("/v1/balance")
+    assert session.sign_ins == 3
+
+
+def test_concurrent_401s_sign_in_once(api_url) -> None:
+    session = FakeSession()
+    client = make_client(KEY, api_url, session)
+    client._get("/v1/balance")
+    rejected = session.headers["Authorization"]
+    session.revoked.add(rejected)
+
+    # all threads get their 401 before any of them signs in again
+    threads = 8
+    barrier = threading.Barrier(threads)
+    original = session.request
+
+    def request(method, url, **kwargs):
+        response = original(method, url, **kwargs)
+        if response.status_code == 401:
+            barrier.wait(timeout=10)
+        return response
+
+    session.request = request
+    results = []
+
+    def call():
+        results.append(client._get("/v1/balance"))
+
+    workers = [threading.Thread(target=call) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert results == ["ok"] * threads
+    assert session.sign_ins == 2
+    assert session.headers["Authorization"] != rejected
+
+
+def test_cached_header_reused_across_clients(api_url) -> None:
+    session = FakeSession()
+    make_client(KEY, api_url, session)._get("/v1/balance")
+    header = session.headers["Authorization"]
+
+    other = FakeSession()
+    assert make_client(KEY, api_url, other)._get("/v1/balance") == "ok"
+    assert other.sign_ins == 0
+    assert other.headers["Authorization"] == header
+
+    # another wallet signs in on its own
+    other = FakeSession()
+    make_client(Account.create().key.hex(), api_url, other)._get("/v1/balance")
+    assert other.sign_ins == 1
+
+
+def test_401_during_sign_in_does_not_recurse(api_url) -> None:
+    session = FakeSession(nonce_status=401)
+    client = make_client(KEY, api_url, session)
+    with pytest.raises(requests.HTTPError):
+        client._get("/v1/balance")
+    assert session.sign_ins == 1
+    assert "Authorization" not in session.headers
+
+    # a rejected header whose sign in fails again
+    session = FakeSession()
+    client = make_client(KEY, api_url, session)
+    client._get("/v1/balance")
+    session.revoked.add(session.headers["Authorization"])
+    session.nonce_status = 401
+    with pytest.raises(requests.HTTPError):
+        client._get("/v1/balance")
+    assert session.sign_ins == 2
+
+
+def test_concurrent_first_requests_sign_in_once(api_url) -> None:
+    session = FakeSession()
+    client = make_client(KEY, api_url, session)
+    assert session.requests == []
+
+    threads = 8
+    barrier = threading.Barrier(threads)
+    results = []
+
+    def call():
+        barrier.wait(timeout=10)
+        results.append(client._get("/v1/balance"))
+
+    workers = [threading.Thread(target=call) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert results == ["ok"] * threads
+    assert session.sign_ins == 1
+    paths = [path for path, _ in session.requests]
+    assert paths.count("/v1/platform/message_to_sign") == 1
+    # no request went out before the sign in finished
+    assert all(auth for path, auth in session.requests if path == "/v1/balance")
+
+
+def test_sign_in_requests_skip_ensure_auth(api_url, monkeypatch) -> None:
+    session = FakeSession()
+    client = make_client(KEY, api_url, session)
+    sign_ins = []
+    sign_in = client._sign_in
+
+    def counting_sign_in():
+        sign_ins.append(client._authenticating)
+        sign_in()
+
+    monkeypatch.setattr(client, "_sign_in", counting_sign_in)
+    client._get("/v1/balance")
+
+    # the nonce and message requests did not start a sign in of their own
+    assert sign_ins == [False]
+    assert session.requests[:2] == [
+        (f"/v1/user/{client.address}/nonce", None),
+        ("/v1/platform/message_to_sign", None),
+    ]
@@ -0,0 +1,170 @@
+import time
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+from agentopia.cache import TTLCache
+from agentopia.service import (
+    AsyncServiceManager,
+    ServiceCache,
+    ServiceManager,
+    ServiceModel,
+    ServiceSummary,
+)
+from agentopia.services import read_service
+from agentopia.settings import settings
+
+
+def make_service(slug: str = "hello-world-service") -> ServiceModel:
+    return ServiceModel(
+        id=uuid.uuid4(),
+        name="Hello World Service",
+        description="A simple service to demonstrate the Agentopia.xyz platform",
+        base_url="http://localhost:8890/hello-world-service",
+        slug=slug,
+        default_hold_amount=10,
+        default_hold_expires_in=3600,
+        service_provider_id="0x15d34AAf54267DB7D7c367839AAf71A00a2C6A65",
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    )
+
+
+class TestTTLCache:
+    def test_hit_and_miss(self) -> None:
+        cache = TTLCache(maxsize=2, ttl=60)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+
+    def test_expiry_keeps_stale_value_for_peek(self) -> None:
+        cache = TTLCache(maxsize=2, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert cache.peek("a") == 1
+
+    def test_lru_eviction(self) -> None:
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.stats.evictions == 1
+
+
+class TestServiceCache:
+    def test_store_by_slug_and_id(self) -> None:
+        cache = ServiceCache(ttl=60, maxsize=10)
+        service = make_service()
+        cache.store(service, etag='"v1"')
+        assert cache.get(("slug", service.slug)) == service
+        assert cache.get(("id", str(service.id))) == service
+        assert cache.etag(("slug", service.slug)) == '"v1"'
+
+    def test_services_handed_out_as_copies(self) -> None:
+        cache = ServiceCache(ttl=60, maxsize=10)
+        service = make_service()
+        service.api_schema = {"paths": {"/hello": {}}}
+        stored = service.model_copy(deep=True)
+        cache.store(service)
+        service.name = "changed by the caller"
+        cache.get(("slug", service.slug)).api_schema["paths"].clear()
+        assert cache.get(("slug", service.slug)) == stored
+
+    def test_invalidate_by_slug_drops_id(self) -> None:
+        cache = ServiceCache(ttl=60, maxsize=10)
+        service = make_service()
+        cache.store(service)
+        cache.invalidate(slug=service.slug)
+        assert cache.get(("id", str(service.id))) is None
+
+    def test_invalidate_after_one_key_was_evicted(self) -> None:
+        cache = ServiceCache(ttl=60, maxsize=3)
+        service, other = make_service(), make_service(slug="other")
+        cache.store(service)
+        # evicts the slug key of the first service, its id key is left
+        cache.store(other)
+        assert cache.get(("slug", service.slug)) is None
+        assert cache.get(("id", str(service.id))) == service
+
+        cache.invalidate(slug=service.slug)
+        assert cache.get(("id", str(service.id))) is None
+        assert cache.get(("slug", "other")) == other
+
+    def test_revalidated_every_time_by_default(self) -> None:
+        cache = ServiceCache()
+        service = make_service()
+        cache.store(service, etag='"v1"')
+        assert cache.enabled
+        assert cache.get(("slug", service.slug)) is None
+        assert cache.etag(("slug", service.slug)) == '"v1"'
+
+    def test_cache_shared_by_the_managers_of_an_api(self) -> None:
+        client = SimpleNamespace(api_url="http://api.test")
+        cache = ServiceManager(client).cache
+        assert AsyncServiceManager(client).cache is cache
+        assert (
+            ServiceManager(SimpleNamespace(api_url="http://other.test")).cache
+            is not cache
+        )
+
+    def test_refresh_after_not_modified(self) -> None:
+        cache = ServiceCache(ttl=0.01, maxsize=10)
+        service = make_service()
+        cache.store(service, etag='"v1"')
+        time.sleep(0.02)
+        assert cache.get(("slug", service.slug)) is None
+        assert cache.refresh(("slug", service.slug)) == service
+        assert cache.get(("slug", service.slug)) == service
+        assert cache.stats.revalidations == 1
+
+    def test_summary_does_not_satisfy_full_model(self) -> None:
+        cache = ServiceCache(ttl=60, maxsize=10)
+        service = make_service()
+        summary = ServiceSummary(**service.model_dump())
+        cache.store(summary, etag='"v1"')
+        key = ("slug", service.slug)
+        assert cache.get(key) == summary
+        assert cache.get(key, ServiceModel) is None
+        # a 304 for the full model must not refresh the summary
+        assert cache.etag(key, ServiceModel) is None
+
+        cache.store(service, etag='"v1"')
+        assert cache.get(key, ServiceModel) == service
+        assert isinstance(cache.get(key, ServiceSummary), ServiceModel)
+
+
+class TestReadCache:
+    ADDRESS = "0x15d34AAf54267DB7D7c367839AAf71A00a2C6A65"
+
+    def key(self, default_block):
+        return read_service.get_read_cache_key(
+            self.ADDRESS, 8453, [], "balanceOf", default_block, (), None
+        )
+
+    def test_ttl_by_block(self) -> None:
+        assert read_service.get_read_cache_ttl(123) is None
+        assert read_service.get_read_cache_ttl("0x7b") is None
+        assert read_service.get_read_cache_ttl("latest") == settings.READ_CACHE_TTL
+        assert read_service.get_read_cache_ttl("pending") == 0
+
+    def test_key_depends_on_rpc_and_chain(self, monkeypatch) -> None:
+        key = self.key("latest")
+        assert key != read_service.get_read_cache_key(
+            self.ADDRESS, 1, [], "balanceOf", "latest", (), None
+        )
+        monkeypatch.setattr(settings, "RPC", "http://127.0.0.1:8545")
+        assert self.key("latest") != key
+
+    def test_invalidate_keeps_fixed_blocks(self) -> None:
+        read_service.cache.clear()
+        read_service.cache.set(self.key("latest"), 1)
+        read_service.cache.set(self.key(123), 2)
+        assert read_service.invalidate_reads(self.ADDRESS) == 1
+        assert read_service.cache.get(self.key("latest")) is None
+        assert read_service.cache.get(self.key(123)) == 2
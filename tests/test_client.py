@@ -0,0 +1,101 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import orjson
+import pytest
+from pydantic import ValidationError
+
+from agentopia.client import Agentopia, Balance, _decode_response
+from agentopia.service import ServiceModel, ServiceSummary
+
+SERVICE = {
+    "id": "6f1c1c3e-0a4e-4a53-8d0b-6a4cb6b1f0a1",
+    "name": "Echo",
+    "description": "Echoes its input",
+    "base_url": "https://echo.example.com",
+    "slug": "echo",
+    "default_hold_amount": 1000,
+    "default_hold_expires_in": 3600,
+    "api_schema": {"openapi": "3.1.0", "paths": {"/echo": {"post": {}}}},
+    "service_provider_id": "0x4838B106FCe9647Bdf1E7877BF73cE8B0BAD5f97",
+    "created_at": "2024-12-01T00:00:00Z",
+    "updated_at": "2024-12-01T00:00:00Z",
+}
+
+
+def test_untyped_response_unwrapped() -> None:
+    assert _decode_response(b'{"data": {"hold_id": 1}}') == {"hold_id": 1}
+    assert _decode_response(b'{"message": "ok"}') == {"message": "ok"}
+    assert _decode_response(b"[1, 2]") == [1, 2]
+
+
+def test_model_validated_from_envelope() -> None:
+    content = orjson.dumps({"data": SERVICE})
+    service = _decode_response(content, ServiceModel)
+    assert service == ServiceModel(**SERVICE)
+
+    services = _decode_response(orjson.dumps({"data": [SERVICE]}), List[ServiceModel])
+    assert services == [ServiceModel(**SERVICE)]
+
+
+def test_model_validated_without_envelope() -> None:
+    content = b'{"available_balance": 5, "amount_on_hold": 1}'
+    assert _decode_response(content, Balance) == Balance(
+        available_balance=5, amount_on_hold=1
+    )
+    services = _decode_response(orjson.dumps([SERVICE]), List[ServiceModel])
+    assert services[0].slug == "echo"
+
+
+def test_summary_skips_schema() -> None:
+    services = _decode_response(orjson.dumps({"data": [SERVICE]}), List[ServiceSummary])
+    assert type(services[0]) is ServiceSummary
+    assert not hasattr(services[0], "api_schema")
+    assert services[0].base_url == SERVICE["base_url"]
+
+
+def test_invalid_data_raises() -> None:
+    with pytest.raises(ValidationError):
+        _decode_response(b'{"data": {"available_balance": "lots"}}', Balance)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self.server.peers.append(self.client_address)
+        self.server.headers.append(self.headers.get("Authorization"))
+        body = b'{"data": "ok"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def external_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.peers = []
+    server.headers = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_external_requests_reuse_connections(external_server) -> None:
+    base_url = f"http://127.0.0.1:{external_server.server_address[1]}"
+    with Agentopia(api_key="key", api_url="http://api.test") as client:
+        for _ in range(3):
+            assert client._request("GET", "/ping", base_url=base_url) == "ok"
+
+    # one connection for all calls, without the API auth header
+    assert len(external_server.peers) == 3
+    assert len(set(external_server.peers)) == 1
+    assert external_server.headers == [None] * 3
@@ -0,0 +1,164 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from agentopia import decorator
+from agentopia.decorator import _hold_ttl, payable, verify_hold
+from agentopia.settlement import SettlementQueue
+
+
+class FakeHoldManager:
+    def __init__(self):
+        self.released = []
+        self.fetched = []
+        self.cached_on_release = []
+
+    async def get(self, hold_id):
+        self.fetched.append(hold_id)
+        return {"id": hold_id, "amount": 100}
+
+    async def release(self, hold_id, amount):
+        self.cached_on_release.append(hold_id in decorator.verified_holds)
+        self.released.append((hold_id, amount))
+
+
+@pytest.fixture
+def hold(monkeypatch):
+    client = SimpleNamespace(hold=FakeHoldManager())
+    monkeypatch.setattr(decorator, "get_provider_client", lambda: client)
+    decorator.verified_holds.clear()
+    return client.hold
+
+
+@payable(hold_amount=100, settlement="sync")
+async def endpoint(request):
+    return SimpleNamespace(headers={"X-Usdc-Used": "7"})
+
+
+calls = []
+
+
+@payable(hold_amount=100, settlement="deferred")
+async def deferred_endpoint(request):
+    calls.append(request.headers["X-Hold-Id"])
+    return SimpleNamespace(headers={"X-Usdc-Used": "7"})
+
+
+def call(hold_id: str, endpoint=endpoint):
+    request = SimpleNamespace(headers={"X-Hold-Id": hold_id})
+    return asyncio.run(endpoint(request=request))
+
+
+def test_hold_pays_for_a_single_call(hold) -> None:
+    hold_id = str(uuid.uuid4())
+    call(hold_id)
+    assert hold.released == [(hold_id, 7)]
+
+    with pytest.raises(HTTPException) as e:
+        call(hold_id.upper())
+    assert e.value.status_code == 402
+    assert len(hold.released) == 1
+
+
+def test_malformed_hold_id_rejected(hold) -> None:
+    with pytest.raises(HTTPException) as e:
+        call("../../settlement/other")
+    assert e.value.status_code == 400
+    assert hold.released == []
+
+
+def test_hold_claimed_across_processes_before_the_call(
+    hold, tmp_path, monkeypatch
+) -> None:
+    # workers sharing the spool, with the settlement interval out of the way
+    queues = [
+        SettlementQueue(client=None, spool_dir=str(tmp_path), flush_interval=60)
+        for _ in range(2)
+    ]
+    hold_id = str(uuid.uuid4())
+    calls.clear()
+
+    monkeypatch.setattr(decorator, "get_settlement_queue", lambda: queues[0])
+    call(hold_id, deferred_endpoint)
+    assert calls == [hold_id]
+
+    # the second worker has not seen the hold yet
+    decorator.spent_holds.pop(hold_id)
+    monkeypatch.setattr(decorator, "get_settlement_queue", lambda: queues[1])
+    with pytest.raises(HTTPException) as e:
+        call(hold_id, deferred_endpoint)
+    assert e.value.status_code == 402
+    assert calls == [hold_id]
+    assert [path.name for path in tmp_path.glob("*.json")] == [f"{hold_id}.json"]
+
+
+def test_verified_hold_served_from_cache(hold) -> None:
+    client = SimpleNamespace(hold=hold)
+    hold_id = str(uuid.uuid4())
+    asyncio.run(verify_hold(client, hold_id))
+    asyncio.run(verify_hold(client, hold_id))
+    assert hold.fetched == [hold_id]
+
+    # sync settlement asks the API every time
+    asyncio.run(verify_hold(client, hold_id, use_cache=False))
+    assert hold.fetched == [hold_id, hold_id]
+
+    other_id = str(uuid.uuid4())
+    asyncio.run(verify_hold(client, other_id, use_cache=False))
+    asyncio.run(verify_hold(client, other_id))
+    assert hold.fetched == [hold_id, hold_id, other_id, other_id]
+
+
+def test_hold_cached_until_it_expires_at_most() -> None:
+    ttl = decorator.settings.HOLD_VERIFY_CACHE_TTL
+    assert _hold_ttl({"id": "a"}) == ttl
+    assert _hold_ttl({"expires_at": "next tuesday"}) == ttl
+
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl / 2)
+    assert 0 < _hold_ttl({"expires_at": expires_at.isoformat()}) <= ttl / 2
+    # naive timestamps are in UTC
+    naive = expires_at.replace(tzinfo=None).isoformat()
+    assert 0 < _hold_ttl({"expires_at": naive}) <= ttl / 2
+
+    expired = datetime.fromtimestamp(time.time() - 60, timezone.utc)
+    assert _hold_ttl({"expires_at": expired.isoformat()}) < 0
+
+
+def test_hold_evicted_before_release(hold, tmp_path, monkeypatch) -> None:
+    hold_id = str(uuid.uuid4())
+    call(hold_id)
+    assert hold.cached_on_release == [False]
+
+    queue = SettlementQueue(client=None, spool_dir=str(tmp_path), flush_interval=60)
+    monkeypatch.setattr(decorator, "get_settlement_queue", lambda: queue)
+    deferred_id = str(uuid.uuid4())
+    call(deferred_id, deferred_endpoint)
+    # verified for the call, dropped once its release is queued
+    assert hold.fetched == [hold_id, deferred_id]
+    assert deferred_id not in decorator.verified_holds
+
+
+def test_provider_client_closed_with_its_loop(monkeypatch) -> None:
+    closed = []
+
+    class FakeClient:
+        async def aclose(self):
+            closed.append(self)
+
+    monkeypatch.setattr(decorator, "AsyncAgentopia", FakeClient)
+
+    async def serve():
+        client = decorator.get_provider_client()
+        assert decorator.get_provider_client() is client
+        await asyncio.sleep(0)
+        return client
+
+    client = asyncio.run(serve())
+    assert closed == [client]
+    assert asyncio.run(serve()) is not client
+    assert len(closed) == 2
@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+from eth_account import Account
+from hexbytes import HexBytes
+
+from agentopia import deposit
+from agentopia.deposit import ApprovalFailedError
+
+KEYS = [Account.create().key.hex() for _ in range(3)]
+
+
+@pytest.fixture
+def fake_deposit(monkeypatch):
+    calls = []
+    active = set()
+    lock = threading.Lock()
+
+    def _deposit(private_key, amount, pipeline=True):
+        with lock:
+            # deposits of one wallet never overlap
+            assert private_key not in active
+            active.add(private_key)
+            calls.append((private_key, amount))
+        try:
+            if amount < 0:
+                raise ValueError("insufficient funds")
+            receipt = {
+                "transactionHash": HexBytes(amount.to_bytes(32, "big")),
+                "gasUsed": 50_000,
+                "status": 1,
+            }
+            return None, receipt
+        finally:
+            with lock:
+                active.discard(private_key)
+
+    monkeypatch.setattr(deposit, "_deposit", _deposit)
+    return calls
+
+
+def test_deposit_many_reports_every_wallet(fake_deposit) -> None:
+    deposits = [(KEYS[0], 1), (KEYS[1], 2), (KEYS[0], 3), (KEYS[2], -1)]
+    results = deposit.deposit_many(deposits, max_workers=4)
+
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert [result.ok for result in results] == [True, True, True, False]
+    assert results[0].address == Account.from_key(KEYS[0]).address
+    assert results[0].gas_used == 50_000
+    assert results[2].deposit_tx_hash.endswith("03")
+    assert results[3].error == "insufficient funds"
+    assert len(fake_deposit) == len(deposits)
+
+
+class FakeContract:
+    def __init__(self, name, sent, statuses):
+        self.name = name
+        self.sent = sent
+        self.statuses = statuses
+
+    def s(self, function_name, *args):
+        return [self.name, function_name, *args]
+
+    def send(self, function_name, *args):
+        self.sent.append(function_name)
+        return f"0x{function_name}"
+
+    def wait_for_receipt(self, txn_hash):
+        return {"transactionHash": txn_hash, "status": self.statuses[txn_hash]}
+
+
+def test_reverted_approval_raises(monkeypatch) -> None:
+    sent = []
+    statuses = {"0xapprove": 0, "0xdeposit": 0}
+    monkeypatch.setattr(
+        deposit, "get_token_contract", lambda _: FakeContract("usdc", sent, statuses)
+    )
+    monkeypatch.setattr(
+        deposit,
+        "get_micropayments_contract",
+        lambda _: FakeContract("micropayments", sent, statuses),
+    )
+    monkeypatch.setattr(deposit, "read_many", lambda calls: [0, 0])
+
+    with pytest.raises(ApprovalFailedError, match="0xapprove"):
+        deposit.deposit_onchain(KEYS[0], 10)
+    assert sent == ["approve", "deposit"]
+
+    sent.clear()
+    with pytest.raises(ApprovalFailedError, match="0xapprove"):
+        deposit.deposit_onchain(KEYS[0], 10, pipeline=False)
+    assert sent == ["approve"]
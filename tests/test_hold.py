@@ -0,0 +1,256 @@
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+import pytest
+from agentopia import Agentopia
+from agentopia.settings import settings
+from agentopia.hold import (
+    AsyncHoldManager,
+    AsyncHoldPool,
+    HoldBatchResult,
+    HoldManager,
+    HoldPool,
+)
+
+
+class TestAgentopiaHold:
+    @pytest.fixture(autouse=True)
+    def setup_method(self) -> None:
+        # Use test server endpoints
+        self.api_url = "http://localhost:8889"
+        self.rpc_url = "http://localhost:8545"
+
+        # Create client with test private key
+        # address = 0x15d34AAf54267DB7D7c367839AAf71A00a2C6A65
+        self.test_key = (
+            "0x47e179ec197488593b187f80a00eb0da91f1b9d0b13f8733639f19c30a34926a"
+        )
+        self.pf = Agentopia(
+            api_url=self.api_url,
+            private_key=self.test_key,
+            micropayment_address="0xF461d09EB295f1538a6fec92072eB2F3578e121a",
+            usdc_address="0x8d63C7203d88c95c30C68283c34F743e061c2a31",
+            rpc=self.rpc_url,
+            chain_id=31337,
+        )
+
+    def teardown_method(self) -> None:
+        try:
+            self.pf.close()
+        except AttributeError:
+            pass
+
+    def test_create_and_release_many(self) -> None:
+        service = self.pf.service.get_by_slug(slug="hello-world-service")
+        initial_balance = self.pf.get_balance().available_balance
+
+        results = self.pf.hold.create_many(
+            [{"service_id": service.id, "amount": 10, "expires_in": 600}] * 5,
+            batch_size=2,
+        )
+        assert [r.index for r in results] == list(range(5))
+        assert all(r.ok for r in results)
+
+        results = self.pf.hold.release_many(
+            [{"hold_id": r.hold_id, "amount": 1} for r in results], batch_size=2
+        )
+        assert all(r.ok for r in results)
+
+        balance = self.pf.get_balance()
+        assert balance.available_balance + 5 == initial_balance
+
+
+class MockAPI:
+    """Agentopia API answering hold releases, optionally without batch routes."""
+
+    def __init__(self, batch_route, release_body=None):
+        self.batch_route = batch_route
+        self.release_body = release_body or {"message": "released"}
+        self.paths = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.paths.append(request.url.path)
+        if request.url.path != "/v1/hold/batch":
+            return httpx.Response(200, json=self.release_body)
+        if self.batch_route is None:
+            return httpx.Response(404, json={"detail": "Not Found"})
+        if not self.batch_route:
+            # matched by /v1/hold/{hold_id}, which rejects "batch" as a hold ID
+            detail = [{"loc": ["path", "hold_id"], "msg": "Input should be a UUID"}]
+            return httpx.Response(422, json={"detail": detail})
+        items = json.loads(request.read())
+        if any(item["amount"] < 0 for item in items):
+            return httpx.Response(422, json={"detail": "Invalid amount"})
+        return httpx.Response(200, json=[{"message": "released"} for _ in items])
+
+
+class MockClient:
+    def __init__(self, api: MockAPI):
+        self.http = httpx.Client(
+            base_url="http://api.test", transport=httpx.MockTransport(api)
+        )
+
+    def _delete(self, path: str, idempotent=None, **kwargs):
+        assert idempotent is False
+        response = self.http.request("DELETE", path, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+
+class AsyncMockClient:
+    def __init__(self, api: MockAPI):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return api(request)
+
+        self.http = httpx.AsyncClient(
+            base_url="http://api.test", transport=httpx.MockTransport(handler)
+        )
+
+    async def _delete(self, path: str, idempotent=None, **kwargs):
+        assert idempotent is False
+        response = await self.http.request("DELETE", path, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+
+RELEASES = [{"hold_id": str(uuid.uuid4()), "amount": 1} for _ in range(3)]
+
+
+def test_release_many_falls_back_on_422() -> None:
+    api = MockAPI(batch_route=False)
+    manager = HoldManager(MockClient(api))
+    results = manager.release_many(RELEASES, batch_size=2)
+    assert all(r.ok for r in results)
+    assert [str(r.hold_id) for r in results] == [r["hold_id"] for r in RELEASES]
+    # probed once, then single calls only
+    assert api.paths.count("/v1/hold/batch") == 1
+    assert len(api.paths) == 4
+
+    # a 422 may be a validation error, so the next call probes again
+    manager.release_many(RELEASES)
+    assert api.paths.count("/v1/hold/batch") == 2
+
+    api = MockAPI(batch_route=False)
+    manager = AsyncHoldManager(AsyncMockClient(api))
+    results = asyncio.run(manager.release_many(RELEASES))
+    assert all(r.ok for r in results)
+    assert api.paths.count("/v1/hold/batch") == 1
+
+
+def test_missing_batch_route_remembered() -> None:
+    api = MockAPI(batch_route=None)
+    manager = HoldManager(MockClient(api))
+    manager.release_many(RELEASES)
+    assert all(r.ok for r in manager.release_many(RELEASES))
+    assert api.paths.count("/v1/hold/batch") == 1
+    assert len(api.paths) == 7
+
+
+def test_single_release_with_non_dict_body() -> None:
+    for body in ("released", [1, 2]):
+        api = MockAPI(batch_route=None, release_body=body)
+        results = HoldManager(MockClient(api)).release_many(RELEASES)
+        assert all(r.ok for r in results)
+        assert [r.result for r in results] == [
+            {"hold_id": r["hold_id"], "result": body} for r in RELEASES
+        ]
+
+        api = MockAPI(batch_route=None, release_body=body)
+        manager = AsyncHoldManager(AsyncMockClient(api))
+        results = asyncio.run(manager.release_many(RELEASES))
+        assert [r.result for r in results] == [
+            {"hold_id": r["hold_id"], "result": body} for r in RELEASES
+        ]
+
+
+def test_422_from_batch_route_is_an_error() -> None:
+    api = MockAPI(batch_route=True)
+    manager = HoldManager(MockClient(api))
+    assert all(r.ok for r in manager.release_many(RELEASES))
+
+    invalid = [{**release, "amount": -1} for release in RELEASES]
+    results = manager.release_many(invalid)
+    assert not any(r.ok for r in results)
+    assert api.paths == ["/v1/hold/batch"] * 2
+
+
+class FakePoolManager:
+    """Hold manager whose holds are created inline, never by the pool refill."""
+
+    def __init__(self):
+        self.released = []
+
+    def create(self, service_id, amount, expires_in):
+        return uuid.uuid4()
+
+    def create_many(self, holds):
+        return []
+
+    def release_many(self, releases):
+        self.released.extend(release["hold_id"] for release in releases)
+        return [HoldBatchResult(index=index) for index in range(len(releases))]
+
+
+class AsyncFakePoolManager(FakePoolManager):
+    async def create(self, service_id, amount, expires_in):
+        return uuid.uuid4()
+
+    async def create_many(self, holds):
+        return []
+
+    async def release_many(self, releases):
+        return FakePoolManager.release_many(self, releases)
+
+
+def fill_pool(pool, key):
+    expiring, fresh = uuid.uuid4(), uuid.uuid4()
+    pool._put(key, expiring, time.monotonic() + 10)
+    pool._put(key, fresh, time.monotonic() + 600)
+    return expiring, fresh
+
+
+def test_pool_releases_holds_close_to_expiry() -> None:
+    service_id = str(uuid.uuid4())
+    key = (service_id, 10, 600)
+
+    manager = FakePoolManager()
+    pool = HoldPool(manager, size=2, min_ttl=30)
+    expiring, fresh = fill_pool(pool, key)
+    assert pool.acquire(service_id, 10, 600) == fresh
+    pool.close()
+    assert manager.released == [expiring]
+
+    async def run_async():
+        manager = AsyncFakePoolManager()
+        pool = AsyncHoldPool(manager, size=2, min_ttl=30)
+        expiring, fresh = fill_pool(pool, key)
+        assert await pool.acquire(service_id, 10, 600) == fresh
+        await pool.close()
+        assert manager.released == [expiring]
+
+    asyncio.run(run_async())
+
+
+class PoolClient(Agentopia):
+    """Client whose hold requests are answered without an API."""
+
+    def _post(self, path, json=None, **kwargs):
+        if path == "/v1/hold/batch":
+            return [{"hold_id": str(uuid.uuid4())} for _ in json]
+        return {"hold_id": str(uuid.uuid4())}
+
+    def _delete(self, path, json=None, **kwargs):
+        return [{"message": "released"} for _ in json]
+
+
+def test_pool_usable_after_close(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "HOLD_POOL_SIZE", 2)
+    client = PoolClient(api_url="http://api.test", api_key="key")
+    service_id = str(uuid.uuid4())
+    assert client.hold.acquire(service_id, 10, 600)
+    client.close()
+    assert client.hold.acquire(service_id, 10, 600)
+    client.close()
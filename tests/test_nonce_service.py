@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from agentopia.services.nonce_service import NonceManager
+
+ACCOUNT = "0x15d34AAf54267DB7D7c367839AAf71A00a2C6A65"
+
+
+class FakeEth:
+    def __init__(self, nonce: int):
+        self.nonce = nonce
+        self.calls = 0
+
+    def get_transaction_count(self, account: str, block_identifier: str) -> int:
+        self.calls += 1
+        return self.nonce
+
+
+class FakeWeb3:
+    def __init__(self, nonce: int):
+        self.eth = FakeEth(nonce)
+
+
+def test_allocates_consecutive_nonces() -> None:
+    manager = NonceManager()
+    web3 = FakeWeb3(nonce=5)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        nonces = list(
+            executor.map(lambda _: manager.allocate(web3, ACCOUNT), range(20))
+        )
+    assert sorted(nonces) == list(range(5, 25))
+    assert web3.eth.calls == 1
+
+
+def test_resync_reads_the_chain_again() -> None:
+    manager = NonceManager()
+    web3 = FakeWeb3(nonce=5)
+    assert manager.allocate(web3, ACCOUNT) == 5
+    web3.eth.nonce = 9
+    manager.resync(ACCOUNT)
+    assert manager.allocate(web3, ACCOUNT) == 9
@@ -0,0 +1,201 @@
+import asyncio
+import time
+
+import pytest
+import requests
+
+from agentopia.pipeline import (
+    AsyncRequestPipeline,
+    CircuitBreaker,
+    CircuitOpenError,
+    PipelineRequest,
+    RequestPipeline,
+    RetryPolicy,
+    async_circuit_breaker_middleware,
+    circuit_breaker_middleware,
+    default_async_middlewares,
+    retry_middleware,
+    retry_after,
+    timeout_middleware,
+)
+
+
+class Response:
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class Server:
+    """Answers requests with the queued responses (or raises queued errors)."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, request: PipelineRequest):
+        self.requests.append(dict(request.kwargs))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+async def _async(server, request):
+    return server(request)
+
+
+POLICY = RetryPolicy(max_attempts=3, backoff=0.001, max_backoff=0.001)
+
+
+def test_idempotent_request_retried() -> None:
+    failed = Response(503)
+    server = Server(failed, Response(502), Response(200))
+    pipeline = RequestPipeline(server, [retry_middleware(POLICY)])
+    response = pipeline(PipelineRequest("GET", "https://api.test/v1/balance"))
+    assert response.status_code == 200
+    assert len(server.requests) == 3
+    assert failed.closed
+
+
+def test_retries_give_up_after_max_attempts() -> None:
+    server = Server(Response(503), Response(503), Response(503), Response(200))
+    pipeline = RequestPipeline(server, [retry_middleware(POLICY)])
+    response = pipeline(PipelineRequest("DELETE", "https://api.test/v1/hold/1"))
+    assert response.status_code == 503
+    assert len(server.requests) == 3
+
+
+def test_charging_delete_not_retried() -> None:
+    server = Server(Response(502), Response(200))
+    pipeline = RequestPipeline(server, [retry_middleware(POLICY)])
+    request = PipelineRequest(
+        "DELETE", "https://api.test/v1/hold/1", {"json": {"amount": 7}}
+    )
+    response = pipeline(request)
+    assert response.status_code == 502
+    assert len(server.requests) == 1
+
+
+def test_post_not_retried_unless_safe() -> None:
+    server = Server(Response(503), Response(200))
+    pipeline = RequestPipeline(server, [retry_middleware(POLICY)])
+    response = pipeline(PipelineRequest("POST", "https://api.test/v1/hold"))
+    assert response.status_code == 503
+
+    # the server rejected it before processing, or the connection never opened
+    server = Server(
+        Response(429, {"Retry-After": "0"}),
+        requests.ConnectTimeout(),
+        Response(200),
+    )
+    pipeline = RequestPipeline(server, [retry_middleware(POLICY)])
+    response = pipeline(PipelineRequest("POST", "https://api.test/v1/hold"))
+    assert response.status_code == 200
+
+    server = Server(requests.ReadTimeout(), Response(200))
+    pipeline = RequestPipeline(server, [retry_middleware(POLICY)])
+    with pytest.raises(requests.ReadTimeout):
+        pipeline(PipelineRequest("POST", "https://api.test/v1/hold"))
+
+
+def test_post_retried_when_marked_idempotent() -> None:
+    server = Server(requests.ReadTimeout(), Response(200))
+    pipeline = RequestPipeline(server, [retry_middleware(POLICY)])
+    request = PipelineRequest("POST", "https://api.test/v1/read", idempotent=True)
+    assert pipeline(request).status_code == 200
+
+
+def test_retry_after() -> None:
+    assert retry_after(Response(429, {"Retry-After": "2"})) == 2
+    assert retry_after(Response(429)) is None
+    assert retry_after(Response(429, {"Retry-After": "soon"})) is None
+    past = Response(503, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    assert retry_after(past) == 0
+
+    delays = iter([0.1])
+    assert POLICY.delay(delays, Response(429, {"Retry-After": "1.5"})) == 1.5
+
+
+def test_timeout_set_unless_given() -> None:
+    server = Server(Response(200), Response(200))
+    pipeline = RequestPipeline(server, [timeout_middleware(7)])
+    pipeline(PipelineRequest("GET", "https://api.test/v1/balance"))
+    pipeline(PipelineRequest("GET", "https://api.test/v1/x", {"timeout": 1}))
+    assert [r["timeout"] for r in server.requests] == [7, 1]
+
+
+def test_circuit_breaker_opens_and_recovers() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    # a single trial request at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_circuit_breaker_middleware_fails_fast(monkeypatch) -> None:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    monkeypatch.setattr("agentopia.pipeline.get_circuit_breaker", lambda host: breaker)
+    server = Server(Response(500), Response(500), Response(200))
+    pipeline = RequestPipeline(server, [circuit_breaker_middleware()])
+    for _ in range(2):
+        pipeline(PipelineRequest("GET", "https://api.test/v1/balance"))
+    with pytest.raises(CircuitOpenError):
+        pipeline(PipelineRequest("GET", "https://api.test/v1/balance"))
+    assert len(server.requests) == 2
+
+
+def test_cancelled_trial_frees_the_circuit(monkeypatch) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    monkeypatch.setattr("agentopia.pipeline.get_circuit_breaker", lambda host: breaker)
+    breaker.record_failure()
+    assert breaker.state == "half-open"
+
+    async def hang(request):
+        await asyncio.sleep(60)
+
+    async def run():
+        pipeline = AsyncRequestPipeline(hang, [async_circuit_breaker_middleware()])
+        request = PipelineRequest("GET", "https://api.test/v1/balance")
+        trial = asyncio.ensure_future(pipeline(request))
+        await asyncio.sleep(0)
+        assert not breaker.allow()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(run())
+    assert breaker.allow()
+
+
+def test_async_pipeline() -> None:
+    server = Server(Response(504), Response(200))
+    pipeline = AsyncRequestPipeline(
+        lambda request: _async(server, request),
+        default_async_middlewares(timeout=5, policy=POLICY),
+    )
+    request = PipelineRequest("GET", "https://async.api.test/v1/balance")
+    response = asyncio.run(pipeline(request))
+    assert response.status_code == 200
+    assert [r["timeout"] for r in server.requests] == [5, 5]
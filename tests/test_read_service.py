@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import pytest
+from web3 import Web3
+
+from agentopia.services import read_service
+from agentopia.services.web3_service import Contract
+
+BALANCE_OF_ABI = [
+    {
+        "type": "function",
+        "name": "balanceOf",
+        "stateMutability": "view",
+        "inputs": [{"name": "account", "type": "address"}],
+        "outputs": [{"name": "", "type": "uint256"}],
+    }
+]
+TOKEN = "0x8d63C7203d88c95c30C68283c34F743e061c2a31"
+OWNERS = [Web3.to_checksum_address(f"0x{i:040x}") for i in range(1, 5)]
+# reads of this owner fail with a JSON-RPC error
+REVERTING = OWNERS[2]
+
+
+class StubProvider:
+    """Answers `balanceOf(owner)` calls with 10 times the owner address."""
+
+    def __init__(self):
+        self.batches = []
+
+    def make_batch_request(self, requests):
+        self.batches.append(requests)
+        responses = []
+        for id_, (method, (transaction, block)) in enumerate(requests):
+            assert method == "eth_call"
+            owner = int(transaction["data"][-40:], 16)
+            if Web3.to_checksum_address(f"0x{owner:040x}") == REVERTING:
+                error = {"code": 3, "message": "execution reverted"}
+                responses.append({"jsonrpc": "2.0", "id": id_, "error": error})
+                continue
+            result = "0x" + (owner * 10).to_bytes(32, "big").hex()
+            responses.append({"jsonrpc": "2.0", "id": id_, "result": result})
+        return responses
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = StubProvider()
+    web3 = Web3()
+    monkeypatch.setattr(
+        read_service,
+        "get_web3",
+        lambda: SimpleNamespace(provider=provider, codec=web3.codec),
+    )
+    monkeypatch.setattr(
+        read_service,
+        "get_contract",
+        lambda address, abi: web3.eth.contract(address=address, abi=abi),
+    )
+    read_service.cache.clear()
+    yield provider
+    read_service.cache.clear()
+
+
+def call(owner):
+    return [TOKEN, BALANCE_OF_ABI, "balanceOf", owner]
+
+
+def test_mixed_batch_in_input_order(provider) -> None:
+    # cached by a first read
+    assert read_service.read_many([call(OWNERS[1])]) == [20]
+
+    results = read_service.read_many([call(owner) for owner in OWNERS])
+    assert results == [10, 20, None, 40]
+    # the cached read was not sent again
+    assert len(provider.batches[1]) == 3
+
+    # the failed read is not cached
+    assert read_service.read_many([call(REVERTING)]) == [None]
+    assert len(provider.batches) == 3
+
+
+def test_contract_read_many(provider) -> None:
+    contract = Contract.__new__(Contract)
+    contract.contract_address = TOKEN
+    contract.abi = BALANCE_OF_ABI
+    results = contract.read_many(*[("balanceOf", owner) for owner in OWNERS])
+    assert results == [10, 20, None, 40]
+    assert len(provider.batches) == 1
@@ -0,0 +1,62 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from web3 import Web3
+
+from agentopia.services.rpc_service import BatchingHTTPProvider
+
+
+class EchoNonceHandler(BaseHTTPRequestHandler):
+    """Answers eth_getTransactionCount with the last bytes of the address."""
+
+    posts: list = []
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.posts.append(body)
+
+        def respond(request):
+            nonce = int(request["params"][0][-4:], 16)
+            return {"jsonrpc": "2.0", "id": request["id"], "result": hex(nonce)}
+
+        if isinstance(body, list):
+            response = [respond(request) for request in body]
+        else:
+            response = respond(body)
+        data = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def rpc_url():
+    EchoNonceHandler.posts = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EchoNonceHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_sequential_requests_are_not_batched(rpc_url: str) -> None:
+    w3 = Web3(BatchingHTTPProvider(rpc_url, batch_window=0.01))
+    address = Web3.to_checksum_address("0x" + "0" * 38 + "07")
+    assert w3.eth.get_transaction_count(address) == 7
+    assert isinstance(EchoNonceHandler.posts[0], dict)
+
+
+def test_concurrent_requests_are_batched(rpc_url: str) -> None:
+    w3 = Web3(BatchingHTTPProvider(rpc_url, batch_window=0.01, max_batch_size=50))
+    addresses = [Web3.to_checksum_address(f"0x{i:040x}") for i in range(1, 101)]
+    with ThreadPoolExecutor(max_workers=25) as executor:
+        nonces = list(executor.map(w3.eth.get_transaction_count, addresses))
+    assert nonces == list(range(1, 101))
+    assert len(EchoNonceHandler.posts) < len(addresses)
@@ -0,0 +1,185 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+import pytest
+
+from agentopia.hold import HoldBatchResult
+from agentopia.settlement import (
+    HoldAlreadyClaimedError,
+    HoldAlreadyQueuedError,
+    PendingRelease,
+    SettlementQueue,
+)
+
+HOLD_IDS = [str(uuid.uuid4()) for _ in range(5)]
+
+
+class FakeHoldManager:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.released = []
+
+    def release_many(self, releases):
+        if self.fail:
+            raise ConnectionError("Agentopia API unavailable")
+        self.released.extend(releases)
+        return [
+            HoldBatchResult(index=index, result={"message": "released"})
+            for index, _ in enumerate(releases)
+        ]
+
+
+class FakeClient:
+    def __init__(self, fail: bool = False):
+        self.hold = FakeHoldManager(fail)
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestSettlementQueue:
+    def test_settles_in_batches(self, tmp_path) -> None:
+        client = FakeClient()
+        queue = SettlementQueue(
+            client=client, spool_dir=str(tmp_path), batch_size=3, flush_interval=0.05
+        )
+        queue.start()
+        for i, hold_id in enumerate(HOLD_IDS):
+            queue.submit(hold_id, amount=i + 1)
+
+        wait_for(lambda: queue.metrics().settled == 5)
+        queue.close()
+
+        released = sorted(r["hold_id"] for r in client.hold.released)
+        assert released == sorted(HOLD_IDS)
+        assert queue.metrics().queue_depth == 0
+        assert list(tmp_path.glob("*.json")) == []
+
+    def test_spooled_releases_are_replayed(self, tmp_path) -> None:
+        queue = SettlementQueue(
+            client=FakeClient(fail=True), spool_dir=str(tmp_path), flush_interval=0.05
+        )
+        queue.start()
+        queue.submit(HOLD_IDS[0], amount=10)
+        wait_for(lambda: queue.metrics().retried >= 1)
+        queue.close()
+        assert (tmp_path / f"{HOLD_IDS[0]}.json").exists()
+
+        client = FakeClient()
+        queue = SettlementQueue(
+            client=client, spool_dir=str(tmp_path), flush_interval=0.05
+        )
+        queue.start()
+        wait_for(lambda: queue.metrics().settled == 1)
+        queue.close()
+
+        assert client.hold.released == [{"hold_id": HOLD_IDS[0], "amount": 10}]
+        assert not (tmp_path / f"{HOLD_IDS[0]}.json").exists()
+
+    def test_hold_queued_once(self, tmp_path) -> None:
+        client = FakeClient()
+        queue = SettlementQueue(
+            client=client, spool_dir=str(tmp_path), flush_interval=0.05
+        )
+        queue.submit(HOLD_IDS[0].upper(), amount=10)
+        with pytest.raises(HoldAlreadyQueuedError):
+            queue.submit(HOLD_IDS[0], amount=20)
+        with pytest.raises(ValueError):
+            queue.submit("../../etc/passwd", amount=10)
+        assert [path.name for path in tmp_path.iterdir()] == [f"{HOLD_IDS[0]}.json"]
+
+        queue.start()
+        wait_for(lambda: queue.metrics().settled == 1)
+        queue.close()
+        assert client.hold.released == [{"hold_id": HOLD_IDS[0], "amount": 10}]
+
+    def test_queues_sharing_a_spool_settle_each_release_once(self, tmp_path) -> None:
+        spooler = SettlementQueue(client=FakeClient(), spool_dir=str(tmp_path))
+        for hold_id in HOLD_IDS:
+            spooler.submit(hold_id, amount=1)
+
+        clients = [FakeClient(), FakeClient()]
+        queues = [
+            SettlementQueue(
+                client=client,
+                spool_dir=str(tmp_path),
+                batch_size=2,
+                flush_interval=0.01,
+            )
+            for client in clients
+        ]
+        for queue in queues:
+            queue.start()
+        wait_for(lambda: sum(q.metrics().settled for q in queues) == len(HOLD_IDS))
+        wait_for(lambda: all(q.metrics().queue_depth == 0 for q in queues))
+        for queue in queues:
+            queue.close()
+
+        released = [r["hold_id"] for c in clients for r in c.hold.released]
+        assert sorted(released) == sorted(HOLD_IDS)
+        assert list(tmp_path.glob("*.json")) == []
+        assert list((tmp_path / "settling").iterdir()) == []
+
+    def test_releases_of_dead_processes_recovered(self, tmp_path) -> None:
+        process = subprocess.Popen([sys.executable, "-c", ""])
+        process.wait()
+        settling = tmp_path / "settling"
+        settling.mkdir()
+        owner = f"{socket.gethostname()}-{process.pid}"
+        (settling / f"{HOLD_IDS[0]}.{owner}.json").write_text(
+            PendingRelease(
+                hold_id=HOLD_IDS[0], amount=3, queued_at=time.time()
+            ).model_dump_json()
+        )
+        # a live process is still settling this one
+        owner = f"{socket.gethostname()}-{os.getpid()}"
+        (settling / f"{HOLD_IDS[1]}.{owner}.json").write_text("{}")
+
+        client = FakeClient()
+        queue = SettlementQueue(
+            client=client, spool_dir=str(tmp_path), flush_interval=0.01
+        )
+        queue.start()
+        wait_for(lambda: queue.metrics().settled == 1)
+        queue.close()
+
+        assert client.hold.released == [{"hold_id": HOLD_IDS[0], "amount": 3}]
+        assert [p.name for p in settling.iterdir()] == [f"{HOLD_IDS[1]}.{owner}.json"]
+
+    def test_hold_claimed_once_across_queues(self, tmp_path) -> None:
+        queues = [
+            SettlementQueue(client=FakeClient(), spool_dir=str(tmp_path))
+            for _ in range(2)
+        ]
+        for queue in queues:
+            queue.start()
+        try:
+            expires_at = time.time() + 60
+            queues[0].claim(HOLD_IDS[0], expires_at)
+            with pytest.raises(HoldAlreadyClaimedError):
+                queues[1].claim(HOLD_IDS[0].upper(), expires_at)
+
+            queues[0].unclaim(HOLD_IDS[0])
+            queues[1].claim(HOLD_IDS[0], expires_at)
+            # a claim of an expired hold is dropped by the next queue that starts
+            queues[1].claim(HOLD_IDS[1], time.time() - 1)
+        finally:
+            for queue in queues:
+                queue.close()
+        assert sorted(path.name for path in (tmp_path / "claims").iterdir()) == sorted(
+            f"{hold_id}.json" for hold_id in HOLD_IDS[:2]
+        )
+
+        queue = SettlementQueue(client=FakeClient(), spool_dir=str(tmp_path))
+        queue.start()
+        queue.close()
+        assert [path.name for path in (tmp_path / "claims").iterdir()] == [
+            f"{HOLD_IDS[0]}.json"
+        ]
@@ -0,0 +1,158 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import httpx
+import pytest
+
+from agentopia.service import (
+    AsyncServiceManager,
+    ServiceCache,
+    ServiceManager,
+    ServiceSummary,
+)
+from agentopia.streaming import (
+    ServiceStream,
+    SSEEvent,
+    _LineDecoder,
+    _SSEDecoder,
+)
+
+HOLD_ID = uuid.uuid4()
+EVENTS = (
+    b": keep-alive\n\n"
+    b'data: {"delta": "Hel"}\n\n'
+    b"event: usage\r\nid: 7\r\ndata: line 1\r\ndata: line 2\r\n\r\n"
+    b"data: [DONE]\n\n"
+)
+
+
+def split(data: bytes, size: int):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def decode_events(chunks) -> list:
+    lines, decoder = _LineDecoder(), _SSEDecoder()
+    events = []
+    for chunk in chunks:
+        events.extend(decoder.decode(line) for line in lines.feed(chunk))
+    events.extend(decoder.decode(line) for line in lines.flush())
+    return [event for event in events if event is not None]
+
+
+def test_events_decoded_across_chunk_boundaries() -> None:
+    expected = [
+        SSEEvent('{"delta": "Hel"}'),
+        SSEEvent("line 1\nline 2", event="usage", id="7"),
+        SSEEvent("[DONE]", id="7"),
+    ]
+    for size in (1, 2, 3, 7, len(EVENTS)):
+        assert decode_events(split(EVENTS, size)) == expected
+    assert expected[0].json() == {"delta": "Hel"}
+
+
+def test_lines_split_on_any_newline() -> None:
+    decoder = _LineDecoder()
+    lines = decoder.feed("é\r".encode()[:1])
+    lines += decoder.feed("é\r".encode()[1:])
+    lines += decoder.feed(b"\nb\rc\nd")
+    assert lines + decoder.flush() == ["é", "b", "c", "d"]
+
+
+def test_stream_closed_when_exhausted_or_stopped() -> None:
+    closed = []
+    stream = ServiceStream(
+        iter(split(EVENTS, 5)),
+        lambda: closed.append(True),
+        200,
+        {"content-type": "text/event-stream; charset=utf-8"},
+    )
+    with stream:
+        first = next(iter(stream))
+    assert first.data == '{"delta": "Hel"}'
+    assert closed == [True]
+
+    stream = ServiceStream(
+        iter([b"ab", b"", b"c"]), lambda: closed.append(True), 200, {}
+    )
+    assert list(stream) == [b"ab", b"c"]
+    assert len(closed) == 2
+
+
+class FakeHold:
+    def acquire(self, service_id, amount, expires_in):
+        return HOLD_ID
+
+
+class FakeAsyncHold:
+    async def acquire(self, service_id, amount, expires_in):
+        return HOLD_ID
+
+
+def make_summary() -> ServiceSummary:
+    return ServiceSummary(
+        id=uuid.uuid4(),
+        name="LLM Service",
+        description="Streams completions",
+        base_url="http://llm.test",
+        slug="llm-service",
+        default_hold_amount=100000,
+        default_hold_expires_in=600,
+        service_provider_id="0x15d34AAf54267DB7D7c367839AAf71A00a2C6A65",
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    )
+
+
+def handler(request: httpx.Request, content=None) -> httpx.Response:
+    if request.url.path == "/missing":
+        return httpx.Response(404, json={"detail": "Not Found"})
+    assert request.headers["X-Hold-Id"] == str(HOLD_ID)
+    return httpx.Response(
+        200,
+        headers={"content-type": "text/event-stream"},
+        content=content or iter(split(EVENTS, 4)),
+    )
+
+
+def test_execute_streams_events() -> None:
+    class Client:
+        http = httpx.Client(transport=httpx.MockTransport(handler))
+        api_url = "http://api.test"
+        hold = FakeHold()
+
+    manager = ServiceManager(Client())
+    manager.cache = ServiceCache(ttl=60)
+    manager.cache.store(make_summary())
+    with manager.execute("llm-service", "chat", "POST", stream=True, json={}) as stream:
+        assert stream.hold_id == HOLD_ID
+        events = [event.data for event in stream]
+    assert events == ['{"delta": "Hel"}', "line 1\nline 2", "[DONE]"]
+
+    with pytest.raises(httpx.HTTPStatusError):
+        manager.execute("llm-service", "missing", "GET", stream=True)
+
+
+def test_async_execute_streams_events() -> None:
+    async def chunks():
+        for chunk in split(EVENTS, 4):
+            yield chunk
+
+    async def async_handler(request: httpx.Request) -> httpx.Response:
+        return handler(request, chunks())
+
+    async def run():
+        class Client:
+            http = httpx.AsyncClient(transport=httpx.MockTransport(async_handler))
+            api_url = "http://api.test"
+            hold = FakeAsyncHold()
+
+        manager = AsyncServiceManager(Client())
+        manager.cache = ServiceCache(ttl=60)
+        manager.cache.store(make_summary())
+        stream = await manager.execute("llm-service", "chat", "POST", stream=True)
+        async with stream:
+            return [event.data async for event in stream]
+
+    events = asyncio.run(run())
+    assert events == ['{"delta": "Hel"}', "line 1\nline 2", "[DONE]"]
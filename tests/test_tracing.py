@@ -0,0 +1,38 @@
+import logging
+
+from agentopia.tracing import Tracer
+
+
+class Unformattable:
+    def __repr__(self) -> str:
+        raise AssertionError("payload formatted while DEBUG is disabled")
+
+
+class Response:
+    status_code = 200
+    content = b'{"data": "' + b"x" * 100 + b'"}'
+
+
+def test_payloads_not_formatted_above_debug(caplog) -> None:
+    tracer = Tracer(log=logging.getLogger("agentopia.test.tracing"))
+    with caplog.at_level(logging.INFO, logger="agentopia.test.tracing"):
+        tracer.request("POST", "https://api.agentopia.xyz/v1/hold", Unformattable())
+        tracer.response(Response(), Unformattable())
+    assert [record.getMessage() for record in caplog.records] == [
+        "Making POST request to https://api.agentopia.xyz/v1/hold"
+    ]
+
+
+def test_payloads_truncated_at_debug(caplog) -> None:
+    tracer = Tracer(log=logging.getLogger("agentopia.test.tracing"), max_payload=10)
+    with caplog.at_level(logging.DEBUG, logger="agentopia.test.tracing"):
+        tracer.response(Response())
+    message = caplog.records[0].getMessage()
+    assert message == 'Response 200: {"data": "... (112 chars)'
+
+
+def test_sampling_skips_payloads(caplog) -> None:
+    tracer = Tracer(log=logging.getLogger("agentopia.test.tracing"), sample_rate=0)
+    with caplog.at_level(logging.DEBUG, logger="agentopia.test.tracing"):
+        tracer.response(Response(), Unformattable())
+    assert not caplog.records
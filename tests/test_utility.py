@@ -0,0 +1,42 @@
+from agentopia.settings import settings
+from agentopia.utility import get_contract, get_web3
+
+ABI = [
+    {
+        "type": "function",
+        "name": "balanceOf",
+        "stateMutability": "view",
+        "inputs": [{"name": "account", "type": "address"}],
+        "outputs": [{"name": "", "type": "uint256"}],
+    }
+]
+TOKEN = "0x8d63C7203d88c95c30C68283c34F743e061c2a31"
+RPC = "http://127.0.0.1:8545"
+OTHER_RPC = "http://127.0.0.1:9545"
+
+
+def test_web3_shared_per_rpc(monkeypatch) -> None:
+    web3 = get_web3(RPC)
+    assert get_web3(RPC) is web3
+    other = get_web3(OTHER_RPC)
+    assert other is not web3
+    assert other.provider is not web3.provider
+    assert other.provider.endpoint_uri == OTHER_RPC
+
+    monkeypatch.setattr(settings, "RPC", OTHER_RPC)
+    assert get_web3() is other
+
+
+def test_contract_shared_per_rpc(monkeypatch) -> None:
+    contract = get_contract(TOKEN, ABI, rpc=RPC)
+    assert get_contract(TOKEN, ABI, rpc=RPC) is contract
+    assert contract.w3 is get_web3(RPC)
+
+    other = get_contract(TOKEN, ABI, rpc=OTHER_RPC)
+    assert other is not contract
+    assert other.w3 is get_web3(OTHER_RPC)
+
+    monkeypatch.setattr(settings, "RPC", OTHER_RPC)
+    assert get_contract(TOKEN, ABI) is other
+    # another ABI object gets its own contract
+    assert get_contract(TOKEN, [dict(ABI[0])]) is not other
@@ -0,0 +1,64 @@
+import asyncio
+import itertools
+
+import pytest
+
+from agentopia.waiter import (
+    WaitTimeout,
+    async_wait_until,
+    backoff_delays,
+    wait_for_blocks,
+    wait_until,
+)
+
+
+class FakeEth:
+    def __init__(self):
+        self.blocks = itertools.count()
+
+    @property
+    def block_number(self) -> int:
+        # a new block on every read
+        return next(self.blocks)
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+def test_backoff_is_bounded_and_jittered() -> None:
+    delays = list(itertools.islice(backoff_delays(0.1, 1.0), 10))
+    assert 0.05 <= delays[0] <= 0.1
+    assert all(delay <= 1.0 for delay in delays)
+    assert max(delays) > 0.4
+
+
+def test_wait_until_returns_the_result() -> None:
+    attempts = iter([None, None, "done"])
+    assert wait_until(lambda: next(attempts), initial=0.001) == "done"
+
+
+def test_wait_until_times_out() -> None:
+    with pytest.raises(WaitTimeout):
+        wait_until(lambda: False, timeout=0.05, initial=0.01)
+
+
+def test_async_wait_until_awaits_the_check() -> None:
+    attempts = iter([False, True])
+
+    async def check() -> bool:
+        return next(attempts)
+
+    assert asyncio.run(async_wait_until(check, initial=0.001)) is True
+
+
+def test_wait_for_blocks_checks_once_per_block() -> None:
+    checks = []
+
+    def check() -> bool:
+        checks.append(True)
+        return len(checks) == 3
+
+    assert wait_for_blocks(FakeWeb3(), check, timeout=5) is True
+    assert len(checks) == 3
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import pytest
+from web3.exceptions import Web3RPCError
+
+from agentopia.services import web3_service
+from agentopia.services.nonce_service import NonceManager
+from agentopia.services.web3_service import Contract
+
+ACCOUNT = "0x15d34AAf54267DB7D7c367839AAf71A00a2C6A65"
+
+
+class FakeEth:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.nonce = 5
+        self.sent = []
+        self.account = self
+
+    def get_transaction_count(self, account: str, block_identifier: str) -> int:
+        return self.nonce
+
+    def sign_transaction(self, txn: dict, private_key: str):
+        raw = txn["nonce"].to_bytes(32, "big")
+        return SimpleNamespace(raw_transaction=raw)
+
+    def send_raw_transaction(self, raw: bytes) -> None:
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(int.from_bytes(raw, "big"))
+
+
+class FakeFunction:
+    def build_transaction(self, txn: dict) -> dict:
+        return txn
+
+
+@pytest.fixture
+def make_contract(monkeypatch):
+    def make(*errors):
+        web3 = SimpleNamespace(eth=FakeEth(errors), to_hex=lambda b: b.hex())
+        monkeypatch.setattr(Contract, "web3", web3)
+        contract = Contract.__new__(Contract)
+        contract.pk_manager = SimpleNamespace(account=ACCOUNT, pk="0x01")
+        return contract, web3.eth
+
+    monkeypatch.setattr(web3_service, "nonce_manager", NonceManager())
+    return make
+
+
+def test_nonce_too_low_retried_with_synced_nonce(make_contract) -> None:
+    contract, eth = make_contract(
+        Web3RPCError(str({"code": -32000, "message": "nonce too low"}))
+    )
+    eth.nonce = 5
+    web3_service.nonce_manager.allocate(contract.web3, ACCOUNT)
+    eth.nonce = 8
+    contract.send_txn(FakeFunction(), 0)
+    # the stale nonce 6 is dropped for the one the chain reports
+    assert eth.sent == [8]
+
+
+def test_unrecognized_error_raised(make_contract) -> None:
+    contract, eth = make_contract(Web3RPCError("insufficient funds for gas"))
+    with pytest.raises(Web3RPCError):
+        contract.send_txn(FakeFunction(), 0)
+    assert eth.sent == []
+
+    contract, eth = make_contract(ConnectionError("reset by peer"))
+    with pytest.raises(ConnectionError):
+        contract.send_txn(FakeFunction(), 0)
+    # the nonce of the failed transaction is handed out again
+    contract.send_txn(FakeFunction(), 0)
+    assert eth.sent == [5]
+
+
+def test_failed_send_keeps_nonces_in_flight(make_contract) -> None:
+    contract, eth = make_contract(Web3RPCError("insufficient funds for gas"))
+    # nonce 5 is in flight, not seen by the node yet
+    assert web3_service.nonce_manager.allocate(contract.web3, ACCOUNT) == 5
+    with pytest.raises(Web3RPCError):
+        contract.send_txn(FakeFunction(), 0)
+    # the unused nonce 6 is handed out again, not the chain's 5
+    contract.send_txn(FakeFunction(), 0)
+    assert eth.sent == [6]
+
+    # a later nonce is out already, the failed one is not handed out again
+    contract, eth = make_contract()
+    manager = web3_service.nonce_manager
+    nonce = manager.allocate(contract.web3, ACCOUNT)
+    assert manager.allocate(contract.web3, ACCOUNT) == nonce + 1
+    manager.release(ACCOUNT, nonce)
+    assert manager.allocate(contract.web3, ACCOUNT) == nonce + 2